@@ -1,59 +1,30 @@
+from startup import trace   # primero: así la traza de arranque incluye los imports siguientes
 import json
-import os
-import sys
+import multiprocessing
+import threading
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox
+from datetime import date
+from decimal import Decimal
+from tkinter import ttk, messagebox, filedialog, simpledialog
 from db import MySQLClient
+from settings import load_config, resource_path, save_config
+import migrations
+import importer
+import stock
+import proforma_pdf
+import reports
+import export
+import busqueda
+import lookups
+from executor import QueryExecutor
+from listing import TreeSync, VirtualTreeview, scrolled_treeview
+from paging import KeysetPager
+from replica import QUEUED
+from rows import RowType, display, parse_decimal
 
 APP_TITLE = "Sistema de Generación de Proformas"
 
-def resource_path(*parts):
-    """
-    Devuelve una ruta válida tanto en desarrollo como en .exe (PyInstaller).
-    Busca dentro de sys._MEIPASS cuando está congelado (--onefile).
-    """
-    base = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
-    return os.path.join(base, *parts)
-
-def load_config(path="config.json"):
-    """
-    Carga el archivo de configuración JSON (host/port/user/password/database).
-    Si no existe, devuelve un diccionario con valores por defecto.
-    """
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"host": "localhost", "port": 3306, "user": "root", "password": "root", "database": "sistemaproforma"} # Cambiar Datos de path respectivamente.
-
-def save_config(cfg, path="config.json"):
-    """Guarda el diccionario de configuración en disco (UTF-8, identado)."""
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(cfg, f, indent=2)
-
-def _init_database(self):
-    sql_dir = resource_path("sql")
-    files = [
-        ("schema_seed.sql", False),
-        ("procedures_all.sql", True),
-        ("triggers.sql", True),
-    ]
-    ok, out = self.client.run_sql(
-        "SELECT COUNT(*) FROM information_schema.tables "
-        "WHERE table_schema='coteind' AND table_name='Empleado';",
-        use_db=False
-    )
-    if ok and out.strip() == "1":
-        ok2, out2 = self.client.run_sql("SELECT COUNT(*) FROM Empleado;", use_db=True)
-        if ok2 and out2 and int(out2.strip().splitlines()[0]) > 0:
-            files = [f for f in files if f[0] != "schema_seed.sql"]
-
-    for fname, use_db in files:
-        path = os.path.join(sql_dir, fname)
-        if os.path.exists(path):
-            okf, outf = self.client.run_sql_file(path, use_db=use_db)
-            if not okf:
-                messagebox.showerror("Inicialización SQL", f"Error en {fname}:\n{outf}")
-
 class ConnectionWindow(tk.Toplevel):
     """
     Ventana modal de conexión.
@@ -102,16 +73,23 @@ class ConnectionWindow(tk.Toplevel):
         ttk.Button(btns, text="Probar conexión", command=self.test_conn).grid(row=0, column=0, padx=4)
         ttk.Button(btns, text="Guardar y continuar", command=self.save_and_continue).grid(row=0, column=1, padx=4)
 
+    def _form_cfg(self):
+        """Config del formulario, conservando opciones avanzadas (ej. "session", "backend") que no se editan aquí."""
+        cfg = dict(self.cfg)
+        cfg.update({
+            "host": self.e_host.get().strip(),
+            "port": int(self.e_port.get().strip()),
+            "user": self.e_user.get().strip(),
+            "password": self.e_pwd.get(),
+            "database": self.e_db.get().strip()
+        })
+        return cfg
+
     def test_conn(self):
         """Ejecuta un SELECT 1 para validar parámetros. Muestra diálogo con el resultado."""
-        client = MySQLClient(
-            host=self.e_host.get().strip(),
-            port=int(self.e_port.get().strip()),
-            user=self.e_user.get().strip(),
-            password=self.e_pwd.get(),
-            database=self.e_db.get().strip()
-        )
+        client = MySQLClient(**self._form_cfg())
         ok, out = client.test_connection()
+        client.close()
         if ok:
             messagebox.showinfo("Conexión", "¡Conexión exitosa!\nResultado:\n" + (out or "OK"))
         else:
@@ -119,13 +97,7 @@ class ConnectionWindow(tk.Toplevel):
 
     def save_and_continue(self):
         """Persiste la config, cierra la ventana y notifica al callback `on_connected`."""
-        cfg = {
-            "host": self.e_host.get().strip(),
-            "port": int(self.e_port.get().strip()),
-            "user": self.e_user.get().strip(),
-            "password": self.e_pwd.get(),
-            "database": self.e_db.get().strip()
-        }
+        cfg = self._form_cfg()
         save_config(cfg)
         self.destroy()
         self.on_connected(cfg)
@@ -134,14 +106,18 @@ class LoginWindow(tk.Toplevel):
     """
     Ventana de login.
     El usuario escribe solo los 4 dígitos; el prefijo 'E' se fija y se valida.
+    Con `executor` la consulta corre en segundo plano y, si se indica `ready`, espera a que
+    termine la inicialización de la BD (que corre mientras el usuario escribe).
     """
-    def __init__(self, master, cfg, on_login_ok):
+    def __init__(self, master, cfg, on_login_ok, client=None, executor=None, ready=None):
         super().__init__(master)
         self.title(f"{APP_TITLE} · Login")
         self.resizable(False, False)
         self.cfg = cfg
-        self.client = MySQLClient(**cfg)
+        self.client = client or MySQLClient(**cfg)
         self.on_login_ok = on_login_ok
+        self.executor = executor
+        self.ready = ready
         self._build()
 
     def _build(self):
@@ -162,7 +138,9 @@ class LoginWindow(tk.Toplevel):
         self.e_codigo_num = ttk.Entry(code_frame, width=6, validate="key", validatecommand=vcmd)
         self.e_codigo_num.grid(row=0, column=1)
 
-        ttk.Button(frm, text="Ingresar", command=self._do_login).grid(row=1, column=1, sticky="e")
+        self.btn_login = ttk.Button(frm, text="Ingresar", command=self._do_login)
+        self.btn_login.grid(row=1, column=1, sticky="e")
+        self.e_codigo_num.focus_set()
 
     def _validate_digits_len4(self, P):
         """Valida que solo se ingresen dígitos y como máximo 4 caracteres."""
@@ -183,14 +161,156 @@ class LoginWindow(tk.Toplevel):
         if not cod:
             messagebox.showwarning("Login", "Ingrese solo números (hasta 4).")
             return
-        sql = f"SELECT Nombre FROM Empleado WHERE Codigo = {self.client.esc(cod)} LIMIT 1;"
-        nombre = self.client.select_scalar(sql)
+        if self.executor is None:
+            self._login_done(cod, self._find_employee(cod))
+            return
+        self.btn_login.configure(state="disabled")
+        self.executor.submit("login", lambda: self._find_employee(cod),
+                             lambda nombre: self._login_done(cod, nombre), on_error=self._login_error)
+
+    def _find_employee(self, cod):
+        """Nombre del empleado `cod` o None (corre en el hilo de trabajo si hay executor)."""
+        if self.ready is not None:
+            self.ready.wait()
+        with trace.phase("login"):
+            rows = self.client.query("SELECT Nombre FROM Empleado WHERE Codigo = %s LIMIT 1;", [cod])
+        return rows[0][0] if rows else None
+
+    def _login_done(self, cod, nombre):
         if nombre:
             self.destroy()
             self.on_login_ok(self.cfg, cod, nombre)
         else:
+            self.btn_login.configure(state="normal")
             messagebox.showerror("Login", f"Código no encontrado: {cod}")
 
+    def _login_error(self, exc):
+        self.btn_login.configure(state="normal")
+        messagebox.showerror("Login", str(exc))
+
+class ExportWindow(tk.Toplevel):
+    """
+    Progreso de una exportación (ver export.py): filas escritas y botón Cancelar.
+    El trabajo corre en el executor; la ventana consulta el contador cada 200 ms.
+    """
+    POLL_MS = 200
+
+    def __init__(self, master, executor, title, job):
+        super().__init__(master)
+        self.title(f"{APP_TITLE} · Exportar {title}")
+        self.resizable(False, False)
+        self.rows = 0
+        self.cancel = threading.Event()
+
+        frm = ttk.Frame(self, padding=12)
+        frm.pack(fill="both", expand=True)
+        self.lbl = ttk.Label(frm, text="Exportando…", width=40)
+        self.lbl.pack(anchor="w")
+        self.pb = ttk.Progressbar(frm, mode="indeterminate", length=280)
+        self.pb.pack(fill="x", pady=8)
+        self.pb.start(15)
+        ttk.Button(frm, text="Cancelar", command=self.cancel.set).pack(anchor="e")
+        self.protocol("WM_DELETE_WINDOW", self.cancel.set)
+
+        executor.submit("exportar", lambda: job(self._progress, self.cancel), self._done,
+                        on_error=self._error, replace=False)
+        self.after(self.POLL_MS, self._poll)
+
+    def _progress(self, rows):
+        # Hilo de trabajo: solo guarda el número; `_poll` lo muestra desde el hilo de Tk.
+        self.rows = rows
+
+    def _poll(self):
+        if self.winfo_exists():
+            self.lbl.config(text=f"{self.rows:,} filas escritas…".replace(",", "."))
+            self.after(self.POLL_MS, self._poll)
+
+    def _done(self, result):
+        self.destroy()
+        messagebox.showinfo("Exportar", result.summary())
+
+    def _error(self, exc):
+        self.destroy()
+        if not isinstance(exc, export.ExportCancelled):
+            messagebox.showerror("Exportar", str(exc))
+
+
+class StockBatchWindow(tk.Toplevel):
+    """
+    Ventana de ajuste de stock por lotes.
+    Acepta líneas pegadas de una planilla o un archivo de lector de códigos (ver stock.py),
+    las aplica en una sola sentencia y muestra el resultado por repuesto.
+    """
+    def __init__(self, master, client, executor, on_applied):
+        super().__init__(master)
+        self.title(f"{APP_TITLE} · Ajuste de stock por lote")
+        self.client = client
+        self.executor = executor
+        self.on_applied = on_applied
+        self._build()
+
+    def _build(self):
+        """Construye el área de entrada, los botones y la tabla de resultados."""
+        frm = ttk.Frame(self, padding=10)
+        frm.pack(fill="both", expand=True)
+
+        ttk.Label(frm, text="Una línea por ajuste: Nro_Parte [cantidad] [SUMA|RESTA]  "
+                            "(tab, ; o , como separador; solo Nro_Parte = +1)").pack(anchor="w")
+        self.txt = tk.Text(frm, width=70, height=10)
+        self.txt.pack(fill="x", pady=4)
+
+        fr_btns = ttk.Frame(frm)
+        fr_btns.pack(fill="x", pady=4)
+        ttk.Button(fr_btns, text="Cargar archivo…", command=self._load_file).pack(side="left")
+        ttk.Button(fr_btns, text="Aplicar", command=self._apply).pack(side="right")
+        self.lbl = ttk.Label(fr_btns, text="")
+        self.lbl.pack(side="left", padx=8)
+
+        cols = ("Nro_Parte", "Delta", "Stock_Anterior", "Stock_Nuevo", "Estado")
+        self.tv, _sb = scrolled_treeview(frm, cols, width=110, height=10)
+
+    def _load_file(self):
+        """Carga en el área de texto un .txt/.csv (p.ej. exportado por el lector de códigos)."""
+        path = filedialog.askopenfilename(title="Archivo de ajustes",
+                                          filetypes=[("Texto", "*.txt *.csv"), ("Todos", "*.*")])
+        if path:
+            with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+                self.txt.delete("1.0", tk.END)
+                self.txt.insert("1.0", f.read())
+
+    def _apply(self):
+        """Valida las líneas y aplica el lote en segundo plano."""
+        entries, errors = stock.parse_adjustments(self.txt.get("1.0", tk.END))
+        if errors:
+            detail = "\n".join(f"línea {n}: {m}" for n, m in errors[:10])
+            if len(errors) > 10:
+                detail += f"\n... y {len(errors) - 10} más"
+            if not entries:
+                messagebox.showwarning("Stock", detail, parent=self)
+                return
+            if not messagebox.askyesno("Stock", f"{detail}\n\n¿Aplicar las demás líneas?", parent=self):
+                return
+        if not entries:
+            messagebox.showwarning("Stock", "No hay ajustes para aplicar.", parent=self)
+            return
+        parts = len(stock.net_deltas(entries))
+        if not messagebox.askyesno("Stock", f"¿Aplicar {len(entries)} ajustes sobre {parts} repuestos?", parent=self):
+            return
+
+        def done(res):
+            ok, out = res
+            if not ok:
+                messagebox.showerror("Stock", out, parent=self)
+                return
+            rows = [["" if v is None else v for v in r] for r in out]
+            self.tv.delete(*self.tv.get_children())
+            for r in rows:
+                self.tv.insert("", tk.END, values=r)
+            missing = sum(1 for r in out if r[4] == "No existe")
+            self.lbl.configure(text=f"Aplicado: {len(out) - missing} repuestos, {missing} inexistentes.")
+            self.on_applied()
+        self.executor.submit("inventario", lambda: stock.adjust_stock(self.client, entries), done, replace=False)
+
 class MainApp(tk.Tk):
     """
     Ventana principal (Tk).
@@ -203,77 +323,105 @@ class MainApp(tk.Tk):
         self.minsize(1100, 700)
         self.cfg = None
         self.client = None
+        self.executor = None
+        self.nb = None
+        self.fr_busy = None
+        self._tabs = {}          # clave -> (frame, título) de cada pestaña
+        self._db_ready = threading.Event()   # migraciones terminadas (el login espera este evento)
         self.current_user_code = None
         self.current_user_name = None
-        # Abre primero la ventana de conexión
-        self.after(100, self._open_connection_window)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        # Abre primero la ventana de conexión, apenas arranca el loop de Tk
+        self.after_idle(self._open_connection_window)
+
+    def _on_close(self):
+        """
+        Detiene el executor cortando las consultas en curso y cierra la sesión persistente de mysql
+        (si la hay) antes de destruir la ventana: cerrar no espera a una consulta larga.
+        """
+        if self.executor is not None:
+            self.executor.shutdown(abort=self.client.abort)
+        if self.client is not None:
+            self.client.close()
+        self.destroy()
     
     def _init_database(self):
         """
-        Ejecuta los .sql de /sql:
-        - schema_seed.sql (solo si la tabla Empleado existe y no está vacía se omite el seed)
-        - procedures_all.sql
-        - triggers.sql
+        Aplica en segundo plano las migraciones pendientes de /sql (ver migrations.py) y
+        marca `_db_ready` al terminar. Si el esquema está al día cuesta una sola consulta
+        a `schema_version`.
         """
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        sql_dir = os.path.join(base_dir, "sql")
-        files = [
-            ("schema_seed.sql", False),   # se ejecuta sin forzar -D porque el script crea/usa el schema
-            ("procedures_all.sql", True), # ya con -D
-            ("triggers.sql", True)
-        ]
-        # Detecta si Empleado existe y tiene filas; si es así, evita correr el seed para no duplicar
-        ok, out = self.client.run_sql(
-            "SELECT COUNT(*) "
-            "FROM information_schema.tables "
-            "WHERE table_schema='sistemaproforma' AND table_name='Empleado';",
-            use_db=False
-        )
-        if ok and out.strip() == "1":
-            ok2, out2 = self.client.run_sql("SELECT COUNT(*) FROM Empleado;", use_db=True)
-            if ok2 and out2 and int(out2.strip().splitlines()[0]) > 0:
-                files = [f for f in files if f[0] != "schema_seed.sql"]
-
-        # Ejecuta cada archivo
-        for fname, use_db in files:
-            path = os.path.join(sql_dir, fname)
-            if os.path.exists(path):
-                okf, outf = self.client.run_sql_file(path, use_db=use_db)
-                if not okf:
-                    messagebox.showerror("Inicialización SQL", f"Error en {fname}:\n{outf}")
+        def work():
+            try:
+                with trace.phase("migraciones"):
+                    return migrations.migrate(self.client, resource_path("sql"))
+            finally:
+                self._db_ready.set()
+
+        def done(res):
+            ok, out = res
+            if not ok:
+                messagebox.showerror("Inicialización SQL", out)
+        self.executor.submit("init", work, done, on_error=lambda e: messagebox.showerror("Inicialización SQL", str(e)),
+                             replace=False)
 
     def _open_connection_window(self):
         """Lanza la ventana de conexión y pasa el callback `_on_connected`."""
         ConnectionWindow(self, self._on_connected)
+        trace.mark("ventana de conexión")
 
     def _on_connected(self, cfg):
         """
-        Recibe la config confirmada, crea MySQLClient,
-        inicializa la BD (scripts SQL) y abre la ventana de login.
+        Recibe la config confirmada, crea MySQLClient y abre la ventana de login de inmediato;
+        la inicialización de la BD (scripts SQL) corre en paralelo mientras se escribe el código.
         """
+        trace.mark("conexión confirmada")
         self.cfg = cfg
         self.client = MySQLClient(**cfg)
+        self.executor = QueryExecutor(self, on_busy=self._on_busy)
         self._init_database()
-        LoginWindow(self, cfg, self._on_login_ok)
+        LoginWindow(self, cfg, self._on_login_ok, client=self.client, executor=self.executor, ready=self._db_ready)
+        trace.mark("ventana de login")
 
     def _on_login_ok(self, cfg, user_code, user_name):
         """Callback posterior al login exitoso: persiste contexto de usuario y construye UI."""
         self.cfg = cfg
-        self.client = MySQLClient(**cfg)
+        if self.client is None:
+            self.client = MySQLClient(**cfg)
+        if self.executor is None:
+            self.executor = QueryExecutor(self, on_busy=self._on_busy)
         self.current_user_code = user_code
         self.current_user_name = user_name
-        self._build_ui()
+        with trace.phase("ventana principal"):
+            self._build_ui()
 
     def _build_ui(self):
-        """Arma la barra superior y el Notebook con todas las pestañas de trabajo."""
+        """Arma la barra superior y el Notebook; las pestañas se construyen al mostrarse por primera vez."""
         top = ttk.Frame(self, padding=8)
         top.pack(fill="x")
         ttk.Label(top, text=f"Conectado a {self.cfg['database']}@{self.cfg['host']}:{self.cfg['port']}").pack(side="left")
         ttk.Label(top, text=f" | Usuario BD: {self.cfg['user']}").pack(side="left")
         ttk.Label(top, text=f" | Empleado: {self.current_user_code} - {self.current_user_name}").pack(side="right")
 
+        # Indicador de carga de la pestaña visible (se muestra solo mientras tiene consultas pendientes)
+        self.fr_busy = ttk.Frame(top)
+        self.pb_busy = ttk.Progressbar(self.fr_busy, mode="indeterminate", length=120)
+        self.pb_busy.pack(side="left", padx=6)
+        ttk.Button(self.fr_busy, text="Cancelar", command=self._cancelar_tab_actual).pack(side="left")
+
+        ttk.Button(top, text="Exportar…", command=self._exportar).pack(side="right", padx=8)
+        self._exports = {}   # pestaña -> (columnas, KeysetPager) del listado, para "Exportar…"
+        self.lbl_replica = ttk.Label(top, text="")
+        self.lbl_replica.pack(side="right", padx=8)
+        if self.client.replica is not None:
+            self.after_idle(self._sync_replica)
+
+        self.lookups = lookups.LookupIndex()
+        ttk.Style(self).configure("Invalido.TCombobox", foreground="red")
+
         nb = ttk.Notebook(self)
         nb.pack(fill="both", expand=True, padx=8, pady=8)
+        self.nb = nb
 
         # Pestañas
         tab_empleados = ttk.Frame(nb)
@@ -292,14 +440,263 @@ class MainApp(tk.Tk):
         nb.add(tab_proforma, text="Proforma")
         nb.add(tab_reportes, text="Reportes")
 
-        # Construcción de cada tab
-        self._build_tab_empleados(tab_empleados)
-        self._build_tab_inventario(tab_inventario)
-        self._build_tab_proveedores(tab_proveedores)
-        self._build_tab_empresas(tab_empresas)
-        self._build_tab_oc(tab_oc)
-        self._build_tab_proforma(tab_proforma)
-        self._build_tab_reportes(tab_reportes)
+        self._tabs = {
+            "empleados": (tab_empleados, "Empleados"),
+            "inventario": (tab_inventario, "Inventario"),
+            "proveedores": (tab_proveedores, "Proveedores"),
+            "empresas": (tab_empresas, "Empresas (Clientes)"),
+            "oc": (tab_oc, "Orden de Compra"),
+            "proforma": (tab_proforma, "Proforma"),
+            "reportes": (tab_reportes, "Reportes"),
+        }
+
+        # Construcción perezosa: cada tab se arma (y consulta) la primera vez que se muestra
+        self._builders = {
+            "empleados": self._build_tab_empleados,
+            "inventario": self._build_tab_inventario,
+            "proveedores": self._build_tab_proveedores,
+            "empresas": self._build_tab_empresas,
+            "oc": self._build_tab_oc,
+            "proforma": self._build_tab_proforma,
+            "reportes": self._build_tab_reportes,
+        }
+        self._built = set()
+        nb.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        self._on_tab_changed()
+        # Pestaña oculta de diagnóstico (tiempos por sentencia, ver db.QueryStats)
+        self.tab_diag = None
+        self.bind_all("<Control-Shift-D>", self._toggle_diagnostico)
+
+    # -------- Construcción perezosa de pestañas --------------------------------
+    PREFETCH_DELAY_MS = 400
+    NO_PREFETCH = ("reportes", "diagnostico")   # Reportes ejecuta un reporte al abrirse: solo si el usuario entra
+
+    def _on_tab_changed(self, _evt=None):
+        """Arma la pestaña visible si aún no existe y programa el prefetch de la siguiente."""
+        key = self._current_tab_key()
+        if key is not None:
+            self._ensure_tab(key)
+            self.after(self.PREFETCH_DELAY_MS, lambda: self._prefetch_after(key))
+        self._update_busy_bar()
+
+    def _ensure_tab(self, key):
+        """Construye la pestaña `key` (y lanza su primera carga) una sola vez."""
+        if key in self._built:
+            return
+        self._built.add(key)
+        frame, _title = self._tabs[key]
+        with trace.phase(f"pestaña {key}"):
+            self._builders[key](frame)
+
+    def _prefetch_after(self, key):
+        """
+        Construye en segundo plano la pestaña vecina más probable (siguiente, luego anterior),
+        cuando la visible ya terminó de cargar; sus datos llegan por el executor.
+        """
+        if self._current_tab_key() != key:
+            return   # el usuario ya cambió de pestaña; ese cambio programa su propio prefetch
+        if self._tab_busy(key):
+            self.after(self.PREFETCH_DELAY_MS, lambda: self._prefetch_after(key))
+            return
+        keys = list(self._tabs)
+        i = keys.index(key)
+        for nxt in keys[i + 1:i + 2] + keys[max(i - 1, 0):i]:
+            if nxt not in self._built and nxt not in self.NO_PREFETCH:
+                self._ensure_tab(nxt)
+                self.after(self.PREFETCH_DELAY_MS, lambda: self._prefetch_after(key))
+                return
+
+    # -------- Consultas en segundo plano ----------------------------------------
+    def _current_tab_key(self):
+        """Clave (ver `self._tabs`) de la pestaña visible, o None."""
+        if self.nb is None or not self.nb.select():
+            return None
+        current = self.nb.nametowidget(self.nb.select())
+        for key, (frame, _title) in self._tabs.items():
+            if frame is current:
+                return key
+        return None
+
+    PAGES = ".paginas"   # sufijo de la clave con que las listas paginadas piden sus páginas
+
+    def _tab_busy(self, key):
+        """True si la pestaña `key` tiene consultas pendientes (propias o de páginas)."""
+        return self.executor.is_busy(key) or self.executor.is_busy(key + self.PAGES)
+
+    def _on_busy(self, key, busy):
+        """Marca la pestaña con '…' mientras tiene consultas pendientes."""
+        if key.endswith(self.PAGES):
+            key = key[:-len(self.PAGES)]
+        if key in self._tabs:
+            busy = self._tab_busy(key)
+            frame, title = self._tabs[key]
+            self.nb.tab(frame, text=title + (" …" if busy else ""))
+            if not busy:
+                trace.finish(f"datos de {key}")   # fin del arranque: la primera pestaña ya muestra sus filas
+        self._update_busy_bar()
+
+    def _update_busy_bar(self):
+        """Muestra la barra de progreso + Cancelar solo si la pestaña visible está ocupada."""
+        if self.fr_busy is None:
+            return   # aún no se armó la ventana principal
+        key = self._current_tab_key()
+        if key is not None and self._tab_busy(key):
+            if not self.fr_busy.winfo_ismapped():
+                self.fr_busy.pack(side="right", padx=8)
+                self.pb_busy.start(15)
+        elif self.fr_busy.winfo_ismapped():
+            self.pb_busy.stop()
+            self.fr_busy.pack_forget()
+
+    def _cancelar_tab_actual(self):
+        """Descarta las lecturas pendientes de la pestaña visible."""
+        key = self._current_tab_key()
+        if key is not None:
+            self.executor.cancel(key)
+            self.executor.cancel(key + self.PAGES)
+
+    def _fill_tree(self, tv, rows):
+        """Reemplaza las filas de un Treeview (None se muestra vacío)."""
+        tv.delete(*tv.get_children())
+        for r in rows:
+            tv.insert("", tk.END, values=display(r))
+
+    def _query_async(self, key, sql, on_rows, row=None, on_drop=None):
+        """
+        Ejecuta un SELECT en segundo plano y entrega las filas a `on_rows` en el hilo de Tk.
+        `sql` puede ser la tupla (sql, params); con `row` (ver rows.py) las filas llegan tipadas.
+        `on_drop()` se llama si la respuesta se descarta (ver `QueryExecutor.submit`).
+        """
+        query = sql if isinstance(sql, tuple) else (sql,)
+        self.executor.submit(key, lambda: self.client.select_typed(*query, row=row), on_rows,
+                             on_drop=on_drop)
+
+    def _load_async(self, key, sql, tv):
+        """Ejecuta un SELECT en segundo plano y vuelca el resultado en `tv` (descarta respuestas obsoletas)."""
+        self._query_async(key, sql, lambda rows: self._fill_tree(tv, rows))
+
+    def _virtual_list(self, key, tv, sb, select, order, row=None):
+        """
+        Lista paginada por clave (ver listing.py) cuyas páginas se piden con `_query_async`
+        bajo la clave `key + PAGES`, para que otra lectura de la pestaña no las descarte.
+        El mismo pager queda registrado para "Exportar…" de la pestaña `key`.
+        """
+        pager = KeysetPager(select, order, row=row)
+        self._exports[key] = (tuple(tv["columns"]), pager)
+        return VirtualTreeview(tv, pager,
+                               lambda sql, done, dropped: self._query_async(key + self.PAGES, sql, done, row, dropped),
+                               scrollbar=sb)
+
+    def _run_sp(self, key, title, call, ok_msg, reload, check=(), touch=None):
+        """
+        Ejecuta un CALL en segundo plano; al terminar informa el resultado y, si fue ok, recarga la tabla.
+
+        Params
+        ------
+        call : tuple
+            (procedimiento, parámetros...) para `MySQLClient.call` (parámetros enlazados por tipo).
+        check : list[tuple[str, str]]
+            Claves foráneas (catálogo, clave) a validar con `self.lookups` antes del CALL:
+            si alguna no existe no se llama al SP.
+        touch : tuple[str, str] | None
+            (catálogo, clave) que el SP crea/modifica/borra: se actualiza en el índice.
+        """
+        def work():
+            bad = self.lookups.missing(self.client, check)
+            if bad:
+                return False, "\n".join(bad)
+            return self.client.call(*call)
+
+        def done(res):
+            ok, out = res
+            if ok:
+                if touch is not None:
+                    self.executor.submit("lookups", lambda: self.lookups.refresh_key(self.client, *touch),
+                                         lambda _exists: None, replace=False)
+                messagebox.showinfo(title, QUEUED if out == QUEUED else ok_msg)
+                reload()
+            else:
+                messagebox.showerror(title, out)
+        self.executor.submit(key, work, done, replace=False)
+
+    # -------- Réplica local (ver replica.py) ---------------------------------------
+    def _sync_replica(self):
+        """Envía la cola y trae los cambios a la réplica en segundo plano; programa la siguiente vez."""
+        replica = self.client.replica
+
+        def again():
+            self.after(int(replica.sync_every * 1000), self._sync_replica)
+
+        def done(res):
+            self.lbl_replica.config(text="Réplica: " + res.summary())
+            if res.conflicts:
+                detail = "\n".join(f"#{i} {proc}: {err}" for i, proc, err in res.conflicts[:10])
+                messagebox.showwarning("Réplica local", "Operaciones en cola que el servidor rechazó "
+                                       f"(no se aplicaron):\n{detail}\n\nVer `python replica.py --estado`.")
+            again()
+
+        def error(exc):
+            self.lbl_replica.config(text=f"Réplica: {exc}")
+            again()
+        self.executor.submit("replica", replica.sync, done, on_error=error, replace=False)
+
+    # -------- Catálogos para autocompletar (ver lookups.py) ---------------------
+    def _load_lookups(self):
+        """Carga en segundo plano los catálogos nunca cargados o vencidos."""
+        if any(self.lookups.needs_load(n) for n in lookups.CATALOGS) and not self.executor.is_busy("lookups"):
+            self.executor.submit("lookups", lambda: self.lookups.load_stale(self.client),
+                                 lambda _names: None, on_error=lambda _e: None)
+
+    def _lookup_combo(self, parent, catalog, width):
+        """
+        Combobox con sugerencias del catálogo `catalog` (se filtran con lo escrito al abrir la
+        lista) que se marca en rojo si la clave no existe.
+        """
+        cb = ttk.Combobox(parent, width=width)
+        cb.configure(postcommand=lambda: self._lookup_suggest(cb, catalog))
+        cb.bind("<<ComboboxSelected>>", lambda _e: self._lookup_pick(cb, catalog))
+        cb.bind("<FocusOut>", lambda _e: self._lookup_mark(cb, catalog))
+        return cb
+
+    def _lookup_suggest(self, cb, catalog):
+        self._load_lookups()
+        cb.configure(values=self.lookups.matches(catalog, cb.get()))
+
+    def _lookup_pick(self, cb, catalog):
+        """Deja solo la clave de la sugerencia elegida ("E0001 — Juan" -> "E0001")."""
+        key = lookups.key_of(cb.get())
+        cb.set(key)
+        self._lookup_mark(cb, catalog)
+
+    def _lookup_mark(self, cb, catalog):
+        key = cb.get().strip()
+        bad = bool(key) and self.lookups.contains(catalog, key) is False
+        cb.configure(style="Invalido.TCombobox" if bad else "TCombobox")
+
+    # -------- Exportación ------------------------------------------------------
+    def _exportar(self):
+        """Exporta a CSV/XLSX el listado de la pestaña visible (o el reporte mostrado), leyendo de la BD."""
+        key = self._current_tab_key()
+        if key == "reportes":
+            if self._rep_current is None:
+                messagebox.showwarning("Exportar", "Primero muestre un reporte.")
+                return
+            report, values = self._rep_current
+            title = report.title
+            run = lambda path, progress, cancel: export.export_report(self.client, report, values, path, progress, cancel)
+        elif key in self._exports:
+            columns, pager = self._exports[key]
+            title = self._tabs[key][1]
+            run = lambda path, progress, cancel: export.export_pager(self.client, pager, columns, path, progress, cancel)
+        else:
+            messagebox.showwarning("Exportar", "Esta pestaña no tiene listado para exportar.")
+            return
+        path = filedialog.asksaveasfilename(
+            title=f"Exportar {title}", defaultextension=".csv", initialfile=f"{title}.csv",
+            filetypes=[("CSV", "*.csv"), ("Excel", "*.xlsx")]
+        )
+        if path:
+            ExportWindow(self, self.executor, title, lambda progress, cancel: run(path, progress, cancel))
 
     # -------- Empleados -------------------------------------------------------
     def _build_tab_empleados(self, parent):
@@ -347,6 +744,9 @@ class MainApp(tk.Tk):
             self.tv_emp.heading(c, text=c)
             self.tv_emp.column(c, width=150, anchor="w")
         self.tv_emp.pack(fill="both", expand=True)
+        self.ts_emp = TreeSync(self.tv_emp)
+        self._exports["empleados"] = (cols, KeysetPager(self.EMPLEADOS_SELECT, self.EMPLEADOS_ORDER,
+                                                         row=self.EMPLEADOS_ROW))
         self.tv_emp.bind("<<TreeviewSelect>>", self._emp_on_select)
         ttk.Button(fr_tbl, text="Refrescar", command=self._cargar_empleados).pack(anchor="e", pady=6)
 
@@ -380,19 +780,18 @@ class MainApp(tk.Tk):
             self.e_emp_tel.delete(0, tk.END)
             self.e_emp_tel.insert(0, vals[2])
 
-    def _cargar_empleados(self):
-        """Consulta y vuelca Empleado + Contacto_Empleado en la tabla."""
-        for i in self.tv_emp.get_children():
-            self.tv_emp.delete(i)
-        sql = """
-        SELECT e.Codigo, e.Nombre, IFNULL(c.Telefono,'')
+    EMPLEADOS_SELECT = """
+        SELECT e.Codigo, e.Nombre, c.Telefono
         FROM Empleado e
         LEFT JOIN Contacto_Empleado c ON c.Codigo_Empleado = e.Codigo
-        ORDER BY e.Codigo;
         """
-        rows = self.client.select_rows(sql)
-        for r in rows:
-            self.tv_emp.insert("", tk.END, values=r)
+    EMPLEADOS_ORDER = [("e.Codigo", False, 0)]
+    EMPLEADOS_ROW = RowType("Empleado", [("Codigo", str), ("Nombre", str), ("Telefono", str)])
+
+    def _cargar_empleados(self):
+        """Consulta Empleado + Contacto_Empleado y aplica a la tabla solo los cambios (por Codigo)."""
+        sql = self.EMPLEADOS_SELECT + "ORDER BY e.Codigo;"
+        self._query_async("empleados", sql, self.ts_emp.apply, self.EMPLEADOS_ROW)
 
     def _registrar_empleado(self):
         """Invoca sp_Agregar_Empleado."""
@@ -402,13 +801,9 @@ class MainApp(tk.Tk):
         if not cod or not nom or not tel:
             messagebox.showwarning("Empleado", "Complete Código, Nombre y Teléfono.")
             return
-        sql = "CALL sp_Agregar_Empleado(" + f"{self.client.esc(cod)}, {self.client.esc(nom)}, {self.client.esc(tel)}" + ");"
-        ok, out = self.client.call_sp(sql)
-        if ok:
-            messagebox.showinfo("Empleado", "Creado.")
-            self._cargar_empleados()
-        else:
-            messagebox.showerror("Empleado", out)
+        call = ("sp_Agregar_Empleado", cod, nom, tel)
+        self._run_sp("empleados", "Empleado", call, "Creado.", self._cargar_empleados,
+                     touch=("empleado", cod))
 
     def _actualizar_empleado(self):
         """Invoca sp_Actualizar_Empleado."""
@@ -418,13 +813,9 @@ class MainApp(tk.Tk):
         if not cod or not nom or not tel:
             messagebox.showwarning("Empleado", "Complete Código, Nombre y Teléfono.")
             return
-        sql = "CALL sp_Actualizar_Empleado(" + f"{self.client.esc(cod)}, {self.client.esc(nom)}, {self.client.esc(tel)}" + ");"
-        ok, out = self.client.call_sp(sql)
-        if ok:
-            messagebox.showinfo("Empleado", "Actualizado.")
-            self._cargar_empleados()
-        else:
-            messagebox.showerror("Empleado", out)
+        call = ("sp_Actualizar_Empleado", cod, nom, tel)
+        self._run_sp("empleados", "Empleado", call, "Actualizado.", self._cargar_empleados,
+                     touch=("empleado", cod))
 
     def _eliminar_empleado(self):
         """Invoca sp_Eliminar_Empleado (con protección para el usuario logueado)."""
@@ -436,13 +827,8 @@ class MainApp(tk.Tk):
             messagebox.showwarning("Empleado", "No puedes eliminar al usuario con sesión activa.")
             return
         if messagebox.askyesno("Confirmar", f"¿Eliminar empleado {cod}?"):
-            sql = "CALL sp_Eliminar_Empleado(" + f"{self.client.esc(cod)}" + ");"
-            ok, out = self.client.call_sp(sql)
-            if ok:
-                messagebox.showinfo("Empleado", "Eliminado.")
-                self._cargar_empleados()
-            else:
-                messagebox.showerror("Empleado", out)
+            self._run_sp("empleados", "Empleado", ("sp_Eliminar_Empleado", cod), "Eliminado.", self._cargar_empleados,
+                     touch=("empleado", cod))
 
     # -------- Inventario (Repuesto) ------------------------------------------
     def _build_tab_inventario(self, parent):
@@ -489,7 +875,7 @@ class MainApp(tk.Tk):
         fr_right.grid(row=0, column=1, sticky="nsew", padx=8, pady=8)
 
         ttk.Label(fr_right, text="Nro_Parte").grid(row=0, column=0, sticky="e")
-        self.e_adj_np = ttk.Entry(fr_right, width=18)
+        self.e_adj_np = self._lookup_combo(fr_right, "repuesto", 18)
         self.e_adj_np.grid(row=0, column=1, sticky="w", pady=2)
 
         ttk.Label(fr_right, text="Cantidad (+/-)").grid(row=1, column=0, sticky="e")
@@ -502,22 +888,38 @@ class MainApp(tk.Tk):
         self.cmb_op.grid(row=2, column=1, sticky="w", pady=2)
 
         ttk.Button(fr_right, text="Aplicar Ajuste", command=self._ajustar_stock).grid(row=3, column=1, sticky="e", pady=6)
+        ttk.Button(fr_right, text="Ajuste por lote…", command=self._ajuste_lote).grid(row=4, column=1, sticky="e")
 
         # Tabla inventario
         fr_tbl = ttk.LabelFrame(parent, text="Inventario (vista rápida)", padding=10)
         fr_tbl.grid(row=1, column=0, columnspan=2, sticky="nsew", padx=8, pady=8)
         parent.rowconfigure(1, weight=1)
 
-        cols = ("Nro_Parte", "Descripcion", "Marca", "Status", "Precio_Unitario", "Cantidad")
-        self.tv_inv = ttk.Treeview(fr_tbl, columns=cols, show="headings", height=10)
-        for c in cols:
-            self.tv_inv.heading(c, text=c)
-            self.tv_inv.column(c, width=140, anchor="w")
-        self.tv_inv.pack(fill="both", expand=True)
+        fr_search = ttk.Frame(fr_tbl)
+        fr_search.pack(fill="x", pady=(0, 6))
+        ttk.Label(fr_search, text="Buscar (Nro_Parte, marca o descripción):").pack(side="left")
+        self.inv_search_var = tk.StringVar()
+        ttk.Entry(fr_search, textvariable=self.inv_search_var, width=40).pack(side="left", padx=4)
+        self.lbl_inv_search = ttk.Label(fr_search, text="")
+        self.lbl_inv_search.pack(side="left", padx=4)
+        self._inv_search_job = None
+        self.inv_search_var.trace_add("write", self._buscar_repuesto_diferido)
+
+        cols = busqueda.COLUMNS
+        self.tv_inv, sb = scrolled_treeview(fr_tbl, cols, width=140, height=10)
+        self.vl_inv = self._virtual_list(
+            "inventario", self.tv_inv, sb,
+            "SELECT Nro_Parte, Descripcion, Marca, Status, Precio_Unitario, Cantidad FROM Repuesto",
+            [("Descripcion", False, 1), ("Nro_Parte", False, 0)], busqueda.ROW
+        )
         self.tv_inv.bind("<<TreeviewSelect>>", self._rep_on_select)
-        ttk.Button(fr_tbl, text="Refrescar", command=self._cargar_inventario).pack(anchor="e", pady=6)
+        fr_btns_t = ttk.Frame(fr_tbl)
+        fr_btns_t.pack(anchor="e", pady=6)
+        ttk.Button(fr_btns_t, text="Importar catálogo…", command=self._importar_catalogo).pack(side="left", padx=4)
+        ttk.Button(fr_btns_t, text="Refrescar", command=self._cargar_inventario).pack(side="left")
 
         self._cargar_inventario()
+        self._load_lookups()
 
     def _rep_on_select(self, _evt):
         """Carga en el formulario el repuesto seleccionado en la tabla."""
@@ -545,17 +947,13 @@ class MainApp(tk.Tk):
             messagebox.showwarning("Repuesto", "Complete todos los campos.")
             return
         try:
-            float(precio); int(cant)
-        except:
+            precio = parse_decimal(precio); cant = int(cant)
+        except ValueError:
             messagebox.showwarning("Repuesto", "Precio decimal y Cantidad entero.")
             return
-        sql = "CALL sp_Agregar_Repuesto(" + f"{self.client.esc(npart)}, {self.client.esc(desc)}, {self.client.esc(marca)}, {self.client.esc(status)}, {precio}, {cant}" + ");"
-        ok, out = self.client.call_sp(sql)
-        if ok:
-            messagebox.showinfo("Repuesto", "Creado.")
-            self._cargar_inventario()
-        else:
-            messagebox.showerror("Repuesto", out)
+        call = ("sp_Agregar_Repuesto", npart, desc, marca, status, precio, cant)
+        self._run_sp("inventario", "Repuesto", call, "Creado.", self._cargar_inventario,
+                     touch=("repuesto", npart))
 
     def _actualizar_repuesto(self):
         """Invoca sp_Actualizar_Repuesto."""
@@ -569,17 +967,13 @@ class MainApp(tk.Tk):
             messagebox.showwarning("Repuesto", "Complete todos los campos.")
             return
         try:
-            float(precio); int(cant)
-        except:
+            precio = parse_decimal(precio); cant = int(cant)
+        except ValueError:
             messagebox.showwarning("Repuesto", "Precio decimal y Cantidad entero.")
             return
-        sql = "CALL sp_Actualizar_Repuesto(" + f"{self.client.esc(npart)}, {self.client.esc(desc)}, {self.client.esc(marca)}, {self.client.esc(status)}, {precio}, {cant}" + ");"
-        ok, out = self.client.call_sp(sql)
-        if ok:
-            messagebox.showinfo("Repuesto", "Actualizado.")
-            self._cargar_inventario()
-        else:
-            messagebox.showerror("Repuesto", out)
+        call = ("sp_Actualizar_Repuesto", npart, desc, marca, status, precio, cant)
+        self._run_sp("inventario", "Repuesto", call, "Actualizado.", self._cargar_inventario,
+                     touch=("repuesto", npart))
 
     def _eliminar_repuesto(self):
         """Invoca sp_Eliminar_Repuesto con confirmación."""
@@ -588,13 +982,8 @@ class MainApp(tk.Tk):
             messagebox.showwarning("Repuesto", "Seleccione un repuesto.")
             return
         if messagebox.askyesno("Confirmar", f"¿Eliminar repuesto {npart}?"):
-            sql = "CALL sp_Eliminar_Repuesto(" + f"{self.client.esc(npart)}" + ");"
-            ok, out = self.client.call_sp(sql)
-            if ok:
-                messagebox.showinfo("Repuesto", "Eliminado.")
-                self._cargar_inventario()
-            else:
-                messagebox.showerror("Repuesto", out)
+            self._run_sp("inventario", "Repuesto", ("sp_Eliminar_Repuesto", npart), "Eliminado.", self._cargar_inventario,
+                     touch=("repuesto", npart))
 
     def _ajustar_stock(self):
         """Invoca sp_Actualizar_Stock (SUMA/RESTA) validando cantidad entera."""
@@ -606,25 +995,76 @@ class MainApp(tk.Tk):
             return
         try:
             icant = int(cant)
-        except:
+        except ValueError:
             messagebox.showwarning("Stock", "Cantidad entero.")
             return
-        sql = "CALL sp_Actualizar_Stock(" + f"{self.client.esc(npart)}, {icant}, {self.client.esc(op)}" + ");"
-        ok, out = self.client.call_sp(sql)
-        if ok:
-            messagebox.showinfo("Stock", "Ajuste aplicado.")
-            self._cargar_inventario()
-        else:
-            messagebox.showerror("Stock", out)
+        self._run_sp("inventario", "Stock", ("sp_Actualizar_Stock", npart, icant, op), "Ajuste aplicado.", self._cargar_inventario,
+                     check=[("repuesto", npart)])
+
+    def _ajuste_lote(self):
+        """Abre la ventana de ajuste de stock por lotes (conteo físico / lector de códigos)."""
+        StockBatchWindow(self, self.client, self.executor, self._cargar_inventario)
+
+    def _importar_catalogo(self):
+        """Importa (inserta/actualiza) repuestos desde un CSV/XLSX en segundo plano (ver importer.py)."""
+        path = filedialog.askopenfilename(
+            title="Importar catálogo de repuestos",
+            filetypes=[("Catálogo", "*.csv *.xlsx"), ("CSV", "*.csv"), ("Excel", "*.xlsx")]
+        )
+        if not path:
+            return
+
+        def done(res):
+            if res.ok:
+                messagebox.showinfo("Importar catálogo", res.summary())
+                self.lookups.invalidate("repuesto")
+                self._cargar_inventario()
+            else:
+                messagebox.showerror("Importar catálogo", res.summary())
+            if res.errors and messagebox.askyesno("Importar catálogo", "¿Guardar el detalle de filas con error?"):
+                out = filedialog.asksaveasfilename(title="Guardar errores", defaultextension=".csv",
+                                                   filetypes=[("CSV", "*.csv")])
+                if out:
+                    res.write_errors(out)
+        self.executor.submit("inventario", lambda: importer.import_catalog(self.client, path), done, replace=False)
 
     def _cargar_inventario(self):
-        """Consulta y pinta la tabla de repuestos."""
-        for i in self.tv_inv.get_children():
-            self.tv_inv.delete(i)
-        sql = "SELECT Nro_Parte, Descripcion, Marca, Status, Precio_Unitario, Cantidad FROM Repuesto ORDER BY Descripcion;"
-        rows = self.client.select_rows(sql)
-        for r in rows:
-            self.tv_inv.insert("", tk.END, values=r)
+        """
+        Consulta y pinta la tabla de repuestos (por páginas, ordenada por descripción);
+        si hay texto en "Buscar", repite la búsqueda.
+        """
+        if busqueda.words(self.inv_search_var.get()):
+            self._buscar_repuesto()
+        else:
+            self.vl_inv.refresh()
+
+    SEARCH_DELAY_MS = 250   # espera tras la última tecla antes de consultar
+
+    def _buscar_repuesto_diferido(self, *_):
+        """Reprograma la búsqueda en cada tecla: solo consulta cuando el usuario hace una pausa."""
+        if self._inv_search_job is not None:
+            self.after_cancel(self._inv_search_job)
+        self._inv_search_job = self.after(self.SEARCH_DELAY_MS, self._buscar_repuesto)
+
+    def _buscar_repuesto(self):
+        """Muestra las primeras coincidencias de la búsqueda (o vuelve al listado si está vacía)."""
+        self._inv_search_job = None
+        text = self.inv_search_var.get()
+        if not busqueda.words(text):
+            self.lbl_inv_search.configure(text="")
+            self.executor.cancel("inventario")   # una búsqueda en curso no debe tapar el listado
+            self.vl_inv.reload()
+            return
+
+        def done(rows):
+            self.vl_inv.show(rows)
+            more = "+" if len(rows) >= busqueda.LIMIT else ""
+            self.lbl_inv_search.configure(text=f"{len(rows)}{more} coincidencias")
+
+        def failed(e):
+            self.lbl_inv_search.configure(text="")
+            messagebox.showerror("Buscar", str(e))
+        self.executor.submit("inventario", lambda: busqueda.search(self.client, text), done, on_error=failed)
 
     # -------- Proveedores -----------------------------------------------------
     def _build_tab_proveedores(self, parent):
@@ -671,6 +1111,9 @@ class MainApp(tk.Tk):
             self.tv_prv.heading(c, text=c)
             self.tv_prv.column(c, width=150, anchor="w")
         self.tv_prv.pack(fill="both", expand=True)
+        self.ts_prv = TreeSync(self.tv_prv)
+        self._exports["proveedores"] = (cols, KeysetPager(self.PROVEEDORES_SELECT, self.PROVEEDORES_ORDER,
+                                                           row=self.PROVEEDORES_ROW))
         self.tv_prv.bind("<<TreeviewSelect>>", self._prv_on_select)
         ttk.Button(fr_tbl, text="Refrescar", command=self._cargar_proveedores).pack(anchor="e", pady=6)
 
@@ -689,20 +1132,20 @@ class MainApp(tk.Tk):
             self.e_prv_tel.delete(0, tk.END); self.e_prv_tel.insert(0, r[3])
             self.e_prv_mail.delete(0, tk.END); self.e_prv_mail.insert(0, r[4])
 
-    def _cargar_proveedores(self):
-        """Lista proveedores con sus contactos (LEFT JOIN para no perder nulos)."""
-        for i in self.tv_prv.get_children():
-            self.tv_prv.delete(i)
-        sql = """
-        SELECT p.RUC, p.Raz_Soc, IFNULL(p.Direccion,''), IFNULL(t.Telefono,''), IFNULL(e.Email,'')
+    PROVEEDORES_SELECT = """
+        SELECT p.RUC, p.Raz_Soc, p.Direccion, t.Telefono, e.Email
         FROM Proveedor p
         LEFT JOIN Telefono_Proveedor t ON t.RUC_Proveedor = p.RUC
         LEFT JOIN Email_Proveedor e ON e.RUC_Proveedor = p.RUC
-        ORDER BY p.Raz_Soc;
         """
-        rows = self.client.select_rows(sql)
-        for r in rows:
-            self.tv_prv.insert("", tk.END, values=r)
+    PROVEEDORES_ORDER = [("p.Raz_Soc", False, 1), ("p.RUC", False, 0)]
+    PROVEEDORES_ROW = RowType("Proveedor", [("RUC", str), ("Raz_Soc", str), ("Direccion", str),
+                                            ("Telefono", str), ("Email", str)])
+
+    def _cargar_proveedores(self):
+        """Lista proveedores con sus contactos (LEFT JOIN para no perder nulos); refresco incremental por RUC."""
+        sql = self.PROVEEDORES_SELECT + "ORDER BY p.Raz_Soc;"
+        self._query_async("proveedores", sql, self.ts_prv.apply, self.PROVEEDORES_ROW)
 
     def _crear_proveedor(self):
         """Invoca sp_Agregar_Proveedor."""
@@ -714,13 +1157,9 @@ class MainApp(tk.Tk):
         if not (ruc and raz and dire):
             messagebox.showwarning("Proveedor", "RUC, Razón Social y Dirección son obligatorios.")
             return
-        sql = "CALL sp_Agregar_Proveedor(" + f"{self.client.esc(ruc)}, {self.client.esc(raz)}, {self.client.esc(dire)}, {self.client.esc(tel)}, {self.client.esc(mail)}" + ");"
-        ok, out = self.client.call_sp(sql)
-        if ok:
-            messagebox.showinfo("Proveedor", "Creado.")
-            self._cargar_proveedores()
-        else:
-            messagebox.showerror("Proveedor", out)
+        call = ("sp_Agregar_Proveedor", ruc, raz, dire, tel, mail)
+        self._run_sp("proveedores", "Proveedor", call, "Creado.", self._cargar_proveedores,
+                     touch=("proveedor", ruc))
 
     def _actualizar_proveedor(self):
         """Invoca sp_Actualizar_Proveedor."""
@@ -732,13 +1171,9 @@ class MainApp(tk.Tk):
         if not (ruc and raz and dire):
             messagebox.showwarning("Proveedor", "RUC, Razón Social y Dirección son obligatorios.")
             return
-        sql = "CALL sp_Actualizar_Proveedor(" + f"{self.client.esc(ruc)}, {self.client.esc(raz)}, {self.client.esc(dire)}, {self.client.esc(tel)}, {self.client.esc(mail)}" + ");"
-        ok, out = self.client.call_sp(sql)
-        if ok:
-            messagebox.showinfo("Proveedor", "Actualizado.")
-            self._cargar_proveedores()
-        else:
-            messagebox.showerror("Proveedor", out)
+        call = ("sp_Actualizar_Proveedor", ruc, raz, dire, tel, mail)
+        self._run_sp("proveedores", "Proveedor", call, "Actualizado.", self._cargar_proveedores,
+                     touch=("proveedor", ruc))
 
     def _eliminar_proveedor(self):
         """Invoca sp_Eliminar_Proveedor (valida ordenes asociadas en el SP)."""
@@ -747,13 +1182,8 @@ class MainApp(tk.Tk):
             messagebox.showwarning("Proveedor", "Seleccione un proveedor.")
             return
         if messagebox.askyesno("Confirmar", f"¿Eliminar proveedor {ruc}?"):
-            sql = "CALL sp_Eliminar_Proveedor(" + f"{self.client.esc(ruc)}" + ");"
-            ok, out = self.client.call_sp(sql)
-            if ok:
-                messagebox.showinfo("Proveedor", "Eliminado.")
-                self._cargar_proveedores()
-            else:
-                messagebox.showerror("Proveedor", out)
+            self._run_sp("proveedores", "Proveedor", ("sp_Eliminar_Proveedor", ruc), "Eliminado.", self._cargar_proveedores,
+                     touch=("proveedor", ruc))
 
     # -------- Empresas (Clientes) --------------------------------------------
     def _build_tab_empresas(self, parent):
@@ -813,6 +1243,9 @@ class MainApp(tk.Tk):
             self.tv_cli.heading(c, text=c)
             self.tv_cli.column(c, width=130, anchor="w")
         self.tv_cli.pack(fill="both", expand=True)
+        self.ts_cli = TreeSync(self.tv_cli)
+        self._exports["empresas"] = (cols, KeysetPager(self.EMPRESAS_SELECT, self.EMPRESAS_ORDER,
+                                                        row=self.EMPRESAS_ROW))
         self.tv_cli.bind("<<TreeviewSelect>>", self._cli_on_select)
         ttk.Button(fr_tbl, text="Refrescar", command=self._cargar_empresas).pack(anchor="e", pady=6)
 
@@ -834,22 +1267,21 @@ class MainApp(tk.Tk):
             self.e_cli_tel.delete(0, tk.END); self.e_cli_tel.insert(0, v[6])
             self.e_cli_mail.delete(0, tk.END); self.e_cli_mail.insert(0, v[7])
 
-    def _cargar_empresas(self):
-        """Lista empresas con sus datos vinculados (dirección/teléfono/correo)."""
-        for i in self.tv_cli.get_children():
-            self.tv_cli.delete(i)
-        sql = """
-        SELECT em.RUC, em.Raz_Soc, IFNULL(em.FAX,''), IFNULL(dir.Ciudad,''), IFNULL(dir.Calle,''), IFNULL(dir.Distrito,''),
-               IFNULL(tel.Telefono,''), IFNULL(cor.Correo,'')
+    EMPRESAS_SELECT = """
+        SELECT em.RUC, em.Raz_Soc, em.FAX, dir.Ciudad, dir.Calle, dir.Distrito, tel.Telefono, cor.Correo
         FROM Empresa em
         LEFT JOIN Direccion_Empresa dir ON dir.RUC_Empresa = em.RUC
         LEFT JOIN Telefono_Empresa tel ON tel.RUC_Empresa = em.RUC
         LEFT JOIN Correo_Empresa cor ON cor.RUC_Empresa = em.RUC
-        ORDER BY em.Raz_Soc;
         """
-        rows = self.client.select_rows(sql)
-        for r in rows:
-            self.tv_cli.insert("", tk.END, values=r)
+    EMPRESAS_ORDER = [("em.Raz_Soc", False, 1), ("em.RUC", False, 0)]
+    EMPRESAS_ROW = RowType("Empresa", [("RUC", str), ("Raz_Soc", str), ("FAX", str), ("Ciudad", str), ("Calle", str),
+                                       ("Distrito", str), ("Telefono", str), ("Correo", str)])
+
+    def _cargar_empresas(self):
+        """Lista empresas con sus datos vinculados (dirección/teléfono/correo); refresco incremental por RUC."""
+        sql = self.EMPRESAS_SELECT + "ORDER BY em.Raz_Soc;"
+        self._query_async("empresas", sql, self.ts_cli.apply, self.EMPRESAS_ROW)
 
     def _crear_empresa(self):
         """Invoca sp_Agregar_Empresa (transaccional; crea empresa + datos relacionados)."""
@@ -864,13 +1296,9 @@ class MainApp(tk.Tk):
         if not (ruc and raz):
             messagebox.showwarning("Empresa", "RUC y Razón Social son obligatorios.")
             return
-        sql = "CALL sp_Agregar_Empresa(" + f"{self.client.esc(ruc)}, {self.client.esc(raz)}, {self.client.esc(fax)}, {self.client.esc(ciudad)}, {self.client.esc(calle)}, {self.client.esc(distrito)}, {self.client.esc(tel)}, {self.client.esc(mail)}" + ");"
-        ok, out = self.client.call_sp(sql)
-        if ok:
-            messagebox.showinfo("Empresa", "Creada.")
-            self._cargar_empresas()
-        else:
-            messagebox.showerror("Empresa", out)
+        call = ("sp_Agregar_Empresa", ruc, raz, fax, ciudad, calle, distrito, tel, mail)
+        self._run_sp("empresas", "Empresa", call, "Creada.", self._cargar_empresas,
+                     touch=("empresa", ruc))
 
     def _actualizar_empresa(self):
         """Invoca sp_Actualizar_Empresa (upserts en tablas relacionadas)."""
@@ -885,13 +1313,9 @@ class MainApp(tk.Tk):
         if not (ruc and raz):
             messagebox.showwarning("Empresa", "RUC y Razón Social son obligatorios.")
             return
-        sql = "CALL sp_Actualizar_Empresa(" + f"{self.client.esc(ruc)}, {self.client.esc(raz)}, {self.client.esc(fax)}, {self.client.esc(ciudad)}, {self.client.esc(calle)}, {self.client.esc(distrito)}, {self.client.esc(tel)}, {self.client.esc(mail)}" + ");"
-        ok, out = self.client.call_sp(sql)
-        if ok:
-            messagebox.showinfo("Empresa", "Actualizada.")
-            self._cargar_empresas()
-        else:
-            messagebox.showerror("Empresa", out)
+        call = ("sp_Actualizar_Empresa", ruc, raz, fax, ciudad, calle, distrito, tel, mail)
+        self._run_sp("empresas", "Empresa", call, "Actualizada.", self._cargar_empresas,
+                     touch=("empresa", ruc))
 
     def _eliminar_empresa(self):
         """Invoca sp_Eliminar_Empresa (bloquea si hay OC asociadas; lo valida el SP)."""
@@ -900,13 +1324,8 @@ class MainApp(tk.Tk):
             messagebox.showwarning("Empresa", "Seleccione una empresa.")
             return
         if messagebox.askyesno("Confirmar", f"¿Eliminar empresa {ruc}?"):
-            sql = "CALL sp_Eliminar_Empresa(" + f"{self.client.esc(ruc)}" + ");"
-            ok, out = self.client.call_sp(sql)
-            if ok:
-                messagebox.showinfo("Empresa", "Eliminada.")
-                self._cargar_empresas()
-            else:
-                messagebox.showerror("Empresa", out)
+            self._run_sp("empresas", "Empresa", ("sp_Eliminar_Empresa", ruc), "Eliminada.", self._cargar_empresas,
+                     touch=("empresa", ruc))
 
     # -------- Orden de Compra -------------------------------------------------
     def _build_tab_oc(self, parent):
@@ -939,13 +1358,13 @@ class MainApp(tk.Tk):
         ttk.Label(frm, text="Desc_Orden").grid(row=4, column=2, sticky="e")
         self.oc_desc = ttk.Entry(frm, width=24); self.oc_desc.grid(row=4, column=3, sticky="w", pady=2)
         ttk.Label(frm, text="Codigo_Empleado").grid(row=5, column=0, sticky="e")
-        self.oc_codemp = ttk.Entry(frm, width=10); self.oc_codemp.grid(row=5, column=1, sticky="w", pady=2)
+        self.oc_codemp = self._lookup_combo(frm, "empleado", 30); self.oc_codemp.grid(row=5, column=1, sticky="w", pady=2)
         ttk.Label(frm, text="RUC_Proveedor").grid(row=5, column=2, sticky="e")
-        self.oc_rucprov = ttk.Entry(frm, width=14); self.oc_rucprov.grid(row=5, column=3, sticky="w", pady=2)
+        self.oc_rucprov = self._lookup_combo(frm, "proveedor", 30); self.oc_rucprov.grid(row=5, column=3, sticky="w", pady=2)
         ttk.Label(frm, text="RUC_Empresa").grid(row=6, column=0, sticky="e")
-        self.oc_rucemp = ttk.Entry(frm, width=14); self.oc_rucemp.grid(row=6, column=1, sticky="w", pady=2)
+        self.oc_rucemp = self._lookup_combo(frm, "empresa", 30); self.oc_rucemp.grid(row=6, column=1, sticky="w", pady=2)
         ttk.Label(frm, text="Nro_Parte").grid(row=6, column=2, sticky="e")
-        self.oc_np = ttk.Entry(frm, width=14); self.oc_np.grid(row=6, column=3, sticky="w", pady=2)
+        self.oc_np = self._lookup_combo(frm, "repuesto", 14); self.oc_np.grid(row=6, column=3, sticky="w", pady=2)
 
         frb = ttk.Frame(frm); frb.grid(row=7, column=0, columnspan=4, sticky="e", pady=6)
         ttk.Button(frb, text="Registrar", command=self._registrar_oc).grid(row=0, column=0, padx=4)
@@ -957,15 +1376,23 @@ class MainApp(tk.Tk):
         fr_tbl.grid(row=1, column=0, columnspan=2, sticky="nsew", padx=8, pady=8)
         parent.rowconfigure(1, weight=1)
         cols = ("Nro_Orden","Per_UM","Fecha_Entrega","Precio_Neto","Item","Cantidad","UM","Forma_pago","Incoterms_2000","Desc_Orden","Codigo_Empleado","RUC_Proveedor","RUC_Empresa")
-        self.tv_oc = ttk.Treeview(fr_tbl, columns=cols, show="headings", height=10)
-        for c in cols:
-            self.tv_oc.heading(c, text=c)
-            self.tv_oc.column(c, width=120, anchor="w")
-        self.tv_oc.pack(fill="both", expand=True)
+        self.tv_oc, sb = scrolled_treeview(fr_tbl, cols, width=120, height=10)
+        self.vl_oc = self._virtual_list(
+            "oc", self.tv_oc, sb,
+            "SELECT Nro_Orden, Per_UM, Fecha_Entrega, Precio_Neto, Item, Cantidad, UM, Forma_pago, Incoterms_2000, "
+            "Desc_Orden, Codigo_Empleado, RUC_Proveedor, RUC_Empresa FROM Orden_Compra",
+            [("Fecha_Entrega", True, 2), ("Nro_Orden", True, 0)], self.OC_ROW
+        )
         self.tv_oc.bind("<<TreeviewSelect>>", self._oc_on_select)
         ttk.Button(fr_tbl, text="Refrescar", command=self._cargar_oc).pack(anchor="e", pady=6)
 
         self._cargar_oc()
+        self._load_lookups()
+
+    OC_ROW = RowType("OrdenCompra", [
+        ("Nro_Orden", str), ("Per_UM", str), ("Fecha_Entrega", date), ("Precio_Neto", Decimal), ("Item", int),
+        ("Cantidad", int), ("UM", str), ("Forma_pago", str), ("Incoterms_2000", str), ("Desc_Orden", str),
+        ("Codigo_Empleado", str), ("RUC_Proveedor", str), ("RUC_Empresa", str)])
 
     def _oc_on_select(self, _evt):
         """Carga en el formulario la OC seleccionada."""
@@ -989,13 +1416,8 @@ class MainApp(tk.Tk):
             self.oc_rucemp.delete(0, tk.END); self.oc_rucemp.insert(0, v[12])
 
     def _cargar_oc(self):
-        """Lista últimas órdenes (ordenadas por fecha y número)."""
-        for i in self.tv_oc.get_children():
-            self.tv_oc.delete(i)
-        sql = "SELECT Nro_Orden, Per_UM, Fecha_Entrega, Precio_Neto, Item, Cantidad, UM, Forma_pago, IFNULL(Incoterms_2000,''), Desc_Orden, Codigo_Empleado, RUC_Proveedor, RUC_Empresa FROM Orden_Compra ORDER BY Fecha_Entrega DESC, Nro_Orden DESC;"
-        rows = self.client.select_rows(sql)
-        for r in rows:
-            self.tv_oc.insert("", tk.END, values=r)
+        """Lista últimas órdenes (ordenadas por fecha y número, por páginas)."""
+        self.vl_oc.refresh()
 
     def _registrar_oc(self):
         """Invoca sp_Registrar_OrdenCompra (inserta y actualiza stock SUMA)."""
@@ -1017,22 +1439,19 @@ class MainApp(tk.Tk):
             messagebox.showwarning("Orden Compra", "Complete todos los campos obligatorios.")
             return
         try:
-            int(item); int(cant); float(precio)
-        except:
+            item = int(item); cant = int(cant); precio = parse_decimal(precio)
+        except ValueError:
             messagebox.showwarning("Orden Compra", "Item/Cantidad enteros, Precio decimal.")
             return
-        sql = (
-            "CALL sp_Registrar_OrdenCompra("
-            f"{self.client.esc(nro)}, {self.client.esc(perum)}, {self.client.esc(fecha)}, {precio}, {item}, {cant}, "
-            f"{self.client.esc(um)}, {self.client.esc(fp)}, {self.client.esc(incot)}, {self.client.esc(desc)}, "
-            f"{self.client.esc(cod)}, {self.client.esc(rprov)}, {self.client.esc(remp)}, {self.client.esc(np)});"
-        )
-        ok, out = self.client.call_sp(sql)
-        if ok:
-            messagebox.showinfo("Orden Compra", "Registrada.")
-            self._cargar_oc()
-        else:
-            messagebox.showerror("Orden Compra", out)
+        try:
+            fecha = date.fromisoformat(fecha)
+        except ValueError:
+            messagebox.showwarning("Orden Compra", "Fecha_Entrega con formato AAAA-MM-DD.")
+            return
+        call = ("sp_Registrar_OrdenCompra", nro, perum, fecha, precio, item, cant, um, fp, incot, desc,
+                cod, rprov, remp, np)
+        self._run_sp("oc", "Orden Compra", call, "Registrada.", self._cargar_oc,
+                     check=[("empleado", cod), ("proveedor", rprov), ("empresa", remp), ("repuesto", np)])
 
     def _actualizar_oc(self):
         """Invoca sp_Actualizar_OrdenCompra (ajusta stock según delta de cantidad)."""
@@ -1054,22 +1473,19 @@ class MainApp(tk.Tk):
             messagebox.showwarning("Orden Compra", "Complete todos los campos obligatorios.")
             return
         try:
-            int(item); int(cant); float(precio)
-        except:
+            item = int(item); cant = int(cant); precio = parse_decimal(precio)
+        except ValueError:
             messagebox.showwarning("Orden Compra", "Item/Cantidad enteros, Precio decimal.")
             return
-        sql = (
-            "CALL sp_Actualizar_OrdenCompra("
-            f"{self.client.esc(nro)}, {self.client.esc(perum)}, {self.client.esc(fecha)}, {precio}, {item}, {cant}, "
-            f"{self.client.esc(um)}, {self.client.esc(fp)}, {self.client.esc(incot)}, {self.client.esc(desc)}, "
-            f"{self.client.esc(cod)}, {self.client.esc(rprov)}, {self.client.esc(remp)}, {self.client.esc(np)});"
-        )
-        ok, out = self.client.call_sp(sql)
-        if ok:
-            messagebox.showinfo("Orden Compra", "Actualizada.")
-            self._cargar_oc()
-        else:
-            messagebox.showerror("Orden Compra", out)
+        try:
+            fecha = date.fromisoformat(fecha)
+        except ValueError:
+            messagebox.showwarning("Orden Compra", "Fecha_Entrega con formato AAAA-MM-DD.")
+            return
+        call = ("sp_Actualizar_OrdenCompra", nro, perum, fecha, precio, item, cant, um, fp, incot, desc,
+                cod, rprov, remp, np)
+        self._run_sp("oc", "Orden Compra", call, "Actualizada.", self._cargar_oc,
+                     check=[("empleado", cod), ("proveedor", rprov), ("empresa", remp), ("repuesto", np)])
 
     def _eliminar_oc(self):
         """Invoca sp_Eliminar_OrdenCompra (revierte stock y borra la OC)."""
@@ -1079,17 +1495,11 @@ class MainApp(tk.Tk):
             messagebox.showwarning("Orden Compra", "Indique Nro_Orden y Nro_Parte.")
             return
         if messagebox.askyesno("Confirmar", f"¿Eliminar orden {nro}? Se revertirá el stock."):
-            sql = "CALL sp_Eliminar_OrdenCompra(" + f"{self.client.esc(nro)}, {self.client.esc(np)}" + ");"
-            ok, out = self.client.call_sp(sql)
-            if ok:
-                messagebox.showinfo("Orden Compra", "Eliminada.")
-                self._cargar_oc()
-            else:
-                messagebox.showerror("Orden Compra", out)
+            self._run_sp("oc", "Orden Compra", ("sp_Eliminar_OrdenCompra", nro, np), "Eliminada.", self._cargar_oc)
 
     # -------- Proforma --------------------------------------------------------
     def _build_tab_proforma(self, parent):
-        """UI y eventos de CRUD de Proforma."""
+        """UI y eventos de CRUD de Proforma (cabecera + líneas)."""
         parent.columnconfigure(0, weight=1)
         parent.columnconfigure(1, weight=1)
 
@@ -1098,113 +1508,206 @@ class MainApp(tk.Tk):
 
         ttk.Label(fr_form, text="Nro_Proforma").grid(row=0, column=0, sticky="e")
         self.pf_nro = ttk.Entry(fr_form, width=16); self.pf_nro.grid(row=0, column=1, sticky="w", pady=2)
-        ttk.Label(fr_form, text="Item").grid(row=1, column=0, sticky="e")
-        self.pf_item = ttk.Entry(fr_form, width=8); self.pf_item.grid(row=1, column=1, sticky="w", pady=2)
-        ttk.Label(fr_form, text="Cantidad").grid(row=2, column=0, sticky="e")
-        self.pf_cant = ttk.Entry(fr_form, width=8); self.pf_cant.grid(row=2, column=1, sticky="w", pady=2)
-        ttk.Label(fr_form, text="Fecha (YYYY-MM-DD)").grid(row=3, column=0, sticky="e")
-        self.pf_fecha = ttk.Entry(fr_form, width=14); self.pf_fecha.grid(row=3, column=1, sticky="w", pady=2)
-        ttk.Label(fr_form, text="Peso").grid(row=4, column=0, sticky="e")
-        self.pf_peso = ttk.Entry(fr_form, width=10); self.pf_peso.grid(row=4, column=1, sticky="w", pady=2)
-        ttk.Label(fr_form, text="Nro_Parte").grid(row=5, column=0, sticky="e")
-        self.pf_np = ttk.Entry(fr_form, width=14); self.pf_np.grid(row=5, column=1, sticky="w", pady=2)
-        ttk.Label(fr_form, text="Codigo_Empleado").grid(row=6, column=0, sticky="e")
-        self.pf_cod = ttk.Entry(fr_form, width=10); self.pf_cod.grid(row=6, column=1, sticky="w", pady=2)
+        ttk.Label(fr_form, text="Fecha (YYYY-MM-DD)").grid(row=1, column=0, sticky="e")
+        self.pf_fecha = ttk.Entry(fr_form, width=14); self.pf_fecha.grid(row=1, column=1, sticky="w", pady=2)
+        ttk.Label(fr_form, text="Codigo_Empleado").grid(row=2, column=0, sticky="e")
+        self.pf_cod = self._lookup_combo(fr_form, "empleado", 30); self.pf_cod.grid(row=2, column=1, sticky="w", pady=2)
+        ttk.Label(fr_form, text="RUC_Empresa (cliente)").grid(row=3, column=0, sticky="e")
+        self.pf_ruc = self._lookup_combo(fr_form, "empresa", 30); self.pf_ruc.grid(row=3, column=1, sticky="w", pady=2)
+
+        # Líneas: se editan en memoria y se guardan todas juntas con Crear/Actualizar
+        fr_lin = ttk.LabelFrame(fr_form, text="Líneas", padding=6)
+        fr_lin.grid(row=4, column=0, columnspan=2, sticky="nsew", pady=6)
+        fr_form.rowconfigure(4, weight=1)
+        fr_form.columnconfigure(1, weight=1)
+
+        fr_edit = ttk.Frame(fr_lin)
+        fr_edit.pack(fill="x")
+        ttk.Label(fr_edit, text="Nro_Parte").grid(row=0, column=0, sticky="e")
+        self.pf_np = self._lookup_combo(fr_edit, "repuesto", 14); self.pf_np.grid(row=0, column=1, sticky="w", padx=2)
+        ttk.Label(fr_edit, text="Cantidad").grid(row=0, column=2, sticky="e")
+        self.pf_cant = ttk.Entry(fr_edit, width=8); self.pf_cant.grid(row=0, column=3, sticky="w", padx=2)
+        ttk.Label(fr_edit, text="Peso").grid(row=0, column=4, sticky="e")
+        self.pf_peso = ttk.Entry(fr_edit, width=10); self.pf_peso.grid(row=0, column=5, sticky="w", padx=2)
+
+        fr_lbtns = ttk.Frame(fr_lin)
+        fr_lbtns.pack(fill="x", pady=4)
+        ttk.Button(fr_lbtns, text="Agregar línea", command=self._pf_agregar_linea).pack(side="left", padx=2)
+        ttk.Button(fr_lbtns, text="Modificar línea", command=self._pf_modificar_linea).pack(side="left", padx=2)
+        ttk.Button(fr_lbtns, text="Quitar línea", command=self._pf_quitar_linea).pack(side="left", padx=2)
+
+        self.pf_lines = []   # [Nro_Parte, Cantidad, Peso] en orden de Item
+        self.tv_pf_lin, _sb = scrolled_treeview(fr_lin, ("Item", "Nro_Parte", "Cantidad", "Peso"), width=90, height=6)
+        self.tv_pf_lin.bind("<<TreeviewSelect>>", self._pf_linea_on_select)
 
         fr_btns = ttk.Frame(fr_form)
-        fr_btns.grid(row=7, column=0, columnspan=2, sticky="e", pady=6)
-        ttk.Button(fr_btns, text="Crear", command=self._crear_proforma).grid(row=0, column=0, padx=4)
-        ttk.Button(fr_btns, text="Actualizar", command=self._actualizar_proforma).grid(row=0, column=1, padx=4)
-        ttk.Button(fr_btns, text="Eliminar", command=self._eliminar_proforma).grid(row=0, column=2, padx=4)
+        fr_btns.grid(row=5, column=0, columnspan=2, sticky="e", pady=6)
+        ttk.Button(fr_btns, text="Nueva", command=self._pf_limpiar).grid(row=0, column=0, padx=4)
+        ttk.Button(fr_btns, text="Crear", command=self._crear_proforma).grid(row=0, column=1, padx=4)
+        ttk.Button(fr_btns, text="Actualizar", command=self._actualizar_proforma).grid(row=0, column=2, padx=4)
+        ttk.Button(fr_btns, text="Eliminar", command=self._eliminar_proforma).grid(row=0, column=3, padx=4)
+        ttk.Button(fr_btns, text="PDF…", command=self._pdf_proforma).grid(row=1, column=0, columnspan=2, padx=4, pady=4, sticky="we")
+        ttk.Button(fr_btns, text="PDF por rango…", command=self._pdf_rango).grid(row=1, column=2, columnspan=2, padx=4, pady=4, sticky="we")
 
         fr_tbl = ttk.LabelFrame(parent, text="Listado", padding=10)
         fr_tbl.grid(row=0, column=1, sticky="nsew", padx=8, pady=8)
         parent.rowconfigure(0, weight=1)
 
-        cols = ("Nro_Proforma","Item","Cantidad","Fecha","Peso","Nro_Parte","Codigo_Empleado")
-        self.tv_pf = ttk.Treeview(fr_tbl, columns=cols, show="headings", height=12)
-        for c in cols:
-            self.tv_pf.heading(c, text=c)
-            self.tv_pf.column(c, width=130, anchor="w")
-        self.tv_pf.pack(fill="both", expand=True)
+        cols = ("Nro_Proforma", "Fecha", "Codigo_Empleado", "RUC_Empresa", "Lineas", "Unidades")
+        self.tv_pf, sb = scrolled_treeview(fr_tbl, cols, width=110, height=12)
+        self.vl_pf = self._virtual_list(
+            "proforma", self.tv_pf, sb,
+            "SELECT p.Nro_Proforma, p.Fecha, p.Codigo_Empleado, p.RUC_Empresa, "
+            "(SELECT COUNT(*) FROM Proforma_Detalle d WHERE d.Nro_Proforma = p.Nro_Proforma) AS Lineas, "
+            "(SELECT IFNULL(SUM(d.Cantidad), 0) FROM Proforma_Detalle d WHERE d.Nro_Proforma = p.Nro_Proforma) AS Unidades "
+            "FROM Proforma p",
+            [("p.Fecha", True, 1), ("p.Nro_Proforma", True, 0)], self.PROFORMA_ROW
+        )
         self.tv_pf.bind("<<TreeviewSelect>>", self._pf_on_select)
         ttk.Button(fr_tbl, text="Refrescar", command=self._cargar_proformas).pack(anchor="e", pady=6)
 
         self._cargar_proformas()
+        self._load_lookups()
+
+    PROFORMA_ROW = RowType("Proforma", [("Nro_Proforma", str), ("Fecha", date), ("Codigo_Empleado", str),
+                                        ("RUC_Empresa", str), ("Lineas", int), ("Unidades", int)])
+    PROFORMA_LINEA_ROW = RowType("ProformaLinea", [("Nro_Parte", str), ("Cantidad", int), ("Peso", Decimal)])
 
     def _pf_on_select(self, _evt):
-        """Carga en el formulario la proforma seleccionada."""
+        """Carga en el formulario la cabecera seleccionada y pide sus líneas."""
         sel = self.tv_pf.selection()
         if not sel:
             return
         v = self.tv_pf.item(sel[0], "values")
-        if len(v) >= 7:
-            self.pf_nro.delete(0, tk.END); self.pf_nro.insert(0, v[0])
-            self.pf_item.delete(0, tk.END); self.pf_item.insert(0, v[1])
-            self.pf_cant.delete(0, tk.END); self.pf_cant.insert(0, v[2])
-            self.pf_fecha.delete(0, tk.END); self.pf_fecha.insert(0, v[3])
-            self.pf_peso.delete(0, tk.END); self.pf_peso.insert(0, v[4])
-            self.pf_np.delete(0, tk.END); self.pf_np.insert(0, v[5])
-            self.pf_cod.delete(0, tk.END); self.pf_cod.insert(0, v[6])
-
-    def _cargar_proformas(self):
-        """Lista proformas ordenadas por fecha y número."""
-        for i in self.tv_pf.get_children():
-            self.tv_pf.delete(i)
-        sql = "SELECT Nro_Proforma, Item, Cantidad, Fecha, Peso, Nro_Parte, Codigo_Empleado FROM Proforma ORDER BY Fecha DESC, Nro_Proforma DESC;"
-        rows = self.client.select_rows(sql)
-        for r in rows:
-            self.tv_pf.insert("", tk.END, values=r)
+        if len(v) >= 4:
+            row = display(self.vl_pf.rows.get(sel[0], v))   # texto original (Tk convierte '0051' a 51)
+            nro = row[0]
+            self.pf_nro.delete(0, tk.END); self.pf_nro.insert(0, nro)
+            self.pf_fecha.delete(0, tk.END); self.pf_fecha.insert(0, v[1])
+            self.pf_cod.delete(0, tk.END); self.pf_cod.insert(0, v[2])
+            self.pf_ruc.delete(0, tk.END); self.pf_ruc.insert(0, row[3])
+            sql = ("SELECT Nro_Parte, Cantidad, Peso FROM Proforma_Detalle "
+                   "WHERE Nro_Proforma = %s ORDER BY Item;", [nro])
+            # Clave propia: no debe invalidar las páginas pendientes del listado ("proforma").
+            self._query_async("proforma.lineas", sql, self._pf_set_lines, self.PROFORMA_LINEA_ROW)
+
+    def _pf_set_lines(self, rows):
+        """Reemplaza las líneas en edición."""
+        self.pf_lines = [list(r) for r in rows]
+        self._pf_render_lines()
+
+    def _pf_render_lines(self, select=None):
+        """Pinta las líneas en edición (Item = posición) y opcionalmente selecciona una."""
+        self._fill_tree(self.tv_pf_lin, [[i + 1] + l for i, l in enumerate(self.pf_lines)])
+        if select is not None and 0 <= select < len(self.pf_lines):
+            iid = self.tv_pf_lin.get_children()[select]
+            self.tv_pf_lin.selection_set(iid)
+            self.tv_pf_lin.see(iid)
+
+    def _pf_linea_seleccionada(self):
+        """Índice (0..n-1) de la línea seleccionada, o None."""
+        sel = self.tv_pf_lin.selection()
+        return self.tv_pf_lin.index(sel[0]) if sel else None
+
+    def _pf_linea_on_select(self, _evt):
+        """Carga la línea seleccionada en los campos de edición."""
+        i = self._pf_linea_seleccionada()
+        if i is None:
+            return
+        np, cant, peso = self.pf_lines[i]
+        self.pf_np.delete(0, tk.END); self.pf_np.insert(0, np)
+        self.pf_cant.delete(0, tk.END); self.pf_cant.insert(0, cant)
+        self.pf_peso.delete(0, tk.END); self.pf_peso.insert(0, peso)
 
-    def _crear_proforma(self):
-        """Invoca sp_Agregar_Proforma validando tipos básicos."""
-        nro = self.pf_nro.get().strip()
-        item = self.pf_item.get().strip()
+    def _pf_linea_form(self):
+        """Lee y valida los campos de línea; devuelve [Nro_Parte, Cantidad, Peso] o None."""
+        np = self.pf_np.get().strip()
         cant = self.pf_cant.get().strip()
-        fecha = self.pf_fecha.get().strip()
         peso = self.pf_peso.get().strip()
-        np = self.pf_np.get().strip()
-        cod = self.pf_cod.get().strip()
-        if not (nro and item and cant and fecha and peso and np and cod):
-            messagebox.showwarning("Proforma", "Complete todos los campos.")
-            return
+        if not (np and cant and peso):
+            messagebox.showwarning("Proforma", "Complete Nro_Parte, Cantidad y Peso de la línea.")
+            return None
         try:
-            int(item); int(cant); float(peso)
-        except:
-            messagebox.showwarning("Proforma", "Item/Cantidad enteros, Peso decimal.")
+            icant = int(cant); dpeso = parse_decimal(peso)
+        except ValueError:
+            messagebox.showwarning("Proforma", "Cantidad entero, Peso decimal.")
+            return None
+        if icant <= 0 or dpeso < 0:
+            messagebox.showwarning("Proforma", "Cantidad mayor a 0 y Peso no negativo.")
+            return None
+        return [np, icant, peso]
+
+    def _pf_agregar_linea(self):
+        """Agrega la línea de los campos al final."""
+        line = self._pf_linea_form()
+        if line:
+            self.pf_lines.append(line)
+            self._pf_render_lines(select=len(self.pf_lines) - 1)
+
+    def _pf_modificar_linea(self):
+        """Reemplaza la línea seleccionada por la de los campos."""
+        i = self._pf_linea_seleccionada()
+        if i is None:
+            messagebox.showwarning("Proforma", "Seleccione una línea.")
             return
-        sql = "CALL sp_Agregar_Proforma(" + f"{self.client.esc(nro)}, {item}, {cant}, {self.client.esc(fecha)}, {peso}, {self.client.esc(np)}, {self.client.esc(cod)}" + ");"
-        ok, out = self.client.call_sp(sql)
-        if ok:
-            messagebox.showinfo("Proforma", "Creada.")
-            self._cargar_proformas()
-        else:
-            messagebox.showerror("Proforma", out)
+        line = self._pf_linea_form()
+        if line:
+            self.pf_lines[i] = line
+            self._pf_render_lines(select=i)
+
+    def _pf_quitar_linea(self):
+        """Quita la línea seleccionada (los Item se renumeran al guardar)."""
+        i = self._pf_linea_seleccionada()
+        if i is None:
+            messagebox.showwarning("Proforma", "Seleccione una línea.")
+            return
+        del self.pf_lines[i]
+        self._pf_render_lines(select=min(i, len(self.pf_lines) - 1))
 
-    def _actualizar_proforma(self):
-        """Invoca sp_Actualizar_Proforma."""
+    def _pf_limpiar(self):
+        """Vacía cabecera y líneas para empezar una proforma nueva."""
+        for e in (self.pf_nro, self.pf_fecha, self.pf_cod, self.pf_ruc, self.pf_np, self.pf_cant, self.pf_peso):
+            e.delete(0, tk.END)
+        self.executor.cancel("proforma.lineas")
+        self.pf_lines = []
+        self._pf_render_lines()
+
+    def _cargar_proformas(self):
+        """Lista proformas ordenadas por fecha y número (por páginas)."""
+        self.vl_pf.refresh()
+
+    def _pf_call(self, proc, ok_msg):
+        """
+        Valida la cabecera y envía cabecera + todas las líneas en un único CALL
+        (`proc` = sp_Agregar_Proforma / sp_Actualizar_Proforma, una sola transacción).
+        """
         nro = self.pf_nro.get().strip()
-        item = self.pf_item.get().strip()
-        cant = self.pf_cant.get().strip()
         fecha = self.pf_fecha.get().strip()
-        peso = self.pf_peso.get().strip()
-        np = self.pf_np.get().strip()
         cod = self.pf_cod.get().strip()
-        if not (nro and item and cant and fecha and peso and np and cod):
-            messagebox.showwarning("Proforma", "Complete todos los campos.")
+        ruc = self.pf_ruc.get().strip()
+        if not (nro and fecha and cod):
+            messagebox.showwarning("Proforma", "Complete Nro_Proforma, Fecha y Codigo_Empleado.")
+            return
+        if not self.pf_lines:
+            messagebox.showwarning("Proforma", "Agregue al menos una línea.")
             return
         try:
-            int(item); int(cant); float(peso)
-        except:
-            messagebox.showwarning("Proforma", "Item/Cantidad enteros, Peso decimal.")
+            fecha = date.fromisoformat(fecha)
+        except ValueError:
+            messagebox.showwarning("Proforma", "Fecha con formato AAAA-MM-DD.")
             return
-        sql = "CALL sp_Actualizar_Proforma(" + f"{self.client.esc(nro)}, {item}, {cant}, {self.client.esc(fecha)}, {peso}, {self.client.esc(np)}, {self.client.esc(cod)}" + ");"
-        ok, out = self.client.call_sp(sql)
-        if ok:
-            messagebox.showinfo("Proforma", "Actualizada.")
-            self._cargar_proformas()
-        else:
-            messagebox.showerror("Proforma", out)
+        lines = json.dumps([{"Nro_Parte": np, "Cantidad": int(cant), "Peso": str(peso)}
+                            for np, cant, peso in self.pf_lines], ensure_ascii=False)
+        check = [("empleado", cod), ("empresa", ruc)] + [("repuesto", np) for np, _c, _p in self.pf_lines]
+        self._run_sp("proforma", "Proforma", (proc, nro, fecha, cod, ruc or None, lines), ok_msg, self._cargar_proformas, check=check)
+
+    def _crear_proforma(self):
+        """Invoca sp_Agregar_Proforma con todas las líneas."""
+        self._pf_call("sp_Agregar_Proforma", "Creada.")
+
+    def _actualizar_proforma(self):
+        """Invoca sp_Actualizar_Proforma (reemplaza las líneas)."""
+        self._pf_call("sp_Actualizar_Proforma", "Actualizada.")
 
     def _eliminar_proforma(self):
         """Invoca sp_Eliminar_Proforma con confirmación."""
@@ -1213,50 +1716,88 @@ class MainApp(tk.Tk):
             messagebox.showwarning("Proforma", "Indique Nro_Proforma.")
             return
         if messagebox.askyesno("Confirmar", f"¿Eliminar proforma {nro}?"):
-            sql = "CALL sp_Eliminar_Proforma(" + f"{self.client.esc(nro)}" + ");"
-            ok, out = self.client.call_sp(sql)
-            if ok:
-                messagebox.showinfo("Proforma", "Eliminada.")
-                self._cargar_proformas()
+            self._run_sp("proforma", "Proforma", ("sp_Eliminar_Proforma", nro), "Eliminada.", self._cargar_proformas)
+
+    def _pdf_proforma(self):
+        """Genera el PDF de la proforma del formulario (ver proforma_pdf.py)."""
+        nro = self.pf_nro.get().strip()
+        if not nro:
+            messagebox.showwarning("Proforma", "Indique Nro_Proforma.")
+            return
+        path = filedialog.asksaveasfilename(title="Guardar PDF", defaultextension=".pdf",
+                                            initialfile=proforma_pdf.file_name(nro),
+                                            filetypes=[("PDF", "*.pdf")])
+        if not path:
+            return
+        self.executor.submit("proforma.pdf", lambda: proforma_pdf.render_one(self.client, nro, path),
+                             lambda pages: messagebox.showinfo("Proforma", f"PDF generado ({pages} página(s)):\n{path}"),
+                             on_error=lambda exc: messagebox.showerror("Proforma", str(exc)),
+                             replace=False)
+
+    def _pdf_rango(self):
+        """Genera en una carpeta los PDF de todas las proformas de un rango de fechas."""
+        desde = simpledialog.askstring("PDF por rango", "Desde (YYYY-MM-DD):", parent=self)
+        if not desde:
+            return
+        hasta = simpledialog.askstring("PDF por rango", "Hasta (YYYY-MM-DD):", parent=self, initialvalue=desde)
+        if not hasta:
+            return
+        out_dir = filedialog.askdirectory(title="Carpeta de destino")
+        if not out_dir:
+            return
+
+        def done(res):
+            if res.errors:
+                messagebox.showwarning("PDF por rango", res.summary())
             else:
-                messagebox.showerror("Proforma", out)
+                messagebox.showinfo("PDF por rango", res.summary())
+        self.executor.submit("proforma.pdf",
+                             lambda: proforma_pdf.render_range(self.client, desde.strip(), hasta.strip(), out_dir),
+                             done, on_error=lambda exc: messagebox.showerror("PDF por rango", str(exc)),
+                             replace=False)
 
     # -------- Reportes --------------------------------------------------------
     def _build_tab_reportes(self, parent):
-        """UI de reportes parametrizables (combobox + parámetro numérico)."""
+        """UI de reportes (definidos en reports.py): combobox + parámetros del reporte elegido."""
         frm = ttk.Frame(parent, padding=12)
         frm.pack(fill="both", expand=True)
 
         top = ttk.Frame(frm)
-        top.pack(fill="x")
+        top.pack(fill="x", pady=(0, 8))
 
         ttk.Label(top, text="Reporte").pack(side="left")
-        self.rep_var = tk.StringVar(value="Stock bajo")
+        self.rep_var = tk.StringVar(value=reports.REPORTS[0].title)
         self.cmb_rep = ttk.Combobox(top, textvariable=self.rep_var, state="readonly",
-                                    values=[
-                                        "Stock bajo",
-                                        "Proveedores y contacto",
-                                        "Órdenes recientes",
-                                        "Órdenes por empresa",
-                                        "Top empresas por monto",
-                                        "Repuestos más comprados",
-                                        "Proformas por empleado",
-                                        "Proformas por repuesto",
-                                        "Empresas sin órdenes (N días)",
-                                        "Proveedores sin órdenes"
-                                    ], width=34)
+                                    values=[r.title for r in reports.REPORTS], width=34)
         self.cmb_rep.pack(side="left", padx=8)
+        self.cmb_rep.bind("<<ComboboxSelected>>", lambda _e: self._rep_params())
 
-        ttk.Label(top, text=" Umbral/Parámetro:").pack(side="left")
-        self.e_param = ttk.Entry(top, width=10); self.e_param.insert(0, "3"); self.e_param.pack(side="left")
+        self.fr_rep_params = ttk.Frame(top)
+        self.fr_rep_params.pack(side="left")
+        self.rep_entries = {}
 
         ttk.Button(top, text="Mostrar", command=self._refrescar_reporte).pack(side="left", padx=8)
 
-        self.tv_rep = ttk.Treeview(frm, columns=(), show="headings")
-        self.tv_rep.pack(fill="both", expand=True, pady=8)
+        self.tv_rep, self.sb_rep = scrolled_treeview(frm, (), width=160, height=12)
+        self.vl_rep = None
+        self._rep_current = None   # (Report, valores) mostrado, para "Exportar…"
 
+        self._rep_params()
         self._refrescar_reporte()
 
+    def _rep_params(self):
+        """Arma los campos de parámetros del reporte elegido, con sus valores por defecto."""
+        for w in self.fr_rep_params.winfo_children():
+            w.destroy()
+        self.rep_entries = {}
+        for p in reports.BY_TITLE[self.rep_var.get()].params:
+            ttk.Label(self.fr_rep_params, text=f" {p.label}:").pack(side="left")
+            e = ttk.Entry(self.fr_rep_params, width=10)
+            if p.default is not None:
+                e.insert(0, str(p.default))
+            e.pack(side="left", padx=(2, 6))
+            self.rep_entries[p.name] = e
+
     def _set_report_columns(self, headers):
         """Configura columnas del Treeview de reportes y limpia las filas."""
         self.tv_rep["columns"] = headers
@@ -1265,155 +1806,130 @@ class MainApp(tk.Tk):
             self.tv_rep.heading(c, text=c)
             self.tv_rep.column(c, width=160, anchor="w")
 
-    def _refrescar_reporte(self):
-        """Genera el SQL según el tipo de reporte y vuelca los resultados al Treeview."""
-        tipo = self.rep_var.get()
+    def _query_bound_async(self, key, query, on_rows, on_drop=None):
+        """Como `_query_async`, con `query` = (sql, params) enlazados (ver reports.py)."""
+        self.executor.submit(key, lambda: self.client.select_typed(*query), on_rows, on_drop=on_drop)
 
-        if tipo == "Stock bajo":
-            try:
-                umbral = int(self.e_param.get().strip())
-            except:
-                messagebox.showwarning("Reporte", "Parámetro entero.")
-                return
-            self._set_report_columns(("Nro_Parte","Descripcion","Marca","Cantidad","Precio_Unitario"))
-            sql = f"SELECT Nro_Parte, Descripcion, Marca, Cantidad, Precio_Unitario FROM Repuesto WHERE Cantidad < {umbral} ORDER BY Cantidad ASC, Descripcion ASC;"
-            rows = self.client.select_rows(sql)
-            for r in rows:
-                self.tv_rep.insert("", tk.END, values=r)
-
-        elif tipo == "Proveedores y contacto":
-            self._set_report_columns(("RUC","Raz_Soc","Direccion","Telefono","Email"))
-            sql = """
-            SELECT p.RUC, p.Raz_Soc, IFNULL(p.Direccion,''), IFNULL(t.Telefono,''), IFNULL(e.Email,'')
-            FROM Proveedor p
-            LEFT JOIN Telefono_Proveedor t ON t.RUC_Proveedor = p.RUC
-            LEFT JOIN Email_Proveedor e ON e.RUC_Proveedor = p.RUC
-            ORDER BY p.Raz_Soc;
-            """
-            rows = self.client.select_rows(sql)
-            for r in rows:
-                self.tv_rep.insert("", tk.END, values=r)
-
-        elif tipo == "Órdenes recientes":
-            self._set_report_columns(("Nro_Orden","Fecha_Entrega","Precio_Neto","Empleado","Proveedor","Empresa"))
-            sql = """
-            SELECT oc.Nro_Orden, oc.Fecha_Entrega, oc.Precio_Neto, IFNULL(emp.Nombre,''), prov.Raz_Soc, empc.Raz_Soc
-            FROM Orden_Compra oc
-            LEFT JOIN Empleado emp ON emp.Codigo = oc.Codigo_Empleado
-            LEFT JOIN Proveedor prov ON prov.RUC = oc.RUC_Proveedor
-            LEFT JOIN Empresa empc ON empc.RUC = oc.RUC_Empresa
-            ORDER BY oc.Fecha_Entrega DESC, oc.Nro_Orden DESC
-            LIMIT 100;
-            """
-            rows = self.client.select_rows(sql)
-            for r in rows:
-                self.tv_rep.insert("", tk.END, values=r)
-
-        elif tipo == "Órdenes por empresa":
-            self._set_report_columns(("RUC_Empresa","Empresa","Total_Ordenes","Suma_Precio_Neto"))
-            sql = """
-            SELECT oc.RUC_Empresa, em.Raz_Soc, COUNT(*) AS Total_Ordenes, SUM(oc.Precio_Neto) AS Suma_Precio_Neto
-            FROM Orden_Compra oc
-            LEFT JOIN Empresa em ON em.RUC = oc.RUC_Empresa
-            GROUP BY oc.RUC_Empresa, em.Raz_Soc
-            ORDER BY Suma_Precio_Neto DESC;
-            """
-            rows = self.client.select_rows(sql)
-            for r in rows:
-                self.tv_rep.insert("", tk.END, values=r)
-
-        elif tipo == "Top empresas por monto":
-            self._set_report_columns(("Empresa","Monto_Total"))
-            sql = """
-            SELECT em.Raz_Soc, SUM(oc.Precio_Neto) AS Monto_Total
-            FROM Orden_Compra oc
-            INNER JOIN Empresa em ON em.RUC = oc.RUC_Empresa
-            GROUP BY em.Raz_Soc
-            ORDER BY Monto_Total DESC
-            LIMIT 10;
-            """
-            rows = self.client.select_rows(sql)
-            for r in rows:
-                self.tv_rep.insert("", tk.END, values=r)
+    def _refrescar_reporte(self):
+        """
+        Ejecuta el reporte elegido con sus parámetros enlazados. Los reportes con tope
+        ("top N") se traen en una consulta; los demás se cargan por páginas al hacer scroll.
+        """
+        report = reports.BY_TITLE[self.rep_var.get()]
+        try:
+            values = report.bind({name: e.get() for name, e in self.rep_entries.items()})
+        except ValueError as e:
+            messagebox.showwarning("Reporte", str(e))
+            return
 
-        elif tipo == "Repuestos más comprados":
-            # TOP N por cantidad en Proforma (parámetro en la caja)
-            try:
-                topn = int(self.e_param.get().strip() or "10")
-            except:
-                topn = 10
-            self._set_report_columns(("Nro_Parte", "Descripcion", "Total_Cant"))
-            sql = f"""
-            SELECT r.Nro_Parte, r.Descripcion, SUM(pf.Cantidad) AS Total_Cant
-            FROM Proforma pf
-            INNER JOIN Repuesto r ON r.Nro_Parte = pf.Nro_Parte
-            GROUP BY r.Nro_Parte, r.Descripcion
-            ORDER BY Total_Cant DESC
-            LIMIT {topn};
-            """
-            rows = self.client.select_rows(sql)
-            for r in rows:
-                self.tv_rep.insert("", tk.END, values=r)
-
-        elif tipo == "Proformas por empleado":
-            self._set_report_columns(("Empleado","Nro_Proformas","Total_Unidades"))
-            sql = """
-            SELECT e.Nombre, COUNT(*) AS Nro_Proformas, SUM(pf.Cantidad) AS Total_Unidades
-            FROM Proforma pf
-            INNER JOIN Empleado e ON e.Codigo = pf.Codigo_Empleado
-            GROUP BY e.Nombre
-            ORDER BY Nro_Proformas DESC;
-            """
-            rows = self.client.select_rows(sql)
-            for r in rows:
-                self.tv_rep.insert("", tk.END, values=r)
-
-        elif tipo == "Proformas por repuesto":
-            self._set_report_columns(("Nro_Parte","Descripcion","Nro_Proformas","Total_Unidades"))
-            sql = """
-            SELECT r.Nro_Parte, r.Descripcion, COUNT(*) AS Nro_Proformas, SUM(pf.Cantidad) AS Total_Unidades
-            FROM Proforma pf
-            INNER JOIN Repuesto r ON r.Nro_Parte = pf.Nro_Parte
-            GROUP BY r.Nro_Parte, r.Descripcion
-            ORDER BY Total_Unidades DESC;
-            """
-            rows = self.client.select_rows(sql)
-            for r in rows:
-                self.tv_rep.insert("", tk.END, values=r)
+        self._rep_current = (report, values)
+        self.executor.cancel("reportes" + self.PAGES)   # páginas pendientes del reporte anterior
+        self._set_report_columns(report.columns)
+        if report.row_limit(values) is not None:
+            self.vl_rep = None
+            self.tv_rep.configure(yscrollcommand=self.sb_rep.set)
+            self._query_bound_async("reportes", report.first_query(values),
+                                    lambda rows: self._fill_tree(self.tv_rep, rows))
+        else:
+            self.vl_rep = VirtualTreeview(
+                self.tv_rep, report.pager(values),
+                lambda query, done, dropped: self._query_bound_async("reportes" + self.PAGES, query, done, dropped),
+                scrollbar=self.sb_rep
+            )
+            self.vl_rep.reload()
+
+    # -------- Diagnóstico (oculta: Ctrl+Shift+D) --------------------------------
+    def _toggle_diagnostico(self, _evt=None):
+        """Muestra/oculta la pestaña Diagnóstico (la arma la primera vez)."""
+        if self.tab_diag is None:
+            self.tab_diag = ttk.Frame(self.nb)
+            self._tabs["diagnostico"] = (self.tab_diag, "Diagnóstico")
+            self._builders["diagnostico"] = self._build_tab_diagnostico
+        if str(self.tab_diag) in self.nb.tabs() and self.nb.tab(self.tab_diag, "state") != "hidden":
+            self.nb.hide(self.tab_diag)
+        else:
+            self.nb.add(self.tab_diag, text="Diagnóstico")
+            self.nb.select(self.tab_diag)
 
-        elif tipo == "Empresas sin órdenes (N días)":
-            # Lista empresas que no tienen OC en los últimos N días (param)
-            try:
-                ndias = int(self.e_param.get().strip())
-            except:
-                messagebox.showwarning("Reporte", "Parámetro entero (días).")
-                return
-            self._set_report_columns(("RUC","Empresa"))
-            sql = f"""
-            SELECT em.RUC, em.Raz_Soc
-            FROM Empresa em
-            LEFT JOIN Orden_Compra oc ON oc.RUC_Empresa = em.RUC AND oc.Fecha_Entrega >= DATE_SUB(CURDATE(), INTERVAL {ndias} DAY)
-            WHERE oc.Nro_Orden IS NULL
-            ORDER BY em.Raz_Soc;
-            """
-            rows = self.client.select_rows(sql)
-            for r in rows:
-                self.tv_rep.insert("", tk.END, values=r)
+    def _build_tab_diagnostico(self, parent):
+        """Sentencias más lentas y latencias por sentencia normalizada (ver db.QueryStats)."""
+        frm = ttk.Frame(parent, padding=12)
+        frm.pack(fill="both", expand=True)
 
-        else:
-            # Proveedores sin órdenes
-            self._set_report_columns(("RUC_Proveedor","Raz_Soc"))
-            sql = """
-            SELECT p.RUC, p.Raz_Soc
-            FROM Proveedor p
-            LEFT JOIN Orden_Compra oc ON oc.RUC_Proveedor = p.RUC
-            WHERE oc.Nro_Orden IS NULL
-            ORDER BY p.Raz_Soc;
-            """
-            rows = self.client.select_rows(sql)
-            for r in rows:
-                self.tv_rep.insert("", tk.END, values=r)
+        top = ttk.Frame(frm)
+        top.pack(fill="x", pady=(0, 8))
+        ttk.Button(top, text="Actualizar", command=self._cargar_diagnostico).pack(side="left")
+        ttk.Button(top, text="Guardar JSON…", command=self._guardar_diagnostico).pack(side="left", padx=6)
+        ttk.Button(top, text="Limpiar", command=self._limpiar_diagnostico).pack(side="left")
+        self.lbl_diag = ttk.Label(top, text="")
+        self.lbl_diag.pack(side="left", padx=12)
+
+        fr_slow = ttk.LabelFrame(frm, text="Sentencias más lentas (doble clic: copia el SQL)", padding=6)
+        fr_slow.pack(fill="both", expand=True)
+        cols = ("Total ms", "Conexión", "Ejecución", "Transferencia", "Parseo", "Filas", "Bytes", "Hora", "SQL")
+        self.tv_diag_slow, _sb = scrolled_treeview(fr_slow, cols, width=80, height=10)
+        self.tv_diag_slow.column("SQL", width=520)
+        self.tv_diag_slow.bind("<Double-1>", lambda _e: self._copiar_sql(self.tv_diag_slow))
+
+        fr_hist = ttk.LabelFrame(frm, text="Por sentencia (literales como ?)", padding=6)
+        fr_hist.pack(fill="both", expand=True, pady=(8, 0))
+        cols = ("Veces", "Prom. ms", "p50 ms", "p95 ms", "Máx ms", "Total ms", "SQL")
+        self.tv_diag_hist, _sb = scrolled_treeview(fr_hist, cols, width=80, height=8)
+        self.tv_diag_hist.column("SQL", width=600)
+        self.tv_diag_hist.bind("<Double-1>", lambda _e: self._copiar_sql(self.tv_diag_hist))
+
+        self._cargar_diagnostico()
+
+    def _cargar_diagnostico(self):
+        """Vuelca las mediciones actuales del cliente en las tablas."""
+        stats = self.client.stats
+        if stats is None:
+            self.lbl_diag.configure(text='Instrumentación desactivada ("stats": false en config.json).')
+            return
+        ms = lambda sec: f"{sec * 1000:.1f}"
+        slow = []
+        for r in stats.slowest(100):
+            p = r.phases
+            slow.append((ms(r.total), ms(p.get("spawn", 0) + p.get("connect", 0)), ms(p.get("execute", 0)),
+                         ms(p.get("transfer", 0)), ms(p.get("parse", 0)),
+                         "" if r.rows is None else r.rows, "" if r.bytes is None else r.bytes,
+                         time.strftime("%H:%M:%S", time.localtime(r.started)),
+                         ("" if r.ok else "[ERROR] ") + " ".join(r.sql.split())))
+        self._fill_tree(self.tv_diag_slow, slow)
+        hist = stats.histograms()
+        self._fill_tree(self.tv_diag_hist, [(h["count"], h["avg_ms"], h["p50_ms"], h["p95_ms"], h["max_ms"],
+                                             h["total_ms"], h["fingerprint"]) for h in hist])
+        text = f"{len(stats.recent())} sentencias medidas, {len(hist)} distintas · backend {self.client.backend}"
+        cache = self.client.cache_stats()
+        if cache is not None:
+            text += f" · caché {cache['hits']}/{cache['hits'] + cache['misses']} aciertos"
+        self.lbl_diag.configure(text=text)
+
+    def _copiar_sql(self, tv):
+        sel = tv.selection()
+        if sel:
+            self.clipboard_clear()
+            self.clipboard_append(tv.item(sel[0], "values")[-1])
+
+    def _guardar_diagnostico(self):
+        """Guarda las sentencias más lentas y los histogramas en JSON."""
+        if self.client.stats is None:
+            return
+        path = filedialog.asksaveasfilename(title="Guardar diagnóstico", defaultextension=".json",
+                                            initialfile=time.strftime("diagnostico_%Y%m%d_%H%M%S.json"),
+                                            filetypes=[("JSON", "*.json")])
+        if path:
+            self.client.stats.dump(path)
+            messagebox.showinfo("Diagnóstico", f"Guardado en\n{path}")
+
+    def _limpiar_diagnostico(self):
+        if self.client.stats is not None:
+            self.client.stats.clear()
+        self._cargar_diagnostico()
 
 if __name__ == "__main__":
-    app = MainApp()
+    multiprocessing.freeze_support()   # el .exe de PyInstaller relanza este script para los procesos de PDF
+    trace.mark("imports")
+    with trace.phase("MainApp()"):
+        app = MainApp()
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,307 @@
+"""
+Benchmark de la app contra una BD local (idealmente llenada con datagen.py).
+
+Mide la carga de cada listado (`_cargar_*`: completos y primeras páginas), cada reporte,
+la búsqueda de repuestos y cada procedimiento almacenado que llama la app (en un ciclo
+crear → actualizar → eliminar sobre claves propias, que no deja datos). Los resultados se
+guardan en benchmarks/<etiqueta>.json (etiqueta = `git describe` por defecto), para ver
+regresiones entre versiones.
+
+Uso sin interfaz gráfica:
+    python benchmark.py [--config config.json] [--database ...] [--repeticiones 5] [--etiqueta v1]
+    python benchmark.py --comparar benchmarks/v1.json [--umbral 20]
+    python benchmark.py --historial
+"""
+import argparse
+import datetime
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from decimal import Decimal
+import explain
+from db import MySQLClient
+from settings import CONFIG_PATH, load_config
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(HERE, "benchmarks")
+TABLES = ("Empleado", "Proveedor", "Empresa", "Repuesto", "Orden_Compra", "Proforma", "Proforma_Detalle")
+NOISE_MS = 1.0   # diferencias menores no cuentan como regresión
+
+# Claves del ciclo de procedimientos (fuera de los rangos de datagen.py y del seed).
+B_EMP, B_PROV, B_CLI, B_PARTE, B_OC, B_PF = "E9999", "99999999901", "99999999902", "BENCH00001", "BENCH00001", "BENCH00001"
+
+
+def sp_cycle(client):
+    """
+    Llamadas del ciclo de procedimientos, en orden: altas, cambios y bajas de todas las
+    entidades (cada baja deshace su alta). sp_Importar_Repuestos se mide sobre un lote de
+    una fila preparado antes de la llamada.
+
+    Returns
+    -------
+    list[tuple[str, tuple | callable]]
+        (procedimiento, parámetros para `MySQLClient.call`) o (procedimiento, función que
+        arma los parámetros justo antes de la llamada).
+    """
+    today = datetime.date.today()
+    lines = json.dumps([{"Nro_Parte": B_PARTE, "Cantidad": 2, "Peso": "1.500"}])
+    lines2 = json.dumps([{"Nro_Parte": B_PARTE, "Cantidad": 3, "Peso": "1.500"},
+                         {"Nro_Parte": B_PARTE, "Cantidad": 1, "Peso": "0.500"}])
+    oc = ("UND", today, Decimal("150.00"), 1)
+    oc_tail = ("UND", "Contado", "FOB", "Benchmark", B_EMP, B_PROV, B_CLI, B_PARTE)
+
+    def importar():
+        lote = uuid.uuid4().hex
+        client.execute("INSERT INTO Repuesto_Staging (Lote, Nro_Parte, Descripcion, Marca, Status, Precio_Unitario, "
+                       "Cantidad) VALUES (%s, %s, 'Repuesto de benchmark', 'Bench', NULL, 12.50, NULL);",
+                       [lote, B_PARTE])
+        return (lote,)
+
+    return [
+        ("sp_Agregar_Empleado", (B_EMP, "Benchmark", "999999999")),
+        ("sp_Actualizar_Empleado", (B_EMP, "Benchmark 2", "999999998")),
+        ("sp_Agregar_Proveedor", (B_PROV, "Proveedor Bench", "Av. Bench 1", "011111111", "bench@proveedor.pe")),
+        ("sp_Actualizar_Proveedor", (B_PROV, "Proveedor Bench 2", "Av. Bench 2", "011111112", "bench2@proveedor.pe")),
+        ("sp_Agregar_Empresa", (B_CLI, "Empresa Bench", None, "Lima", "Av. Bench 1", "Centro", "999999997",
+                                "bench@cliente.pe")),
+        ("sp_Actualizar_Empresa", (B_CLI, "Empresa Bench 2", None, "Lima", "Av. Bench 2", "Centro", "999999996",
+                                   "bench2@cliente.pe")),
+        ("sp_Agregar_Repuesto", (B_PARTE, "Repuesto de benchmark", "Bench", "Almacen", Decimal("10.00"), 100)),
+        ("sp_Actualizar_Repuesto", (B_PARTE, "Repuesto de benchmark", "Bench", "Almacen", Decimal("11.00"), 100)),
+        ("sp_Actualizar_Stock", (B_PARTE, 5, "SUMA")),
+        ("sp_Importar_Repuestos", importar),
+        ("sp_Registrar_OrdenCompra", (B_OC, *oc, 10, *oc_tail)),
+        ("sp_Actualizar_OrdenCompra", (B_OC, *oc, 12, *oc_tail)),
+        ("sp_Agregar_Proforma", (B_PF, today, B_EMP, B_CLI, lines)),
+        ("sp_Actualizar_Proforma", (B_PF, today, B_EMP, B_CLI, lines2)),
+        ("sp_Eliminar_Proforma", (B_PF,)),
+        ("sp_Eliminar_OrdenCompra", (B_OC, B_PARTE)),
+        ("sp_Eliminar_Repuesto", (B_PARTE,)),
+        ("sp_Eliminar_Empresa", (B_CLI,)),
+        ("sp_Eliminar_Proveedor", (B_PROV,)),
+        ("sp_Eliminar_Empleado", (B_EMP,)),
+    ]
+
+
+def cleanup(client):
+    """Borra restos de un ciclo interrumpido (los errores se ignoran: puede no haber nada)."""
+    for name, args in sp_cycle(client):
+        if name.startswith("sp_Eliminar_"):
+            client.call(name, *args)
+    client.execute("DELETE FROM Repuesto_Staging WHERE Nro_Parte = %s;", [B_PARTE])
+
+
+def _summary(kind, times, rows=None, error=None):
+    ms = sorted(t * 1000 for t in times)
+    out = {"tipo": kind}
+    if ms:
+        out.update({
+            "mediana_ms": round(statistics.median(ms), 3),
+            "p95_ms": round(ms[min(len(ms) - 1, int(0.95 * len(ms)))], 3),
+            "min_ms": round(ms[0], 3),
+            "n": len(ms),
+        })
+    if rows is not None:
+        out["filas"] = rows
+    if error:
+        out["error"] = error
+    return out
+
+
+def bench_queries(client, repeat):
+    """Listados, reportes, búsqueda y PDF (ver `explain.queries`): 1 calentamiento + `repeat` corridas."""
+    results = {}
+    for name, sql, params in explain.queries(client):
+        try:
+            rows = client.select_typed(sql, params, strict=True)
+            times = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                rows = client.select_typed(sql, params, strict=True)
+                times.append(time.perf_counter() - t0)
+            results[name] = _summary("consulta", times, len(rows))
+        except RuntimeError as e:
+            results[name] = _summary("consulta", [], error=str(e).strip())
+    return results
+
+
+def bench_procedures(client, repeat, rebuild=True):
+    """
+    `repeat` ciclos de procedimientos; si una llamada falla se corta el ciclo y se limpia.
+    sp_Reconstruir_Resumenes (recorre todas las tablas) se mide una sola vez.
+    """
+    times, errors = {}, {}
+    cleanup(client)
+    for _ in range(repeat):
+        for name, args in sp_cycle(client):
+            if callable(args):
+                args = args()
+            t0 = time.perf_counter()
+            ok, out = client.call(name, *args)
+            elapsed = time.perf_counter() - t0
+            if not ok:
+                errors[name] = out.strip()
+                cleanup(client)
+                break
+            times.setdefault(name, []).append(elapsed)
+        else:
+            continue
+        break
+    results = {f"SP: {name}": _summary("sp", t) for name, t in times.items()}
+    for name, err in errors.items():
+        results[f"SP: {name}"] = _summary("sp", times.get(name, []), error=err)
+    if rebuild:
+        t0 = time.perf_counter()
+        ok, out = client.call("sp_Reconstruir_Resumenes")
+        results["SP: sp_Reconstruir_Resumenes"] = _summary("sp", [time.perf_counter() - t0],
+                                                          error=None if ok else out.strip())
+    return results
+
+
+def metadata(client, label, repeat):
+    rows = {}
+    for table in TABLES:
+        found = client.query("SELECT TABLE_ROWS FROM information_schema.tables WHERE table_schema = DATABASE() "
+                             "AND LOWER(table_name) = %s;", [table.lower()])
+        rows[table] = int(found[0][0]) if found and found[0][0] is not None else None
+    return {
+        "etiqueta": label,
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "mysql": client.select_scalar("SELECT VERSION();"),
+        "backend": client.backend,
+        "base": client.database,
+        "repeticiones": repeat,
+        "filas_aprox": rows,
+    }
+
+
+def git_label():
+    """`git describe --always --dirty` del repositorio, o la fecha si no hay git."""
+    try:
+        out = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=HERE,
+                             capture_output=True, text=True, check=False).stdout.strip()
+    except OSError:
+        out = ""
+    return out or time.strftime("%Y%m%d_%H%M%S")
+
+
+def run(client, repeat=5, label=None, procedures=True, rebuild=True):
+    """Benchmark completo. Devuelve {"meta": ..., "resultados": {caso: resumen}}."""
+    results = bench_queries(client, repeat)
+    if procedures:
+        results.update(bench_procedures(client, repeat, rebuild))
+    return {"meta": metadata(client, label or git_label(), repeat), "resultados": results}
+
+
+def compare(old, new, threshold=20.0):
+    """
+    Compara dos corridas caso por caso (mediana).
+
+    Returns
+    -------
+    (str, list[str])
+        Texto de la comparación y casos que empeoraron más de `threshold` %.
+    """
+    lines = [f"{'caso':<60} {old['meta']['etiqueta']:>14} {new['meta']['etiqueta']:>14}   cambio"]
+    regressions = []
+    for name, res in new["resultados"].items():
+        prev = old["resultados"].get(name, {})
+        a, b = prev.get("mediana_ms"), res.get("mediana_ms")
+        if a is None or b is None:
+            lines.append(f"{name[:60]:<60} {a if a is not None else '-':>14} {b if b is not None else '-':>14}"
+                         f"   {res.get('error', '')[:40]}")
+            continue
+        change = (b - a) / a * 100 if a > 0 else 0.0
+        flag = ""
+        if change > threshold and b - a > NOISE_MS:
+            flag = "  << REGRESIÓN"
+            regressions.append(name)
+        lines.append(f"{name[:60]:<60} {a:>14.1f} {b:>14.1f} {change:>+7.0f}%{flag}")
+    return "\n".join(lines), regressions
+
+
+def history(paths):
+    """Tabla con la mediana (ms) de cada caso en cada corrida guardada, de la más vieja a la más nueva."""
+    runs = []
+    for p in paths:
+        with open(p, "r", encoding="utf-8") as f:
+            runs.append(json.load(f))
+    runs.sort(key=lambda r: r["meta"]["fecha"])
+    names = []
+    for r in runs:
+        names += [n for n in r["resultados"] if n not in names]
+    lines = [f"{'caso':<60}" + "".join(f" {r['meta']['etiqueta'][:12]:>12}" for r in runs)]
+    for n in names:
+        cells = [r["resultados"].get(n, {}).get("mediana_ms") for r in runs]
+        lines.append(f"{n[:60]:<60}" + "".join(f" {c:>12.1f}" if c is not None else f" {'-':>12}" for c in cells))
+    return "\n".join(lines)
+
+
+def report_text(data):
+    lines = [f"{data['meta']['etiqueta']} · {data['meta']['fecha']} · MySQL {data['meta']['mysql']} · "
+             f"{data['meta']['backend']}"]
+    for name, res in data["resultados"].items():
+        if "error" in res:
+            lines.append(f"{name[:60]:<60} ERROR: {res['error'][:80]}")
+        elif "mediana_ms" in res:
+            filas = f"{res['filas']} filas" if "filas" in res else ""
+            lines.append(f"{name[:60]:<60} {res['mediana_ms']:>9.1f} ms  p95 {res['p95_ms']:>9.1f}  {filas}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark de listados, reportes y procedimientos.")
+    ap.add_argument("--config", default=CONFIG_PATH)
+    ap.add_argument("--database", help="BD a medir (por defecto, la de config.json)")
+    ap.add_argument("--repeticiones", type=int, default=5)
+    ap.add_argument("--etiqueta", help="nombre de la corrida (por defecto, git describe)")
+    ap.add_argument("--sin-procedimientos", action="store_true", help="solo consultas (no escribe en la BD)")
+    ap.add_argument("--sin-reconstruir", action="store_true", help="no mide sp_Reconstruir_Resumenes")
+    ap.add_argument("--comparar", help="JSON de una corrida anterior")
+    ap.add_argument("--umbral", type=float, default=20.0, help="%% de empeoramiento que cuenta como regresión")
+    ap.add_argument("--historial", action="store_true", help="tabla de todas las corridas guardadas")
+    args = ap.parse_args(argv)
+
+    if args.historial:
+        paths = sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")))
+        print(history(paths) if paths else f"No hay corridas en {RESULTS_DIR}.")
+        return 0
+
+    cfg = load_config(args.config)
+    if args.database:
+        cfg["database"] = args.database
+    cfg["cache"] = False   # se mide el servidor, no la caché de lecturas
+    cfg["stats"] = False
+    cfg["replica"] = None   # ni lecturas locales ni cola: todo va al servidor
+    client = MySQLClient(**cfg)
+    try:
+        data = run(client, args.repeticiones, args.etiqueta,
+                   procedures=not args.sin_procedimientos, rebuild=not args.sin_reconstruir)
+    finally:
+        client.close()
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, data["meta"]["etiqueta"].replace(os.sep, "_") + ".json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    print(report_text(data))
+    print(f"\nGuardado en {path}")
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        text, regressions = compare(old, data, args.umbral)
+        print("\n" + text)
+        if regressions:
+            print(f"\n{len(regressions)} casos empeoraron más de {args.umbral:.0f} %.", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
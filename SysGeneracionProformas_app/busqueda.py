@@ -0,0 +1,155 @@
+"""
+Búsqueda de repuestos mientras se escribe (pestaña Inventario).
+
+El texto se resuelve en el servidor con los índices de sql/busqueda.sql y solo vuelven
+las primeras `limit` coincidencias, en este orden:
+  1. Nro_Parte que empieza con el texto, si es una sola palabra (rango sobre la PK),
+  2. Marca que empieza con la primera palabra (y, si hay más, la descripción las contiene),
+  3. descripción con todas las palabras (FULLTEXT, de mayor a menor relevancia).
+
+Uso sin interfaz gráfica:
+    python busqueda.py "filtro aceite" [--limite 50] [--config config.json]
+"""
+import argparse
+import re
+import sys
+import time
+from decimal import Decimal
+from db import MySQLClient
+from rows import RowType, display
+from settings import CONFIG_PATH, load_config
+
+LIMIT = 50
+FT_MIN_TOKEN = 3   # innodb_ft_min_token_size: palabras más cortas no están en el índice FULLTEXT
+COLUMNS = ("Nro_Parte", "Descripcion", "Marca", "Status", "Precio_Unitario", "Cantidad")
+ROW = RowType("Repuesto", list(zip(COLUMNS, (str, str, str, str, Decimal, int))))
+_MATCH = RowType("Coincidencia", list(zip(COLUMNS, ROW.types)) + [("Orden", int), ("Relevancia", float)])
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_SELECT = "SELECT Nro_Parte, Descripcion, Marca, Status, Precio_Unitario, Cantidad"
+
+
+def words(text):
+    """Palabras del texto (sin los operadores de MATCH ... IN BOOLEAN MODE)."""
+    return _WORD.findall(text or "")
+
+
+def _like_prefix(text):
+    return re.sub(r"([\\%_])", r"\\\1", text) + "%"
+
+
+def _fulltext(ws):
+    """Expresión booleana: todas las palabras indexables, como prefijo (`+filt* +acei*`)."""
+    return " ".join(f"+{w}*" for w in ws if len(w) >= FT_MIN_TOKEN)
+
+
+def _short_filter(ws, params):
+    """Palabras muy cortas para FULLTEXT: se exigen con LIKE sobre las filas ya filtradas."""
+    conds = []
+    for w in ws:
+        if len(w) < FT_MIN_TOKEN:
+            conds.append("Descripcion LIKE %s")
+            params.append("%" + _like_prefix(w))
+    return conds
+
+
+def search_query(text, limit=LIMIT):
+    """
+    SQL y parámetros de la búsqueda de `text`.
+
+    Params
+    ------
+    text : str
+        Lo escrito por el usuario.
+    limit : int
+        Máximo de filas por criterio (y en total, ver `search`).
+
+    Returns
+    -------
+    (str, list) | None
+        None si el texto no tiene palabras.
+    """
+    ws = words(text)
+    if not ws:
+        return None
+    limit = int(limit)
+    branches, params = [], []
+    code = text.strip()
+    if not any(c.isspace() for c in code):   # un código se escribe completo: "FIL-12", no "FIL 12"
+        branches.append(f"({_SELECT}, 0 AS Orden, 0 AS Relevancia FROM Repuesto "
+                        f"WHERE Nro_Parte LIKE %s ORDER BY Nro_Parte LIMIT {limit})")
+        params.append(_like_prefix(code))
+
+    conds = ["Marca LIKE %s"]
+    params.append(_like_prefix(ws[0]))
+    rest = _fulltext(ws[1:])
+    if rest:
+        conds.append("MATCH(Descripcion) AGAINST (%s IN BOOLEAN MODE)")
+        params.append(rest)
+    conds += _short_filter(ws[1:], params)
+    branches.append(f"({_SELECT}, 1 AS Orden, 0 AS Relevancia FROM Repuesto "
+                    f"WHERE {' AND '.join(conds)} ORDER BY Marca, Nro_Parte LIMIT {limit})")
+
+    terms = _fulltext(ws)
+    if terms:
+        params += [terms, terms]
+        conds = ["MATCH(Descripcion) AGAINST (%s IN BOOLEAN MODE)"] + _short_filter(ws, params)
+        branches.append(f"({_SELECT}, 2 AS Orden, MATCH(Descripcion) AGAINST (%s IN BOOLEAN MODE) AS Relevancia "
+                        f"FROM Repuesto WHERE {' AND '.join(conds)} ORDER BY Relevancia DESC, Nro_Parte LIMIT {limit})")
+    sql = " UNION ALL ".join(branches) + " ORDER BY Orden, Relevancia DESC;"
+    return sql, params
+
+
+def search(client, text, limit=LIMIT):
+    """
+    Repuestos que coinciden con `text`, sin repetidos y como máximo `limit`.
+
+    Returns
+    -------
+    list[ROW.record]
+        Repuestos con las columnas de `COLUMNS`.
+
+    Raises
+    ------
+    RuntimeError
+        Si la consulta falla (p. ej. falta aplicar sql/busqueda.sql).
+    """
+    query = search_query(text, limit)
+    if query is None:
+        return []
+    seen, out = set(), []
+    for row in client.select_typed(*query, strict=True, row=_MATCH):
+        if row.Nro_Parte not in seen:
+            seen.add(row.Nro_Parte)
+            out.append(ROW.record._make(row[:len(COLUMNS)]))
+            if len(out) >= limit:
+                break
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Busca repuestos por Nro_Parte, marca o palabras de la descripción.")
+    ap.add_argument("texto")
+    ap.add_argument("--limite", type=int, default=LIMIT)
+    ap.add_argument("--config", default=CONFIG_PATH)
+    args = ap.parse_args(argv)
+
+    client = MySQLClient(**load_config(args.config))
+    try:
+        t0 = time.perf_counter()
+        rows = search(client, args.texto, args.limite)
+        ms = (time.perf_counter() - t0) * 1000
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        client.close()
+    print("\t".join(COLUMNS))
+    for row in rows:
+        print("\t".join(display(row)))
+    print(f"{len(rows)} repuestos en {ms:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+"""
+Modo sin interfaz para tareas programadas e integraciones: reportes, alta de proformas y
+órdenes de compra desde archivos, ajustes de stock y migraciones, sin Tk ni las ventanas de
+conexión / login (toma config.json directamente).
+
+La salida es legible por máquina: una línea JSON por fila o por registro procesado (JSON
+Lines) en STDOUT; los mensajes van a STDERR. Códigos de salida: 0 ok, 1 error, 2 si algún
+registro del archivo falló (los demás se aplican igual). Con réplica local (ver replica.py)
+las altas sin conexión quedan en cola y se informan con "en_cola": true.
+
+Arranque: al inicio solo se cargan db.py, replica.py y settings.py; cada subcomando importa
+su módulo (reports, stock, migrations) al usarse.
+
+    python cli.py reporte --list
+    python cli.py reporte stock_bajo umbral=5 [--formato tsv]
+    python cli.py proforma proformas.json [--actualizar]
+    python cli.py oc ordenes.csv
+    python cli.py stock ajustes.txt
+    python cli.py init [--status] [--force]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+from db import MySQLClient
+from importer import csv_dialect
+from replica import QUEUED
+from rows import parse_decimal
+from settings import CONFIG_PATH, load_config, resource_path
+
+PROFORMA_FIELDS = ("Nro_Proforma", "Fecha", "Codigo_Empleado", "RUC_Empresa")
+LINE_FIELDS = ("Nro_Parte", "Cantidad", "Peso")
+# Parámetros de sp_Registrar_OrdenCompra, en orden (Incoterms_2000 es el único opcional).
+OC_FIELDS = ("Nro_Orden", "Per_UM", "Fecha_Entrega", "Precio_Neto", "Item", "Cantidad", "UM",
+             "Forma_pago", "Incoterms_2000", "Desc_Orden", "Codigo_Empleado", "RUC_Proveedor",
+             "RUC_Empresa", "Nro_Parte")
+
+
+def _json_value(value):
+    """Valores que `json` no serializa: Decimal como texto (sin perder precisión) y fechas ISO."""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"No serializable: {type(value).__name__}")
+
+
+def emit(obj, out=None):
+    """Escribe `obj` como una línea JSON."""
+    print(json.dumps(obj, ensure_ascii=False, default=_json_value), file=out or sys.stdout)
+
+
+def _text(record, name):
+    """Campo de texto sin espacios ('' si falta o es null)."""
+    value = record.get(name)
+    return "" if value is None else str(value).strip()
+
+
+def load_records(path):
+    """
+    Lee los registros de un archivo.
+
+    Params
+    ------
+    path : str
+        .json (un objeto o una lista), .jsonl (un objeto por línea) o .csv con encabezado
+        (separado por , ; o tab, UTF-8). '-' lee JSON / JSON Lines de STDIN.
+
+    Returns
+    -------
+    list[dict]
+
+    Raises
+    ------
+    ValueError
+        Si el archivo no tiene un formato admitido.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            return [{k.strip(): v for k, v in r.items() if k} for r in csv.DictReader(f, dialect=csv_dialect(f))]
+    if path == "-":
+        text = sys.stdin.read()
+    else:
+        with open(path, "r", encoding="utf-8-sig") as f:
+            text = f.read()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            data = [json.loads(line) for line in text.splitlines() if line.strip()]
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: JSON inválido ({e})") from None
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list) or not all(isinstance(r, dict) for r in data):
+        raise ValueError(f"{path}: se esperaba un objeto o una lista de objetos")
+    return data
+
+
+def group_proformas(records):
+    """
+    Agrupa los registros por Nro_Proforma.
+
+    Un registro puede traer sus líneas en "Lineas" (JSON) o ser una fila plana con la
+    cabecera y una línea (CSV): las filas con el mismo Nro_Proforma forman una proforma
+    y la cabecera se toma de la primera.
+
+    Returns
+    -------
+    list[dict]
+        Cabeceras con "Lineas" = lista de dicts, en el orden del archivo.
+    """
+    out = {}
+    for r in records:
+        nro = _text(r, "Nro_Proforma")
+        pf = out.get(nro)
+        if pf is None:
+            pf = out[nro] = {k: r.get(k) for k in PROFORMA_FIELDS}
+            pf["Lineas"] = []
+        if "Lineas" in r:
+            pf["Lineas"].extend(r["Lineas"] or [])
+        elif any(_text(r, k) for k in LINE_FIELDS):
+            pf["Lineas"].append({k: r.get(k) for k in LINE_FIELDS})
+    return list(out.values())
+
+
+def proforma_call(pf, proc="sp_Agregar_Proforma"):
+    """
+    CALL de una proforma con todas sus líneas (mismas reglas que la pestaña Proforma).
+
+    Returns
+    -------
+    tuple
+        (procedimiento, parámetros...) para `MySQLClient.call`.
+
+    Raises
+    ------
+    ValueError
+        Si falta un campo obligatorio o un valor no es del tipo esperado.
+    """
+    nro, fecha, cod, ruc = (_text(pf, k) for k in PROFORMA_FIELDS)
+    if not (nro and fecha and cod):
+        raise ValueError("Complete Nro_Proforma, Fecha y Codigo_Empleado.")
+    if not pf["Lineas"]:
+        raise ValueError("Agregue al menos una línea.")
+    try:
+        fecha = date.fromisoformat(fecha)
+    except ValueError:
+        raise ValueError("Fecha con formato AAAA-MM-DD.") from None
+    lines = []
+    for i, line in enumerate(pf["Lineas"], 1):
+        np = _text(line, "Nro_Parte")
+        try:
+            cant = int(_text(line, "Cantidad"))
+            peso = parse_decimal(_text(line, "Peso"))
+        except ValueError:
+            raise ValueError(f"Línea {i}: Cantidad entero, Peso decimal.") from None
+        if not np or cant <= 0 or peso < 0:
+            raise ValueError(f"Línea {i}: Nro_Parte obligatorio, Cantidad mayor a 0 y Peso no negativo.")
+        lines.append({"Nro_Parte": np, "Cantidad": cant, "Peso": str(peso)})
+    return (proc, nro, fecha, cod, ruc or None, json.dumps(lines, ensure_ascii=False))
+
+
+def oc_call(record):
+    """
+    CALL de sp_Registrar_OrdenCompra para un registro (mismas reglas que la pestaña OC).
+
+    Raises
+    ------
+    ValueError
+        Si falta un campo obligatorio o un valor no es del tipo esperado.
+    """
+    values = {k: _text(record, k) for k in OC_FIELDS}
+    missing = [k for k in OC_FIELDS if not values[k] and k != "Incoterms_2000"]
+    if missing:
+        raise ValueError("Faltan campos obligatorios: " + ", ".join(missing))
+    try:
+        values["Item"] = int(values["Item"])
+        values["Cantidad"] = int(values["Cantidad"])
+        values["Precio_Neto"] = parse_decimal(values["Precio_Neto"])
+    except ValueError:
+        raise ValueError("Item/Cantidad enteros, Precio decimal.") from None
+    try:
+        values["Fecha_Entrega"] = date.fromisoformat(values["Fecha_Entrega"])
+    except ValueError:
+        raise ValueError("Fecha_Entrega con formato AAAA-MM-DD.") from None
+    return ("sp_Registrar_OrdenCompra",) + tuple(values[k] for k in OC_FIELDS)
+
+
+def apply_calls(client, items, key):
+    """
+    Ejecuta un CALL por registro y emite una línea JSON con el resultado de cada uno.
+
+    Params
+    ------
+    items : list[tuple[dict, callable]]
+        (registro, función registro -> tupla de `MySQLClient.call`).
+    key : str
+        Campo que identifica el registro en la salida.
+
+    Returns
+    -------
+    int
+        0 si todos fueron ok, 2 si alguno falló.
+    """
+    failed = 0
+    for record, build in items:
+        res = {key: record.get(key)}
+        try:
+            ok, out = client.call(*build(record))
+        except ValueError as e:
+            ok, out = False, str(e)
+        res["ok"] = ok
+        if ok and out == QUEUED:
+            res["en_cola"] = True   # sin conexión: se envía con la próxima sincronización de la réplica
+        if not ok:
+            res["error"] = out.strip()
+            failed += 1
+        emit(res)
+    return 2 if failed else 0
+
+
+def cmd_reporte(client, args):
+    import reports
+    if args.list or not args.reporte:
+        for r in reports.REPORTS:
+            emit({"reporte": r.key, "titulo": r.title, "columnas": list(r.columns),
+                  "parametros": {p.name: p.default for p in r.params}})
+        return 0
+    report = reports.BY_KEY.get(args.reporte)
+    if report is None:
+        print(f"Reporte desconocido: {args.reporte} (ver --list)", file=sys.stderr)
+        return 1
+    raw = dict(p.split("=", 1) for p in args.param if "=" in p)
+    try:
+        values = report.bind(raw)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    rows = reports.iter_rows(client, report, values, args.page_size, strict=True)
+    try:
+        if args.formato == "tsv":
+            print("\t".join(report.columns))
+            for row in rows:
+                print("\t".join("" if v is None else str(v) for v in row))
+        else:
+            for row in rows:
+                emit(dict(zip(report.columns, row)))
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_proforma(client, args):
+    proc = "sp_Actualizar_Proforma" if args.actualizar else "sp_Agregar_Proforma"
+    proformas = group_proformas(load_records(args.archivo))
+    return apply_calls(client, [(pf, lambda pf: proforma_call(pf, proc)) for pf in proformas], "Nro_Proforma")
+
+
+def cmd_oc(client, args):
+    return apply_calls(client, [(r, oc_call) for r in load_records(args.archivo)], "Nro_Orden")
+
+
+def cmd_stock(client, args):
+    import stock
+    if args.archivo == "-":
+        text = sys.stdin.read()
+    else:
+        with open(args.archivo, "r", encoding="utf-8-sig") as f:
+            text = f.read()
+    entries, errors = stock.parse_adjustments(text)
+    for line_no, msg in errors:
+        emit({"linea": line_no, "ok": False, "error": msg})
+    ok, out = stock.adjust_stock(client, entries)
+    if not ok:
+        print(out, file=sys.stderr)
+        return 1
+    for row in out:
+        emit(dict(zip(("Nro_Parte", "Delta", "Stock_Anterior", "Stock_Nuevo", "Estado"), row)))
+    return 0 if not errors else 2
+
+
+def cmd_init(client, args):
+    import migrations
+    if args.status:
+        for fname, _, checksum in migrations.pending(client, args.sql_dir, force=args.force):
+            emit({"script": fname, "checksum": checksum, "estado": "pendiente"})
+        return 0
+    ok, out = migrations.migrate(client, args.sql_dir, force=args.force)
+    emit({"ok": ok, "mensaje": out.strip()})
+    return 0 if ok else 1
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(description="Reportes, proformas, órdenes, stock y migraciones sin interfaz.")
+    ap.add_argument("--config", default=CONFIG_PATH)
+    sub = ap.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("reporte", help="ejecuta un reporte (una fila JSON por línea)")
+    p.add_argument("reporte", nargs="?", help="clave del reporte (ver --list)")
+    p.add_argument("param", nargs="*", help="parámetros nombre=valor")
+    p.add_argument("--list", action="store_true", help="lista los reportes y sus parámetros")
+    p.add_argument("--formato", choices=("jsonl", "tsv"), default="jsonl")
+    p.add_argument("--page-size", type=int, default=1000)
+    p.set_defaults(run=cmd_reporte)
+
+    p = sub.add_parser("proforma", help="crea proformas desde .json / .jsonl / .csv")
+    p.add_argument("archivo", help="cabecera + Lineas (JSON) o una fila por línea (CSV); '-' = STDIN")
+    p.add_argument("--actualizar", action="store_true", help="reemplaza proformas existentes (sp_Actualizar_Proforma)")
+    p.set_defaults(run=cmd_proforma)
+
+    p = sub.add_parser("oc", help="registra órdenes de compra desde .json / .jsonl / .csv")
+    p.add_argument("archivo", help="un registro por orden con las columnas de la pestaña OC; '-' = STDIN")
+    p.set_defaults(run=cmd_oc)
+
+    p = sub.add_parser("stock", help="aplica un lote de ajustes de stock (formato de stock.py)")
+    p.add_argument("archivo", help="líneas Nro_Parte[;cantidad[;SUMA|RESTA]] ('-' = STDIN)")
+    p.set_defaults(run=cmd_stock)
+
+    p = sub.add_parser("init", help="aplica las migraciones pendientes de /sql")
+    p.add_argument("--sql-dir", default=resource_path("sql"))
+    p.add_argument("--status", action="store_true", help="solo lista los scripts pendientes")
+    p.add_argument("--force", action="store_true", help="reaplica los scripts idempotentes aunque no hayan cambiado")
+    p.set_defaults(run=cmd_init)
+    return ap
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    client = MySQLClient(**load_config(args.config))
+    try:
+        return args.run(client, args)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
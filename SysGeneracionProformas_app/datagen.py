@@ -0,0 +1,275 @@
+"""
+Generador de datos sintéticos para medir la app a escala (ver benchmark.py).
+
+Llena todas las tablas respetando las claves foráneas: empleados, proveedores y empresas
+(con sus teléfonos, correos y direcciones), repuestos, órdenes de compra y proformas con
+sus líneas. Es reproducible: con la misma semilla y cantidades genera exactamente las mismas
+filas (cada tabla usa su propio generador aleatorio).
+Las claves sintéticas no chocan con las del seed (E1000+, S0000000, OC…, PF…) y se insertan
+con INSERT IGNORE, así que repetir la carga o ampliarla solo agrega lo que falta.
+
+Pensado para una BD de pruebas (`--database`), no para la de producción.
+
+Uso sin interfaz gráfica:
+    python datagen.py --escala mediana [--semilla 42] [--database sistemaproforma_bench]
+    python datagen.py --escala grande --proformas 1000000 [--config config.json]
+"""
+import argparse
+import datetime
+import random
+import sys
+import time
+from db import MySQLClient
+from settings import CONFIG_PATH, load_config
+
+# Filas por tabla principal. "grande" es el objetivo de rendimiento (500k repuestos, 5M proformas).
+SCALES = {
+    "pequeña": {"empleados": 50, "proveedores": 200, "empresas": 500,
+                "repuestos": 5000, "ordenes": 10000, "proformas": 20000},
+    "mediana": {"empleados": 200, "proveedores": 1000, "empresas": 2000,
+                "repuestos": 50000, "ordenes": 100000, "proformas": 200000},
+    "grande": {"empleados": 1000, "proveedores": 2000, "empresas": 10000,
+               "repuestos": 500000, "ordenes": 1000000, "proformas": 5000000},
+}
+MAX_EMPLEADOS = 8999   # códigos E1000..E9998 (CHAR(5)); E9999 queda para benchmark.py
+LINES_PER_PROFORMA = (1, 5)
+DAYS_BACK = 3 * 365    # fechas repartidas en los últimos 3 años
+CHUNK = 2000           # filas por INSERT multi-fila
+
+_NOMBRES = ("Ana", "Luis", "Carlos", "María", "Jorge", "Rosa", "Pedro", "Lucía", "Miguel", "Elena",
+            "José", "Carmen", "Raúl", "Patricia", "Diego", "Sofía", "Javier", "Valeria", "Andrés", "Paola")
+_APELLIDOS = ("García", "Rodríguez", "Quispe", "Flores", "Sánchez", "Ramírez", "Torres", "Mendoza",
+              "Vargas", "Castillo", "Rojas", "Huamán", "Chávez", "Díaz", "Gutiérrez", "Cruz")
+_RUBROS = ("Minera", "Constructora", "Agroindustrial", "Pesquera", "Transportes", "Industrial",
+           "Metalmecánica", "Energía", "Logística", "Petrolera")
+_SUFIJOS = ("S.A.", "S.A.C.", "E.I.R.L.", "S.R.L.")
+_CIUDADES = ("Lima", "Arequipa", "Trujillo", "Piura", "Cusco", "Chiclayo", "Huancayo", "Ica", "Tacna")
+_DISTRITOS = ("Centro", "Norte", "Sur", "Industrial", "San Isidro", "Miraflores", "Ate", "Callao")
+_CALLES = ("Av. Principal", "Jr. Lima", "Av. Industrial", "Calle Los Pinos", "Av. La Marina", "Jr. Unión")
+_TIPOS = ("Filtro", "Bomba", "Rodamiento", "Válvula", "Sello", "Manguera", "Correa", "Engranaje",
+          "Sensor", "Bujía", "Empaque", "Pistón", "Inyector", "Turbo", "Embrague", "Retén")
+_DETALLES = ("de aceite", "de aire", "de combustible", "hidráulica", "hidráulico", "de agua",
+             "de transmisión", "de freno", "de alta presión", "de dirección", "del motor", "radial")
+_MARCAS = ("Bosch", "Caterpillar", "Komatsu", "Volvo", "SKF", "Parker", "Donaldson", "Fleetguard",
+           "Gates", "Timken", "Denso", "NGK", "Cummins", "Perkins", "Mann", "Baldwin", "3M")
+_STATUS = ("Almacen", "Almacen", "Almacen", "Transito", "Agotado")
+_UM = ("UND", "KG", "M", "L", "JGO", "CJA")
+_FORMAS_PAGO = ("Contado", "Crédito 30 días", "Crédito 60 días", "Letra 90 días")
+_INCOTERMS = (None, "EXW", "FOB", "CIF", "DDP", "FCA")
+
+
+def emp_code(i):
+    return f"E{1000 + i:04d}"
+
+
+def prov_ruc(i):
+    return f"10{i:09d}"
+
+
+def emp_ruc(i):
+    return f"20{i:09d}"
+
+
+def part_no(i):
+    return f"S{i:07d}"
+
+
+def _rng(seed, table):
+    """Generador propio de cada tabla (reproducible y sin depender de las demás)."""
+    return random.Random(f"{seed}:{table}")
+
+
+def _sql_value(client, v):
+    if v is None or isinstance(v, str) or isinstance(v, datetime.date):
+        return client.esc(v if not isinstance(v, datetime.date) else v.isoformat())
+    return str(v)
+
+
+class Generator:
+    """
+    Genera e inserta los datos sintéticos.
+
+    Parameters
+    ----------
+    client : MySQLClient
+    counts : dict
+        Filas por tabla principal (claves de `SCALES`).
+    seed : int
+        Semilla: misma semilla + mismas cantidades = mismos datos.
+    until : datetime.date
+        Fecha más reciente de órdenes y proformas.
+    progress : callable | None
+        `progress(tabla, filas, total)` después de cada bloque.
+    """
+    def __init__(self, client, counts, seed=42, until=None, progress=None):
+        self.client = client
+        self.counts = dict(counts)
+        self.counts["empleados"] = min(self.counts["empleados"], MAX_EMPLEADOS)
+        self.seed = seed
+        self.until = until or datetime.date.today()
+        self.progress = progress
+        self.inserted = {}
+
+    def _date(self, rnd):
+        return self.until - datetime.timedelta(days=rnd.randrange(DAYS_BACK))
+
+    def _insert(self, table, columns, rows, total=None):
+        """INSERT IGNORE por bloques de `CHUNK` filas. Devuelve las filas enviadas."""
+        head = f"INSERT IGNORE INTO {table} ({', '.join(columns)}) VALUES\n"
+        chunk, n = [], 0
+        for row in rows:
+            chunk.append("(" + ", ".join(_sql_value(self.client, v) for v in row) + ")")
+            if len(chunk) >= CHUNK:
+                n += self._flush(table, head, chunk, n, total)
+                chunk = []
+        if chunk:
+            n += self._flush(table, head, chunk, n, total)
+        self.inserted[table] = self.inserted.get(table, 0) + n
+        return n
+
+    def _flush(self, table, head, chunk, done, total):
+        ok, out = self.client.run_sql(head + ",\n".join(chunk) + ";")
+        if not ok:
+            raise RuntimeError(f"{table}: {out}")
+        if self.progress:
+            self.progress(table, self.inserted.get(table, 0) + done + len(chunk), total)
+        return len(chunk)
+
+    # -------- Tablas ------------------------------------------------------------
+    def empleados(self):
+        rnd, n = _rng(self.seed, "empleado"), self.counts["empleados"]
+        people = [(emp_code(i), f"{rnd.choice(_NOMBRES)} {rnd.choice(_APELLIDOS)}", f"9{rnd.randrange(10**8):08d}")
+                  for i in range(n)]
+        self._insert("Empleado", ("Codigo", "Nombre"), ((c, nom) for c, nom, _t in people), n)
+        self._insert("Contacto_Empleado", ("Codigo_Empleado", "Telefono"), ((c, t) for c, _n, t in people), n)
+
+    def proveedores(self):
+        rnd, n = _rng(self.seed, "proveedor"), self.counts["proveedores"]
+        rows = []
+        for i in range(n):
+            name = f"{rnd.choice(_RUBROS)} {rnd.choice(_APELLIDOS)} {rnd.choice(_SUFIJOS)}"
+            rows.append((prov_ruc(i), name[:50], f"{rnd.choice(_CALLES)} {rnd.randint(100, 2999)}",
+                         f"01{rnd.randrange(10**7):07d}", f"ventas{i}@proveedor{i % 97}.pe"))
+        self._insert("Proveedor", ("RUC", "Raz_Soc", "Direccion"), (r[:3] for r in rows), n)
+        self._insert("Telefono_Proveedor", ("RUC_Proveedor", "Telefono"), ((r[0], r[3]) for r in rows), n)
+        self._insert("Email_Proveedor", ("RUC_Proveedor", "Email"), ((r[0], r[4]) for r in rows), n)
+
+    def empresas(self):
+        rnd, n = _rng(self.seed, "empresa"), self.counts["empresas"]
+        rows = []
+        for i in range(n):
+            name = f"{rnd.choice(_RUBROS)} {rnd.choice(_APELLIDOS)} {rnd.choice(_APELLIDOS)} {rnd.choice(_SUFIJOS)}"
+            rows.append((emp_ruc(i), name[:50], f"01{rnd.randrange(10**7):07d}" if rnd.random() < 0.3 else None,
+                         rnd.choice(_CIUDADES), f"{rnd.choice(_CALLES)} {rnd.randint(100, 999)}"[:25],
+                         rnd.choice(_DISTRITOS), f"9{rnd.randrange(10**8):08d}", f"compras{i}@cliente.pe"))
+        self._insert("Empresa", ("RUC", "Raz_Soc", "FAX"), (r[:3] for r in rows), n)
+        self._insert("Direccion_Empresa", ("RUC_Empresa", "Ciudad", "Calle", "Distrito"),
+                     ((r[0], r[3], r[4], r[5]) for r in rows), n)
+        self._insert("Telefono_Empresa", ("RUC_Empresa", "Telefono"), ((r[0], r[6]) for r in rows), n)
+        self._insert("Correo_Empresa", ("RUC_Empresa", "Correo"), ((r[0], r[7]) for r in rows), n)
+
+    def repuestos(self):
+        rnd, n = _rng(self.seed, "repuesto"), self.counts["repuestos"]
+
+        def rows():
+            for i in range(n):
+                desc = f"{rnd.choice(_TIPOS)} {rnd.choice(_DETALLES)} {rnd.choice('ABCDEFGHJK')}{rnd.randint(10, 999)}"
+                yield (part_no(i), rnd.randint(0, 500), desc, rnd.choice(_MARCAS), rnd.choice(_STATUS),
+                       f"{rnd.uniform(1, 5000):.2f}")
+        self._insert("Repuesto", ("Nro_Parte", "Cantidad", "Descripcion", "Marca", "Status", "Precio_Unitario"),
+                     rows(), n)
+
+    def ordenes(self):
+        rnd, n = _rng(self.seed, "orden"), self.counts["ordenes"]
+        c = self.counts
+
+        def rows():
+            for i in range(n):
+                cant = rnd.randint(1, 200)
+                yield (f"OC{i:08d}", rnd.choice(_UM), self._date(rnd), f"{cant * rnd.uniform(1, 500):.2f}",
+                       rnd.randint(1, 20), cant, rnd.choice(_UM), rnd.choice(_FORMAS_PAGO), rnd.choice(_INCOTERMS),
+                       f"Compra de {rnd.choice(_TIPOS).lower()}s", emp_code(rnd.randrange(c["empleados"])),
+                       prov_ruc(rnd.randrange(c["proveedores"])), emp_ruc(rnd.randrange(c["empresas"])))
+        self._insert("Orden_Compra", ("Nro_Orden", "Per_UM", "Fecha_Entrega", "Precio_Neto", "Item", "Cantidad",
+                                      "UM", "Forma_pago", "Incoterms_2000", "Desc_Orden", "Codigo_Empleado",
+                                      "RUC_Proveedor", "RUC_Empresa"), rows(), n)
+
+    def proformas(self):
+        """Cabeceras y líneas por bloques: cada bloque de líneas va después de sus cabeceras."""
+        rnd, n = _rng(self.seed, "proforma"), self.counts["proformas"]
+        c = self.counts
+        lo, hi = LINES_PER_PROFORMA
+        for start in range(0, n, CHUNK):
+            heads, lines = [], []
+            for i in range(start, min(start + CHUNK, n)):
+                nro = f"PF{i:08d}"
+                ruc = emp_ruc(rnd.randrange(c["empresas"])) if rnd.random() < 0.9 else None
+                heads.append((nro, self._date(rnd), emp_code(rnd.randrange(c["empleados"])), ruc))
+                parts = rnd.sample(range(c["repuestos"]), min(rnd.randint(lo, hi), c["repuestos"]))
+                for item, p in enumerate(parts, 1):
+                    lines.append((nro, item, part_no(p), rnd.randint(1, 50), f"{rnd.uniform(0.1, 80):.3f}"))
+            self._insert("Proforma", ("Nro_Proforma", "Fecha", "Codigo_Empleado", "RUC_Empresa"), heads, n)
+            self._insert("Proforma_Detalle", ("Nro_Proforma", "Item", "Nro_Parte", "Cantidad", "Peso"), lines)
+
+    def run(self):
+        """Genera todas las tablas en orden de dependencias y actualiza estadísticas del optimizador."""
+        for step in (self.empleados, self.proveedores, self.empresas, self.repuestos, self.ordenes, self.proformas):
+            step()
+        self.client.run_sql("ANALYZE TABLE Empleado, Contacto_Empleado, Proveedor, Telefono_Proveedor, "
+                            "Email_Proveedor, Empresa, Direccion_Empresa, Telefono_Empresa, Correo_Empresa, "
+                            "Repuesto, Orden_Compra, Proforma, Proforma_Detalle;")
+        return self.inserted
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Llena la BD con datos sintéticos reproducibles.")
+    ap.add_argument("--config", default=CONFIG_PATH)
+    ap.add_argument("--database", help="BD destino (por defecto, la de config.json)")
+    ap.add_argument("--escala", choices=sorted(SCALES), default="pequeña")
+    ap.add_argument("--semilla", type=int, default=42)
+    ap.add_argument("--hasta", type=datetime.date.fromisoformat, help="fecha más reciente (YYYY-MM-DD; hoy)")
+    for key in SCALES["pequeña"]:
+        ap.add_argument(f"--{key}", type=int, help=f"reemplaza la cantidad de {key} de la escala")
+    args = ap.parse_args(argv)
+
+    counts = dict(SCALES[args.escala])
+    for key in counts:
+        if getattr(args, key) is not None:
+            counts[key] = getattr(args, key)
+    if min(counts.values()) < 1:
+        print("Todas las cantidades deben ser al menos 1.", file=sys.stderr)
+        return 1
+
+    cfg = load_config(args.config)
+    if args.database:
+        cfg["database"] = args.database
+    cfg["cache"] = False
+    cfg["stats"] = False
+    cfg["replica"] = None   # ni lecturas locales ni cola: todo va al servidor
+    client = MySQLClient(**cfg)
+    t0 = time.perf_counter()
+    starts = {}
+
+    def progress(table, done, total):
+        if table not in starts:
+            print("", file=sys.stderr)
+            starts[table] = time.perf_counter()
+        rate = done / max(time.perf_counter() - starts[table], 1e-9)
+        print(f"\r{table}: {done}{'/' + str(total) if total else ''} ({rate:.0f} filas/s)   ",
+              end="", file=sys.stderr, flush=True)
+    try:
+        inserted = Generator(client, counts, args.semilla, args.hasta, progress).run()
+    except RuntimeError as e:
+        print(f"\n{e}", file=sys.stderr)
+        return 1
+    finally:
+        client.close()
+    print("", file=sys.stderr)
+    for table, n in inserted.items():
+        print(f"{table}\t{n}")
+    print(f"{sum(inserted.values())} filas en {time.perf_counter() - t0:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,1096 @@
 import subprocess
 import shlex
 import os
+import re
+import queue
+import threading
+import time
+import uuid
+import json
+import hashlib
+import math
+from datetime import date, datetime
+from decimal import Decimal
+from collections import OrderedDict, deque
+from contextlib import contextmanager, nullcontext
+import rows as rowtypes
+
+# Líneas de error que imprime el cliente `mysql` en modo batch (ej. "ERROR 1644 (45000) at line 1: ...").
+_ERROR_LINE = re.compile(r"^ERROR( \d+ \([0-9A-Za-z]+\))?( at line \d+)?: ")
+# Largo máximo de SQL que se pasa con `mysql -e`; lo demás va por STDIN.
+_MAX_ARG_SQL = 8000
+
+
+def _decode_output(data):
+    """
+    Salida de `mysql` (bytes) a texto sin la traducción de saltos de línea del modo texto
+    de `subprocess`: solo "\\n" (o "\\r\\n" en Windows) termina una fila y un \\r dentro de
+    un valor se conserva (ver rows.py).
+    """
+    text = data.decode("utf-8", errors="replace")
+    return text.replace("\r\n", "\n") if os.name == "nt" else text
+
+
+def _run_process(cmd, stdin=None, running=None):
+    """
+    Ejecuta `mysql` una vez (como `subprocess.run`) midiendo sus fases: "spawn" (crear el
+    proceso), "execute" (hasta el primer byte de salida) y "transfer" (resto de la salida).
+    STDIN y STDERR se atienden en hilos aparte para no bloquear con salidas grandes.
+    Mientras corre, el proceso queda en el conjunto `running` (para `MySQLClient.abort`).
+
+    Returns
+    -------
+    (int, str, str)
+        Código de salida, stdout y stderr.
+    """
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE if stdin is not None else subprocess.DEVNULL,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            text=True, encoding="utf-8", errors="replace")
+    t1 = time.perf_counter()
+    if running is not None:
+        running.add(proc)
+    err = []
+
+    def feed():
+        try:
+            proc.stdin.write(stdin)
+            proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass   # el proceso terminó antes (p.ej. error de conexión): se informa por stderr
+    try:
+        threads = [threading.Thread(target=lambda: err.append(proc.stderr.read()), daemon=True)]
+        if stdin is not None:
+            threads.append(threading.Thread(target=feed, daemon=True))
+        for t in threads:
+            t.start()
+        first = proc.stdout.buffer.read(1)
+        t2 = time.perf_counter()
+        out = _decode_output(first + proc.stdout.buffer.read()) if first else ""
+        proc.wait()
+        for t in threads:
+            t.join()
+        proc.stdout.close()
+        proc.stderr.close()
+    finally:
+        if running is not None:
+            running.discard(proc)
+    _phase("spawn", t1 - t0)
+    _phase("execute", t2 - t1)
+    _phase("transfer", time.perf_counter() - t2)
+    return proc.returncode, out, "".join(err)
+
+
+class MySQLSession:
+    """
+    Proceso `mysql` de larga vida al que se le envían sentencias por STDIN.
+
+    Cada sentencia va seguida de un `SELECT '<centinela>';` único; la salida se lee
+    línea a línea hasta encontrar el centinela, de modo que los resultados de cada
+    sentencia quedan separados sin abrir un proceso (ni una conexión) nuevo por consulta.
+
+    Parameters
+    ----------
+    cmd : list[str]
+        Comando base de `mysql` (ver `MySQLClient._base_cmd`).
+    timeout : float
+        Segundos máximos a esperar el centinela antes de dar la sesión por colgada.
+    """
+    def __init__(self, cmd, timeout=120, max_statements=32):
+        # --unbuffered: vuelca stdout tras cada sentencia; --force: un error no cierra la sesión.
+        self.cmd = list(cmd) + ["--unbuffered", "--force"]
+        self.timeout = timeout
+        self.max_statements = max_statements
+        self.proc = None
+        self._lines = None
+        self._lock = threading.Lock()
+        self._statements = OrderedDict()   # sql -> nombre del PREPARE en el proceso actual
+        self._deallocate = []              # PREPARE expulsados del caché, a liberar en el próximo envío
+
+    def _start(self):
+        """Lanza el proceso hijo y espera el primer centinela (descarta avisos iniciales)."""
+        self.proc = subprocess.Popen(
+            self.cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,   # errores intercalados en orden con los resultados
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1
+        )
+        self._lines = queue.Queue()
+        self._statements.clear()   # las sentencias preparadas mueren con el proceso anterior
+        self._deallocate = []
+        threading.Thread(target=self._reader, args=(self.proc, self._lines), daemon=True).start()
+        ok, out = self._roundtrip("", measure=False)
+        if not ok:
+            self._kill()
+            raise RuntimeError(out or "No se pudo iniciar la sesión de mysql.")
+
+    @staticmethod
+    def _reader(proc, lines):
+        """Hilo lector: pasa cada línea de stdout a la cola; None indica EOF (hijo muerto)."""
+        for raw in proc.stdout.buffer:   # líneas terminadas solo en "\n" (ver `_decode_output`)
+            line = _decode_output(raw)
+            lines.put(line[:-1] if line.endswith("\n") else line)
+        lines.put(None)
+
+    def _alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def _kill(self):
+        """Termina el proceso hijo (si sigue vivo) y olvida su estado."""
+        proc, self.proc = self.proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+        except Exception:
+            pass
+        try:
+            proc.kill()
+            proc.wait(timeout=5)
+        except Exception:
+            pass
+
+    def _roundtrip(self, sql, measure=True):
+        """
+        Envía `sql` + centinela y recoge la salida hasta el centinela. Con `measure`, el tiempo
+        hasta la primera línea cuenta como fase "execute" y el resto como "transfer".
+
+        Returns
+        -------
+        (bool, str)
+            Igual que `MySQLClient.run_sql`.
+        """
+        sentinel = "__fin_" + uuid.uuid4().hex
+        self.proc.stdin.write(sql + "\nSELECT '" + sentinel + "';\n")
+        self.proc.stdin.flush()
+        out, errors = [], []
+        t0 = first = time.perf_counter()
+        while True:
+            try:
+                line = self._lines.get(timeout=self.timeout)
+            except queue.Empty:
+                self._kill()
+                return False, "Tiempo de espera agotado en la sesión de mysql."
+            if measure and first == t0:
+                first = time.perf_counter()
+                _phase("execute", first - t0)
+            if line is None:
+                self._kill()
+                return False, "\n".join(errors or out) or "La sesión de mysql terminó inesperadamente."
+            if line == sentinel:
+                break
+            if _ERROR_LINE.match(line):
+                errors.append(line)
+            elif line.startswith("mysql: [Warning]"):
+                continue
+            else:
+                out.append(line)
+        if measure:
+            _phase("transfer", time.perf_counter() - first)
+        if errors:
+            return False, "\n".join(errors)
+        return True, "\n".join(out).strip()
+
+    def execute(self, sql):
+        """
+        Ejecuta una o más sentencias en la sesión, (re)iniciando el proceso si murió.
+
+        Tras un error se envía ROLLBACK: los SP que hacen START TRANSACTION y luego
+        SIGNAL dejarían la transacción abierta, cosa que antes resolvía el cierre del proceso.
+
+        Returns
+        -------
+        (bool, str)
+            True + stdout si ok; False + mensaje de error.
+        """
+        sql = sql.strip()
+        if not sql.endswith(";"):
+            sql += ";"
+        return self._execute(lambda: sql)
+
+    def execute_prepared(self, sql, values):
+        """
+        Ejecuta `sql` (marcadores `%s`) como sentencia preparada de la sesión: la primera vez
+        se envía `PREPARE`; después solo `SET` de los parámetros + `EXECUTE`, sin que el
+        servidor vuelva a parsear la sentencia. Se cachean `max_statements` por proceso.
+
+        Params
+        ------
+        values : list[str]
+            Literales SQL de los parámetros (ver `literal`), uno por marcador.
+
+        Returns
+        -------
+        (bool, str)
+            Como `execute`.
+        """
+        parts = _placeholders(sql.strip().rstrip(";"), values)
+        name = "ps_" + hashlib.sha1(sql.encode("utf-8")).hexdigest()[:16]
+        ok, out = self._execute(lambda: self._prepared_sql(sql, "?".join(parts), name, values))
+        if not ok:
+            self._statements.pop(sql, None)   # el PREPARE pudo fallar: se repite la próxima vez
+        return ok, out
+
+    def _prepared_sql(self, sql, text, name, values):
+        """Texto a enviar para `execute_prepared` según lo ya preparado en el proceso actual."""
+        out = [f"DEALLOCATE PREPARE {old};" for old in self._deallocate]
+        self._deallocate = []
+        if sql in self._statements:
+            self._statements.move_to_end(sql)
+        else:
+            out.append(f"PREPARE {name} FROM {literal(text)};")
+            self._statements[sql] = name
+            if len(self._statements) > self.max_statements:
+                self._deallocate.append(self._statements.popitem(last=False)[1])
+        if values:
+            out.append("SET " + ", ".join(f"@{name}_{i} = {v}" for i, v in enumerate(values)) + ";")
+            out.append(f"EXECUTE {name} USING " + ", ".join(f"@{name}_{i}" for i in range(len(values))) + ";")
+        else:
+            out.append(f"EXECUTE {name};")
+        return "\n".join(out)
+
+    def _execute(self, build):
+        """`execute` con el texto armado por `build()` una vez asegurado el proceso (y de nuevo si se reinicia)."""
+        with self._lock:
+            try:
+                if not self._alive():
+                    self._kill()
+                    self._timed_start()
+                try:
+                    ok, out = self._roundtrip(build())
+                except (BrokenPipeError, OSError):
+                    # El hijo murió entre sentencias: aún no se ejecutó nada, se reintenta una vez.
+                    self._kill()
+                    self._timed_start()
+                    ok, out = self._roundtrip(build())
+                if not ok and self._alive():
+                    self._roundtrip("ROLLBACK;", measure=False)
+                return ok, out
+            except FileNotFoundError:
+                return False, "No se encontró el binario 'mysql' en el PATH."
+            except Exception as ex:
+                self._kill()
+                return False, f"Error en la sesión de mysql: {ex}"
+
+    def _timed_start(self):
+        t0 = time.perf_counter()
+        self._start()
+        _phase("spawn", time.perf_counter() - t0)
+
+    def close(self):
+        """Cierra la sesión (envía EOF y termina el proceso)."""
+        with self._lock:
+            self._kill()
+
+    def abort(self):
+        """
+        Mata el proceso sin esperar a la sentencia en curso (no toma el lock): el hilo que la
+        espera recibe EOF y devuelve un error de inmediato.
+        """
+        proc = self.proc
+        if proc is not None:
+            try:
+                proc.kill()
+            except Exception:
+                pass
+
+
+def split_sql_script(content):
+    """
+    Divide un script .sql en sentencias, respetando `DELIMITER`, comillas y comentarios
+    (lo que hace el cliente `mysql` al leer un archivo por STDIN).
+
+    Returns
+    -------
+    list[str]
+        Sentencias sin el delimitador final.
+    """
+    stmts, buf = [], []
+    delim = ";"
+    i, n = 0, len(content)
+    quote = None
+    at_line_start = True
+    while i < n:
+        ch = content[i]
+        if quote:
+            buf.append(ch)
+            if ch == "\\" and quote != "`" and i + 1 < n:
+                buf.append(content[i + 1])
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+            i += 1
+            continue
+        if at_line_start:
+            line_end = content.find("\n", i)
+            line = content[i:line_end if line_end != -1 else n]
+            m = re.match(r"\s*DELIMITER\s+(\S+)\s*$", line, re.IGNORECASE)
+            if m:
+                delim = m.group(1)
+                i = line_end + 1 if line_end != -1 else n
+                continue
+        at_line_start = False
+        if ch in ("'", '"', "`"):
+            quote = ch
+        elif content.startswith("--", i) and (i + 2 >= n or content[i + 2] in " \t\r\n") or ch == "#":
+            line_end = content.find("\n", i)
+            i = line_end if line_end != -1 else n
+            continue
+        elif content.startswith("/*", i):
+            end = content.find("*/", i + 2)
+            i = end + 2 if end != -1 else n
+            continue
+        elif content.startswith(delim, i):
+            stmt = "".join(buf).strip()
+            if stmt:
+                stmts.append(stmt)
+            buf = []
+            i += len(delim)
+            continue
+        if ch == "\n":
+            at_line_start = True
+        buf.append(ch)
+        i += 1
+    stmt = "".join(buf).strip()
+    if stmt:
+        stmts.append(stmt)
+    return stmts
+
+
+def _to_text(value):
+    """Convierte un valor tipado al texto que imprimiría `mysql -B` (NULL, escapes \\t \\n \\\\)."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, (bytes, bytearray)):
+        value = bytes(value).decode("utf-8", errors="replace")
+    text = str(value)
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+# Escape de cadenas como `mysql_real_escape_string`.
+_STRING_ESCAPES = str.maketrans({"\0": "\\0", "\n": "\\n", "\r": "\\r", "\x1a": "\\Z",
+                                 "'": "\\'", '"': '\\"', "\\": "\\\\"})
+_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def literal(value):
+    """
+    Literal SQL de un parámetro según su tipo (enlace sin driver).
+
+    None -> NULL; bool -> 1/0; int, Decimal y float -> número; date/datetime -> 'AAAA-MM-DD[ hh:mm:ss]';
+    bytes -> X'..'; str -> cadena escapada. Lo que no es texto nunca se interpola como texto.
+
+    Raises
+    ------
+    TypeError
+        Si el tipo no se puede enlazar.
+    ValueError
+        Si el número no es finito (NaN, infinito).
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(int(value))
+    if isinstance(value, Decimal):
+        if not value.is_finite():
+            raise ValueError(f"Número no finito: {value}")
+        return format(value, "f")
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError(f"Número no finito: {value}")
+        return repr(value)
+    if isinstance(value, datetime):
+        return "'" + value.isoformat(" ") + "'"
+    if isinstance(value, date):
+        return "'" + value.isoformat() + "'"
+    if isinstance(value, (bytes, bytearray)):
+        return "X'" + bytes(value).hex() + "'"
+    if isinstance(value, str):
+        return "'" + value.translate(_STRING_ESCAPES) + "'"
+    raise TypeError(f"Tipo de parámetro no soportado: {type(value).__name__}")
+
+
+def _placeholders(sql, params):
+    """Partes de `sql` alrededor de cada `%s`; valida que haya un parámetro por marcador."""
+    parts = sql.split("%s")
+    if len(parts) - 1 != len(params):
+        raise ValueError(f"La sentencia tiene {len(parts) - 1} marcadores y se pasaron {len(params)} parámetros.")
+    return parts
+
+
+def bind(sql, params):
+    """`sql` con cada `%s` reemplazado por el `literal` del parámetro correspondiente."""
+    params = list(params or ())
+    parts = _placeholders(sql, params)
+    return parts[0] + "".join(literal(p) + rest for p, rest in zip(params, parts[1:]))
+
+
+class ConnectionPool:
+    """
+    Pool acotado de conexiones. Las conexiones se crean a demanda hasta `size`;
+    si todas están en uso, `acquire` espera hasta `timeout` segundos.
+
+    Parameters
+    ----------
+    connect : callable
+        Fábrica sin argumentos que devuelve una conexión nueva (con `is_alive()` y `close()`).
+    size : int
+        Máximo de conexiones abiertas simultáneamente.
+    timeout : float
+        Segundos máximos de espera por una conexión libre.
+    """
+    def __init__(self, connect, size=4, timeout=30):
+        self._connect = connect
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()   # LIFO: reutiliza la conexión más "caliente"
+        self._created = 0
+        self._busy = set()               # conexiones entregadas (para `abort`)
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Devuelve una conexión libre (creándola si aún no se llegó al tope)."""
+        conn = self._acquire()
+        with self._lock:
+            self._busy.add(conn)
+        return conn
+
+    def _acquire(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if conn.is_alive():
+                return conn
+            self.release(conn, broken=True)   # el servidor la cerró (wait_timeout, red...)
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise RuntimeError("No hay conexiones libres en el pool (tiempo de espera agotado).")
+
+    def release(self, conn, broken=False):
+        """Devuelve la conexión al pool; si `broken`, la cierra y libera su cupo."""
+        with self._lock:
+            self._busy.discard(conn)
+        if broken:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Context manager: `with pool.connection() as conn: ...`."""
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except Exception:
+            broken = not conn.is_alive()
+            raise
+        finally:
+            self.release(conn, broken=broken)
+
+    def close(self):
+        """Cierra las conexiones ociosas (las que están en uso se cierran al devolverse rotas)."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self.release(conn, broken=True)
+
+    def abort(self):
+        """Corta las conexiones en uso (sus consultas fallan de inmediato) y cierra las ociosas."""
+        with self._lock:
+            busy = list(self._busy)
+        for conn in busy:
+            conn.abort()
+        self.close()
+
+
+class _DriverConnection:
+    """
+    Conexión del driver nativo + caché LRU de sentencias preparadas en el servidor.
+
+    Cada entrada del caché es un cursor preparado: reejecutarlo con otros parámetros
+    envía solo COM_STMT_EXECUTE, sin volver a parsear la sentencia.
+    """
+    def __init__(self, raw, max_statements=32):
+        self.raw = raw
+        self.max_statements = max_statements
+        self.statements = OrderedDict()
+
+    def prepared(self, sql):
+        cur = self.statements.get(sql)
+        if cur is not None:
+            self.statements.move_to_end(sql)
+            return cur
+        cur = self.raw.cursor(prepared=True)
+        self.statements[sql] = cur
+        if len(self.statements) > self.max_statements:
+            _, old = self.statements.popitem(last=False)
+            try:
+                old.close()   # libera el statement en el servidor (COM_STMT_CLOSE)
+            except Exception:
+                pass
+        return cur
+
+    def is_alive(self):
+        try:
+            return self.raw.is_connected()
+        except Exception:
+            return False
+
+    def close(self):
+        self.statements.clear()
+        try:
+            self.raw.close()
+        except Exception:
+            pass
+
+    def abort(self):
+        """Cierra el socket sin COM_QUIT, desde otro hilo: la consulta en curso falla al instante."""
+        try:
+            self.raw.shutdown()
+        except Exception:
+            pass
+
+
+class DriverBackend:
+    """
+    Backend que habla el protocolo nativo de MySQL vía `mysql-connector-python`.
+
+    - Conexiones en un `ConnectionPool` acotado (autocommit, como el cliente `mysql`).
+    - Con parámetros, las sentencias se preparan en el servidor y se cachean por conexión.
+    - Devuelve resultados tipados (int, Decimal, date, None...).
+
+    Raises
+    ------
+    ImportError
+        Si `mysql.connector` no está instalado (MySQLClient cae entonces al backend CLI).
+    """
+    # Sentencias que el protocolo binario acepta preparar.
+    _PREPARABLE = re.compile(r"^\s*(SELECT|WITH|CALL|INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+    def __init__(self, host, port, user, password, database, pool_size=4):
+        import mysql.connector
+        self._driver = mysql.connector
+        self._params = {
+            "host": host,
+            "port": port,
+            "user": user,
+            "password": password,
+            "charset": "utf8mb4",
+            "autocommit": True,
+        }
+        self.database = database
+        self.pool = ConnectionPool(lambda: self._connect(use_db=True), size=pool_size)
+
+    def _connect(self, use_db=True):
+        params = dict(self._params)
+        if use_db and self.database:
+            params["database"] = self.database
+        return _DriverConnection(self._driver.connect(**params))
+
+    def _execute_on(self, conn, sql, params=None):
+        """Ejecuta una sentencia en `conn` y devuelve (columnas, filas)."""
+        prepared = params is not None and bool(self._PREPARABLE.match(sql))
+        cur = conn.prepared(sql) if prepared else conn.raw.cursor()
+        try:
+            t0 = time.perf_counter()
+            cur.execute(sql, tuple(params) if params is not None else None)
+            t1 = time.perf_counter()
+            columns = [d[0] for d in cur.description] if cur.description else []
+            rows = cur.fetchall() if cur.with_rows else []
+            t2 = time.perf_counter()
+            rows = [tuple(bytes(v).decode("utf-8", errors="replace")
+                          if isinstance(v, (bytes, bytearray)) else v for v in r) for r in rows]
+            _phase("execute", t1 - t0)
+            _phase("transfer", t2 - t1)
+            _phase("parse", time.perf_counter() - t2)
+            return columns, rows
+        except Exception:
+            try:
+                conn.raw.rollback()   # p.ej. SP que hizo START TRANSACTION y luego SIGNAL
+            except Exception:
+                pass
+            raise
+        finally:
+            if not prepared:
+                cur.close()
+
+    def execute(self, sql, params=None, use_db=True):
+        """
+        Ejecuta una sentencia y devuelve (columnas, filas tipadas).
+
+        Params
+        ------
+        sql : str
+            Sentencia única. Con `params`, los marcadores son `%s`.
+        params : sequence | None
+            Valores a enlazar (sentencia preparada en el servidor).
+        use_db : bool
+            Si False, usa una conexión aparte sin base de datos por defecto
+            (la BD puede no existir aún al inicializar el esquema).
+        """
+        t0 = time.perf_counter()
+        if not use_db:
+            conn = self._connect(use_db=False)
+            _phase("connect", time.perf_counter() - t0)
+            try:
+                return self._execute_on(conn, sql, params)
+            finally:
+                conn.close()
+        with self.pool.connection() as conn:
+            _phase("connect", time.perf_counter() - t0)
+            return self._execute_on(conn, sql, params)
+
+    def run_sql(self, sql, use_db=True, params=None):
+        """
+        Equivalente de `MySQLClient.run_sql`: (ok, salida tab-separada como `mysql -N -B`).
+        Con `params` (marcadores `%s`) la sentencia se prepara (ver `MySQLClient.execute`).
+        """
+        try:
+            _, rows = self.execute(sql, params=params, use_db=use_db)
+        except Exception as ex:
+            return False, str(ex)
+        return True, "\n".join("\t".join(_to_text(v) for v in r) for r in rows).strip()
+
+    def run_sql_script(self, content, use_db=True):
+        """Ejecuta un script completo (con DELIMITER) en una conexión dedicada."""
+        conn = self._connect(use_db=use_db)
+        out = []
+        try:
+            for stmt in split_sql_script(content):
+                _, rows = self._execute_on(conn, stmt)
+                out.extend("\t".join(_to_text(v) for v in r) for r in rows)
+        except Exception as ex:
+            return False, str(ex)
+        finally:
+            conn.close()
+        return True, "\n".join(out).strip()
+
+    def close(self):
+        self.pool.close()
+
+    def abort(self):
+        self.pool.abort()
+
+
+_EMPRESA_TABLES = ("empresa", "direccion_empresa", "telefono_empresa", "correo_empresa")
+_PROVEEDOR_TABLES = ("proveedor", "telefono_proveedor", "email_proveedor")
+_EMPLEADO_TABLES = ("empleado", "contacto_empleado")
+_PROFORMA_TABLES = ("proforma", "proforma_detalle")
+_RESUMEN_TABLES = ("resumen_oc_empresa", "resumen_proforma_empleado", "resumen_proforma_repuesto")
+
+# Tablas que actualizan los triggers de cada tabla: resúmenes (sql/resumenes.sql) y registro de
+# cambios de la réplica local (sql/replica.sql).
+TRIGGER_WRITES = {
+    "orden_compra": ("resumen_oc_empresa",),
+    "proforma": ("resumen_proforma_empleado", "resumen_proforma_repuesto"),
+    "proforma_detalle": ("resumen_proforma_empleado", "resumen_proforma_repuesto"),
+}
+TRIGGER_WRITES.update({t: ("replica_cambio",) for t in _EMPRESA_TABLES + _PROVEEDOR_TABLES + _EMPLEADO_TABLES
+                       + ("repuesto",)})
+
+# Tablas que escribe cada procedimiento (incluye efectos de SP anidados y triggers):
+# las OC llaman a sp_Actualizar_Stock, así que también modifican Repuesto.
+SP_WRITES = {
+    "sp_agregar_empleado": _EMPLEADO_TABLES,
+    "sp_actualizar_empleado": _EMPLEADO_TABLES,
+    "sp_eliminar_empleado": _EMPLEADO_TABLES,
+    "sp_agregar_repuesto": ("repuesto",),
+    "sp_actualizar_repuesto": ("repuesto",),
+    "sp_eliminar_repuesto": ("repuesto",),
+    "sp_actualizar_stock": ("repuesto",),
+    "sp_importar_repuestos": ("repuesto", "repuesto_staging"),
+    "sp_agregar_proveedor": _PROVEEDOR_TABLES,
+    "sp_actualizar_proveedor": _PROVEEDOR_TABLES,
+    "sp_eliminar_proveedor": _PROVEEDOR_TABLES,
+    "sp_agregar_empresa": _EMPRESA_TABLES,
+    "sp_actualizar_empresa": _EMPRESA_TABLES,
+    "sp_eliminar_empresa": _EMPRESA_TABLES,
+    "sp_registrar_ordencompra": ("orden_compra", "repuesto"),
+    "sp_actualizar_ordencompra": ("orden_compra", "repuesto"),
+    "sp_eliminar_ordencompra": ("orden_compra", "repuesto"),
+    "sp_agregar_proforma": _PROFORMA_TABLES,
+    "sp_actualizar_proforma": _PROFORMA_TABLES,
+    "sp_eliminar_proforma": _PROFORMA_TABLES,
+    "sp_reconstruir_resumenes": _RESUMEN_TABLES,
+}
+
+_READ_TABLES = re.compile(r"\b(?:FROM|JOIN)\s+`?(\w+)`?(?:\s*\.\s*`?(\w+)`?)?", re.IGNORECASE)
+_WRITE_TABLE = re.compile(r"^\s*(?:INSERT(?:\s+IGNORE)?\s+INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM|TRUNCATE(?:\s+TABLE)?)"
+                          r"\s+`?(\w+)`?(?:\s*\.\s*`?(\w+)`?)?", re.IGNORECASE)
+_CALL = re.compile(r"^\s*CALL\s+`?(\w+)`?", re.IGNORECASE)
+_CACHEABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+# Resultados que dependen del momento o de la sesión: nunca se cachean.
+_VOLATILE = re.compile(r"\b(NOW|CURDATE|CURTIME|CURRENT_\w+|SYSDATE|UTC_\w+|RAND|UUID\w*|LAST_INSERT_ID|FOUND_ROWS|CONNECTION_ID)\b"
+                       r"|\bFOR\s+UPDATE\b|\bLOCK\s+IN\b|@", re.IGNORECASE)
+
+
+def normalize_sql(sql):
+    """Colapsa espacios fuera de literales y quita el `;` final (clave de caché)."""
+    out, quote, space = [], None, False
+    for ch in sql.strip().rstrip(";").strip():
+        if quote:
+            out.append(ch)
+            if ch == quote:
+                quote = None
+            continue
+        if ch.isspace():
+            space = True
+            continue
+        if space and out:
+            out.append(" ")
+        space = False
+        if ch in ("'", '"', "`"):
+            quote = ch
+        out.append(ch)
+    return "".join(out)
+
+
+def deterministic_read(sql):
+    """True si `sql` es una lectura (SELECT/WITH) cuyo resultado no depende del momento ni de la sesión."""
+    return bool(_CACHEABLE.match(sql)) and not _VOLATILE.search(sql)
+
+
+def tables_read(sql):
+    """Conjunto de tablas (en minúsculas) que aparecen en FROM/JOIN."""
+    return {(t2 or t1).lower() for t1, t2 in _READ_TABLES.findall(sql)}
+
+
+def tables_written(sql):
+    """
+    Tablas que modifica una sentencia.
+
+    Returns
+    -------
+    set[str] | None
+        None si no se puede determinar (p.ej. CALL a un SP desconocido, DDL):
+        el llamador debe invalidar todo.
+    """
+    m = _CALL.match(sql)
+    if m:
+        tables = SP_WRITES.get(m.group(1).lower())
+        tables = set(tables) if tables is not None else None
+    else:
+        m = _WRITE_TABLE.match(sql)
+        tables = {(m.group(2) or m.group(1)).lower()} if m else None
+    if tables:
+        for t in list(tables):
+            tables.update(TRIGGER_WRITES.get(t, ()))
+    return tables
+
+
+def _replicated_write(sql):
+    """True si `sql` escribe directamente (no CALL) en tablas que copia la réplica local."""
+    if _CALL.match(sql):
+        return False
+    return any("replica_cambio" in TRIGGER_WRITES.get(t, ()) for t in tables_written(sql) or ())
+
+
+class QueryCache:
+    """
+    Caché LRU con TTL de resultados de lectura, indexado por tabla para invalidar
+    solo lo afectado por cada escritura.
+
+    Parameters
+    ----------
+    max_entries : int
+        Entradas máximas (se expulsa la menos usada recientemente).
+    ttl : float
+        Segundos de vida de cada entrada (acota lo desactualizado frente a otros clientes).
+    """
+    def __init__(self, max_entries=256, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # clave -> (vence, tablas, valor)
+        self._by_table = {}             # tabla -> set(claves)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, key):
+        """Devuelve (True, valor) si hay una entrada vigente; (False, None) si no."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[2]
+            if entry is not None:
+                self._remove(key)
+                self.evictions += 1
+            self.misses += 1
+            return False, None
+
+    def put(self, key, tables, value):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, tables, value)
+            for t in tables:
+                self._by_table.setdefault(t, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, tables, _ = self._entries.pop(key)
+        for t in tables:
+            keys = self._by_table.get(t)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[t]
+
+    def invalidate(self, tables=None):
+        """Descarta las entradas que leen alguna de `tables` (todas si es None)."""
+        with self._lock:
+            if tables is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                self._by_table.clear()
+                return
+            for t in tables:
+                for key in list(self._by_table.get(t.lower(), ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def stats(self):
+        """Contadores de aciertos/fallos/expulsiones/invalidaciones y tamaño actual."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / total) if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+            }
+
+
+# Literales de una sentencia (cadenas y números sueltos) para agrupar sus mediciones.
+_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+# Medición en curso del hilo actual (ver `QueryStats.statement`).
+_trace = threading.local()
+
+
+def fingerprint_sql(sql):
+    """Sentencia normalizada con los literales como `?` (`IN (?, ?, ?)` -> `IN (?+)`)."""
+    return _IN_LIST.sub("(?+)", _LITERAL.sub("?", normalize_sql(sql)))
+
+
+def _phase(name, seconds):
+    """Suma `seconds` a la fase `name` de la sentencia que se mide en este hilo (si hay una)."""
+    rec = getattr(_trace, "record", None)
+    if rec is not None:
+        rec.phases[name] = rec.phases.get(name, 0.0) + seconds
+
+
+def _note(**values):
+    """Anota filas/bytes/ok/cached en la sentencia que se mide en este hilo (si hay una)."""
+    rec = getattr(_trace, "record", None)
+    if rec is not None:
+        for k, v in values.items():
+            setattr(rec, k, v)
+
+
+class StatementRecord:
+    """
+    Medición de una sentencia.
+
+    Fases (segundos): "spawn" (lanzar `mysql`), "connect" (conexión del pool), "execute"
+    (hasta el primer byte/fila del servidor), "transfer" (resto de la respuesta) y
+    "parse" (armar las filas en Python). `bytes` es el tamaño de la salida de texto
+    (None con resultados tipados del driver). `replica` indica que se respondió desde la
+    réplica local (replica.py), sin ir al servidor.
+    """
+    __slots__ = ("sql", "fingerprint", "backend", "started", "phases", "total", "rows", "bytes", "ok", "cached",
+                 "replica")
+
+    def __init__(self, sql, backend):
+        self.sql = sql if len(sql) <= 2000 else sql[:2000] + "…"
+        self.fingerprint = fingerprint_sql(self.sql)
+        self.backend = backend
+        self.started = time.time()
+        self.phases = {}
+        self.total = 0.0
+        self.rows = None
+        self.bytes = None
+        self.ok = True
+        self.cached = False
+        self.replica = False
+
+    def to_dict(self):
+        return {
+            "sql": self.sql,
+            "fingerprint": self.fingerprint,
+            "backend": self.backend,
+            "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started)),
+            "total_ms": round(self.total * 1000, 3),
+            "phases_ms": {k: round(v * 1000, 3) for k, v in self.phases.items()},
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "ok": self.ok,
+            "cached": self.cached,
+            "replica": self.replica,
+        }
+
+
+class QueryStats:
+    """
+    Instrumentación de `MySQLClient`: las últimas `size` sentencias con sus fases, y un
+    histograma de latencias por sentencia normalizada (`fingerprint_sql`).
+
+    Parameters
+    ----------
+    size : int
+        Sentencias que se conservan (anillo: se descartan las más viejas).
+    max_fingerprints : int
+        Histogramas como máximo (se descarta el usado hace más tiempo).
+    """
+    BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+    def __init__(self, size=500, max_fingerprints=500):
+        self.max_fingerprints = max_fingerprints
+        self._ring = deque(maxlen=size)
+        self._hist = OrderedDict()   # fingerprint -> {"count", "total", "max", "buckets"}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def statement(self, sql, backend):
+        """
+        Mide lo que se ejecute dentro del bloque como una sola sentencia. Si ya hay una
+        medición en curso en el hilo (p.ej. `select_rows` -> `run_sql`), se suma a esa.
+        """
+        outer = getattr(_trace, "record", None)
+        if outer is not None:
+            yield outer
+            return
+        rec = StatementRecord(sql, backend)
+        _trace.record = rec
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        except BaseException:
+            rec.ok = False
+            raise
+        finally:
+            _trace.record = None
+            rec.total = time.perf_counter() - t0
+            self._add(rec)
+
+    def _add(self, rec):
+        ms = rec.total * 1000
+        with self._lock:
+            self._ring.append(rec)
+            h = self._hist.get(rec.fingerprint)
+            if h is None:
+                h = self._hist[rec.fingerprint] = {"count": 0, "total": 0.0, "max": 0.0,
+                                                    "buckets": [0] * (len(self.BUCKETS_MS) + 1)}
+                if len(self._hist) > self.max_fingerprints:
+                    self._hist.popitem(last=False)
+            else:
+                self._hist.move_to_end(rec.fingerprint)
+            h["count"] += 1
+            h["total"] += ms
+            h["max"] = max(h["max"], ms)
+            i = 0
+            while i < len(self.BUCKETS_MS) and ms > self.BUCKETS_MS[i]:
+                i += 1
+            h["buckets"][i] += 1
+
+    def _percentile(self, h, q):
+        """Límite superior (ms) del intervalo que contiene el percentil `q` (acotado por el máximo)."""
+        target, seen = q * h["count"], 0
+        for i, n in enumerate(h["buckets"]):
+            seen += n
+            if seen >= target:
+                return min(self.BUCKETS_MS[i], round(h["max"], 3)) if i < len(self.BUCKETS_MS) else round(h["max"], 3)
+        return round(h["max"], 3)
+
+    def recent(self):
+        """Mediciones del anillo, de la más vieja a la más nueva."""
+        with self._lock:
+            return list(self._ring)
+
+    def slowest(self, n=50):
+        """Las `n` sentencias más lentas del anillo (sin los aciertos del caché)."""
+        return sorted((r for r in self.recent() if not (r.cached or r.replica)), key=lambda r: r.total, reverse=True)[:n]
+
+    def histograms(self):
+        """
+        Latencias por sentencia normalizada, de mayor a menor tiempo total.
+
+        Returns
+        -------
+        list[dict]
+            {"fingerprint", "count", "avg_ms", "p50_ms", "p95_ms", "max_ms", "total_ms",
+            "buckets": {"<=1": n, ..., ">10000": n}}
+        """
+        with self._lock:
+            items = [(fp, dict(h, buckets=list(h["buckets"]))) for fp, h in self._hist.items()]
+        labels = [f"<={b}" for b in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}"]
+        out = [{
+            "fingerprint": fp,
+            "count": h["count"],
+            "avg_ms": round(h["total"] / h["count"], 3),
+            "p50_ms": self._percentile(h, 0.50),
+            "p95_ms": self._percentile(h, 0.95),
+            "max_ms": round(h["max"], 3),
+            "total_ms": round(h["total"], 3),
+            "buckets": {lab: n for lab, n in zip(labels, h["buckets"]) if n},
+        } for fp, h in items]
+        out.sort(key=lambda d: d["total_ms"], reverse=True)
+        return out
+
+    def clear(self):
+        with self._lock:
+            self._ring.clear()
+            self._hist.clear()
+
+    def dump(self, path, n=200):
+        """Guarda en JSON las `n` sentencias más lentas y los histogramas."""
+        data = {
+            "generated": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "slowest": [r.to_dict() for r in self.slowest(n)],
+            "histograms": self.histograms(),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+
 
 class MySQLClient:
     """
-    Pequeño wrapper alrededor del cliente de línea de comandos `mysql`.
+    Pequeño wrapper alrededor del cliente de línea de comandos `mysql`
+    o, si se configura `backend="driver"`, del driver nativo (`DriverBackend`).
 
     Parameters
     ----------
@@ -18,13 +1104,112 @@ class MySQLClient:
         Contraseña del usuario.
     database : str | None
         Base de datos por defecto. Si es None, algunos métodos pueden recibir use_db=False.
+    session : bool
+        Si True, las sentencias con use_db=True se envían a un único proceso `mysql`
+        persistente (`MySQLSession`) en lugar de lanzar uno por consulta.
+    backend : str
+        "cli" (binario `mysql`) o "driver" (protocolo nativo con pool). Si el driver
+        no está instalado se usa "cli"; el backend efectivo queda en `self.backend`.
+    pool_size : int
+        Máximo de conexiones del pool del backend "driver".
+    cache : bool
+        Si True, cachea los SELECT (ver `QueryCache`); las escrituras que pasan por
+        este cliente invalidan las tablas afectadas. Estadísticas en `cache_stats()`.
+    cache_size, cache_ttl : int, float
+        Entradas máximas y segundos de vida del caché.
+    stats : bool
+        Si True, mide cada sentencia por fases (ver `QueryStats`), en `self.stats`.
+    stats_size : int
+        Sentencias que conserva la instrumentación.
+    replica : str | None
+        Archivo SQLite de la réplica local (ver replica.py): las lecturas tipadas de las tablas
+        de referencia se responden desde ahí y los CALL sin conexión quedan en cola.
+    replica_sync : float
+        Segundos entre sincronizaciones de la réplica (las programa la app).
     """
-    def __init__(self, host="localhost", port=3306, user="root", password="", database="sistemaproforma"):
+    def __init__(self, host="localhost", port=3306, user="root", password="", database="sistemaproforma",
+                 session=False, backend="cli", pool_size=4, cache=False, cache_size=256, cache_ttl=30,
+                 stats=True, stats_size=500, replica=None, replica_sync=60):
         self.host = host
         self.port = int(port)
         self.user = user
         self.password = password or ""
         self.database = database
+        self._session = None
+        self._driver = None
+        self._running = set()   # procesos `mysql` de una sola consulta en curso (ver `abort`)
+        if backend == "driver":
+            try:
+                self._driver = DriverBackend(self.host, self.port, self.user, self.password,
+                                             self.database, pool_size=pool_size)
+            except ImportError:
+                self._driver = None   # sin mysql-connector-python: se usa el binario `mysql`
+        if self._driver is None and session:
+            self._session = MySQLSession(self._base_cmd(use_db=True))
+        self.backend = "driver" if self._driver is not None else "cli"
+        self.cache = QueryCache(cache_size, cache_ttl) if cache else None
+        self.stats = QueryStats(stats_size) if stats else None
+        self.replica = None
+        if replica:
+            from replica import Replica   # replica.py importa este módulo
+            self.replica = Replica(replica, self, sync_every=replica_sync)
+
+    def _measure(self, sql):
+        """Context manager que mide `sql` (ver `QueryStats.statement`); no hace nada sin `stats`."""
+        if self.stats is None:
+            return nullcontext()
+        return self.stats.statement(sql, self.backend)
+
+    def cache_stats(self):
+        """Estadísticas del caché de lecturas (None si está desactivado)."""
+        return self.cache.stats() if self.cache is not None else None
+
+    def _cached_read(self, key, sql, compute, cacheable=None):
+        """
+        Devuelve `compute()` pasando por el caché si la sentencia es una lectura determinista.
+        `cacheable(resultado)` decide si el resultado se guarda (p.ej. solo si ok).
+        """
+        if self.cache is None or not deterministic_read(sql):
+            return compute()
+        found, value = self.cache.get(key)
+        if found:
+            _note(cached=True)
+            return value
+        value = compute()
+        if cacheable is None or cacheable(value):
+            self.cache.put(key, tables_read(sql), value)
+        return value
+
+    def _after_write(self, sql):
+        """Invalida del caché lo que pudo modificar `sql` (todo, si no se sabe)."""
+        if self.cache is not None and not _CACHEABLE.match(sql):
+            self.cache.invalidate(tables_written(sql))
+
+    def close(self):
+        """Libera la sesión persistente / el pool (si existen). El cliente sigue usable: se reabren a demanda."""
+        if self._session is not None:
+            self._session.close()
+        if self._driver is not None:
+            self._driver.close()
+        if self.replica is not None:
+            self.replica.close()
+
+    def abort(self):
+        """
+        Corta las consultas en curso en otros hilos (mata los procesos `mysql`, cierra los sockets
+        del pool), que vuelven enseguida con error, y libera todo como `close`. Se usa al cerrar
+        la app para no esperar a una consulta larga.
+        """
+        for proc in list(self._running):
+            try:
+                proc.kill()
+            except Exception:
+                pass
+        if self._session is not None:
+            self._session.abort()
+        if self._driver is not None:
+            self._driver.abort()
+        self.close()
 
     def _base_cmd(self, use_db=True):
         """
@@ -68,7 +1253,8 @@ class MySQLClient:
 
     def run_sql(self, sql, use_db=True):
         """
-        Ejecuta una sentencia SQL directa usando `mysql -e`.
+        Ejecuta una sentencia SQL directa usando `mysql -e`
+        (o la sesión persistente, si el cliente se creó con session=True).
 
         Params
         ------
@@ -82,19 +1268,39 @@ class MySQLClient:
         (bool, str)
             True + stdout (sin espacios al final) si ok; False + stderr/stdout si error.
         """
-        cmd = self._base_cmd(use_db) + ["-e", sql]
-        try:
-            proc = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                check=False
-            )
-            ok = (proc.returncode == 0)
-            out = proc.stdout.strip()
-            err = proc.stderr.strip()
+        with self._measure(sql):
+            if use_db and self.cache is not None:
+                if _CACHEABLE.match(sql):
+                    res = self._cached_read(("text", normalize_sql(sql)), sql,
+                                            lambda: self._run_sql(sql, use_db), cacheable=lambda res: res[0])
+                else:
+                    # Se invalida aunque falle: un SP pudo escribir antes del error.
+                    try:
+                        res = self._run_sql(sql, use_db)
+                    finally:
+                        self._after_write(sql)
+            else:
+                res = self._run_sql(sql, use_db)
+            _note(ok=res[0], bytes=len(res[1].encode("utf-8")))
+            return res
+
+    def _run_sql(self, sql, use_db=True):
+        """Ejecución real de `run_sql` (sin caché)."""
+        if self._driver is not None:
+            return self._driver.run_sql(sql, use_db=use_db)
+        if use_db and self._session is not None:
+            return self._session.execute(sql)
+        # Sentencias largas (INSERT/UPDATE por lotes) por STDIN: la línea de comandos
+        # de Windows no admite más de ~32K caracteres.
+        if len(sql) > _MAX_ARG_SQL:
+            cmd, stdin = self._base_cmd(use_db), sql.rstrip().rstrip(";") + ";"
+        else:
+            cmd, stdin = self._base_cmd(use_db) + ["-e", sql], None
+        try:
+            returncode, out, err = _run_process(cmd, stdin, self._running)
+            ok = (returncode == 0)
+            out = out.strip()
+            err = err.strip()
             if ok:
                 return True, out
             else:
@@ -106,7 +1312,8 @@ class MySQLClient:
     
     def run_sql_file(self, path, use_db=True):
         """
-        Ejecuta un archivo .sql enviándolo por STDIN al binario `mysql`.
+        Ejecuta un archivo .sql enviándolo por STDIN al binario `mysql`
+        (con el backend "driver", se divide en sentencias con `split_sql_script`).
 
         Params
         ------
@@ -125,21 +1332,24 @@ class MySQLClient:
                 content = f.read()
         except Exception as ex:
             return False, f"No se pudo leer {path}: {ex}"
-        
+
+        if self.cache is not None:
+            self.cache.invalidate()   # un script puede tocar cualquier tabla
+        with self._measure(f"SOURCE {os.path.basename(path)}"):
+            ok, out = self._run_sql_file(content, path, use_db)
+            _note(ok=ok, bytes=len(content.encode("utf-8")))
+            return ok, out
+
+    def _run_sql_file(self, content, path, use_db):
+        """Ejecución real de `run_sql_file`."""
+        if self._driver is not None:
+            return self._driver.run_sql_script(content, use_db=use_db)
         cmd = self._base_cmd(use_db)
         try:
-            proc = subprocess.run(
-                cmd,
-                input=content,              # enviamos el SQL por STDIN
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                check=False
-            )
-            ok = (proc.returncode == 0)
-            out = proc.stdout.strip()
-            err = proc.stderr.strip()
+            returncode, out, err = _run_process(cmd, content, self._running)   # enviamos el SQL por STDIN
+            ok = (returncode == 0)
+            out = out.strip()
+            err = err.strip()
             return (True, out) if ok else (False, (err or out))
         except FileNotFoundError:
             return False, "No se encontró el binario 'mysql' en el PATH."
@@ -152,8 +1362,8 @@ class MySQLClient:
         Escapa un valor para interpolarlo en SQL simple.
 
         Nota:
-        - Esta función es básica (comillas simples -> duplicadas). Para casos complejos,
-          es preferible usar parámetros preparados (en drivers como pymysql/mysqlclient).
+        - Esta función es básica (comillas simples -> duplicadas, \\ -> \\\\) y todo lo vuelve
+          texto. Para valores de usuario usar `execute` / `call` / `query` (parámetros enlazados).
 
         Params
         ------
@@ -162,11 +1372,11 @@ class MySQLClient:
         Returns
         -------
         str
-            'NULL' si value es None, o el literal con comillas simples escapadas.
+            'NULL' si value es None, o el literal con comillas simples y barras invertidas escapadas.
         """
         if value is None:
             return "NULL"
-        return "'" + str(value).replace("'", "''") + "'"
+        return "'" + str(value).replace("\\", "\\\\").replace("'", "''") + "'"
 
     def select_scalar(self, sql):
         """
@@ -175,31 +1385,213 @@ class MySQLClient:
         Returns
         -------
         Any | None
-            Valor como string (o None si no hay filas / error).
+            Valor como string (o None si es NULL, no hay filas o hubo error).
         """
-        ok, out = self.run_sql(sql)
-        if not ok or not out:
-            return None
-        line = out.splitlines()[0]
-        return line.split("\t")[0] if line else None
+        with self._measure(sql):
+            ok, out = self.run_sql(sql)
+            if not ok or not out:
+                return None
+            line = rowtypes.lines(out)[0]
+            _note(rows=1)
+            return rowtypes.text_value(line.split("\t")[0]) if line else None
 
-    def select_rows(self, sql):
+    def select_rows(self, sql, row=None):
         """
-        Ejecuta un SELECT y retorna una lista de filas, cada fila como lista de strings.
+        Ejecuta un SELECT y retorna sus filas.
+
+        Params
+        ------
+        sql : str
+        row : rows.RowType | None
+            Tipos de las columnas: las filas llegan como registros tipados (con None real
+            para NULL, ver rows.py). Sin `row`, cada fila es una lista de strings en la que
+            NULL queda como el texto "NULL" (conviene `IFNULL` en el SELECT).
+
+        Returns
+        -------
+        list[list[str]] | list[row.record]
+            Filas, o [] si error/sin datos.
+        """
+        if row is not None:
+            return self.select_typed(sql, row=row)
+        with self._measure(sql):
+            ok, out = self.run_sql(sql)
+            if not ok or not out:
+                _note(rows=0)
+                return []
+            t0 = time.perf_counter()
+            rows = []
+            for line in rowtypes.lines(out):
+                rows.append([rowtypes.unescape(f) for f in line.split("\t")])
+            _phase("parse", time.perf_counter() - t0)
+            _note(rows=len(rows))
+            return rows
+
+    def select_typed(self, sql, params=None, strict=False, row=None):
+        """
+        Ejecuta un SELECT y retorna filas como tuplas con tipos de Python.
+
+        Con el backend "driver" los valores llegan tipados (int, Decimal, date, None) y,
+        si hay `params` (marcadores `%s`), la sentencia se prepara en el servidor.
+        Con "cli" no hay información de tipos: sin `row` se devuelven tuplas de strings
+        (None para NULL) y `params` se enlazan con `execute`.
+
+        Params
+        ------
+        sql : str
+        params : list | tuple | None
+        strict : bool
+            True para lanzar RuntimeError si la consulta falla (en vez de devolver []),
+            p.ej. al exportar, donde un error no debe parecer un resultado vacío.
+        row : rows.RowType | None
+            Tipos de las columnas: las filas llegan como `row.record` con los mismos tipos
+            en ambos backends. Un valor que no es del tipo declarado cuenta como error.
 
         Returns
         -------
-        list[list[str]]
-            Filas separadas por tabuladores (por `-B -s -N`), o [] si error/sin datos.
+        list[tuple]
+            Filas, o [] si error/sin datos.
         """
-        ok, out = self.run_sql(sql)
-        if not ok or not out:
+        with self._measure(sql):
+            rows = self._select_typed(sql, params, strict, row)
+            _note(rows=len(rows))
+            return rows
+
+    def _select_typed(self, sql, params, strict, row):
+        """Ejecución real de `select_typed` (se mide como una sola sentencia)."""
+        if self.replica is not None:
+            rows = self.replica.select(sql, params, row)
+            if rows is not None:
+                _note(replica=True)
+                return rows
+        return self._select_remote(sql, params, strict, row)
+
+    def _select_remote(self, sql, params, strict, row):
+        """`select_typed` contra el servidor (sin pasar por la réplica local)."""
+        if self._driver is not None:
+            errors = []
+
+            def compute():
+                try:
+                    return self._driver.execute(sql, params)[1]
+                except Exception as e:
+                    errors.append(e)
+                    return None
+            key = ("typed", normalize_sql(sql), tuple(params) if params else ())
+            rows = self._cached_read(key, sql, compute, cacheable=lambda rows: rows is not None)
+            if rows is None:
+                _note(ok=False)
+                if strict:
+                    raise RuntimeError(str(errors[0]) if errors else "Error en la consulta.")
+                return []
+            if row is None:
+                return rows
+            return self._decode(row.from_values, rows, strict)
+        ok, out = self.execute(sql, params) if params else self.run_sql(sql)
+        if not ok:
+            if strict:
+                raise RuntimeError(out)
             return []
-        rows = []
-        for line in out.splitlines():
-            rows.append(line.split("\t"))
+        return self._decode(row.from_text if row is not None else rowtypes.decode_text, out, strict)
+
+    def _decode(self, decode, data, strict):
+        """Aplica `decode` (ver rows.py) midiendo la fase "parse"; un valor mal tipado es un error."""
+        t0 = time.perf_counter()
+        try:
+            rows = decode(data)
+        except (ValueError, TypeError, ArithmeticError) as e:
+            _note(ok=False)
+            if strict:
+                raise RuntimeError(f"Resultado con tipos inesperados: {e}")
+            return []
+        finally:
+            _phase("parse", time.perf_counter() - t0)
         return rows
 
+    def execute(self, sql, params=None):
+        """
+        Ejecuta una sentencia con marcadores `%s` enlazados a `params` según su tipo
+        (ver `literal`): los valores nunca se concatenan como texto sin escapar.
+
+        - "driver": sentencia preparada en el servidor, cacheada por conexión del pool;
+        - sesión (`session=True`): `PREPARE` una vez por proceso `mysql`, luego solo `EXECUTE`;
+        - "cli" sin sesión: literales tipados (cada sentencia es un proceso y una conexión
+          nuevos: no hay nada que reutilizar).
+
+        Con réplica local, una escritura directa (no CALL) a tablas replicadas la sincroniza
+        antes de volver, para que las lecturas siguientes ya vean el cambio.
+
+        Params
+        ------
+        sql : str
+            Una sola sentencia.
+        params : sequence | None
+            Un valor por marcador: str, int, Decimal, float, date, datetime, bool, bytes o None.
+
+        Returns
+        -------
+        (bool, str)
+            Como `run_sql`.
+
+        Raises
+        ------
+        TypeError, ValueError
+            Parámetro de tipo no soportado o cantidad distinta de la de marcadores.
+        """
+        params = list(params or ())
+        text = bind(sql, params)   # valida tipos y cantidad con cualquier backend
+
+        def compute():
+            if self._driver is not None:
+                return self._driver.run_sql(sql, params=params)
+            if self._session is not None:
+                return self._session.execute_prepared(sql, [literal(p) for p in params])
+            return self._run_sql(text)
+
+        with self._measure(sql):
+            if self.cache is None:
+                res = compute()
+            elif _CACHEABLE.match(sql):
+                res = self._cached_read(("bound", normalize_sql(sql), tuple(params)), sql, compute,
+                                        cacheable=lambda res: res[0])
+            else:
+                try:
+                    res = compute()
+                finally:
+                    self._after_write(sql)
+            _note(ok=res[0], bytes=len(res[1].encode("utf-8")))
+        if res[0] and self.replica is not None and self.replica.loaded and _replicated_write(sql):
+            # Las lecturas que siguen (p.ej. recargar Inventario) salen de la réplica: que ya
+            # tengan el cambio. Los CALL los sincroniza `Replica.call`.
+            self.replica.sync(flush=False)
+        return res
+
+    def call(self, proc, *params):
+        """
+        `CALL proc(...)` con parámetros enlazados (ver `execute`); reemplaza armar el CALL con `esc`.
+
+        Con réplica local, si el servidor no responde el CALL queda en cola y se devuelve
+        (True, `replica.QUEUED`); se envía al reconectar (ver `Replica.call`).
+
+        Returns
+        -------
+        (bool, str)
+            Como `call_sp`.
+        """
+        if not _IDENT.match(proc):
+            raise ValueError(f"Nombre de procedimiento no válido: {proc!r}")
+        if self.replica is not None:
+            return self.replica.call(proc, params)
+        return self._call(proc, params)
+
+    def _call(self, proc, params):
+        """`call` directo al servidor."""
+        return self.execute(f"CALL {proc}({', '.join(['%s'] * len(params))});", params)
+
+    def query(self, sql, params=None, row=None, strict=False):
+        """SELECT con marcadores `%s` enlazados: atajo de `select_typed(sql, params, strict, row)`."""
+        return self.select_typed(sql, params, strict, row)
+
     def call_sp(self, call_sql):
         """
         Ejecuta una llamada a procedimiento almacenado (CALL ...).
@@ -0,0 +1,158 @@
+import queue
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueryExecutor:
+    """
+    Ejecuta consultas en un pool de hilos y entrega los resultados en el hilo de Tk.
+
+    Los hilos de trabajo nunca tocan widgets: dejan el resultado en una cola que se
+    vacía desde el loop de Tk con `after()`. Cada trabajo lleva una clave (normalmente
+    la pestaña); un trabajo nuevo con `replace=True` invalida los pendientes de la misma
+    clave, de modo que un resultado que llega tarde (el usuario ya pidió otro) se descarta.
+
+    Parameters
+    ----------
+    widget : tk.Misc
+        Widget cuyo `after()` se usa para sondear la cola de resultados.
+    workers : int
+        Hilos del pool.
+    poll_ms : int
+        Intervalo de sondeo mientras haya trabajos pendientes.
+    on_busy : callable | None
+        `on_busy(key, busy)` se invoca (en el hilo de Tk) cuando una clave pasa
+        de ociosa a ocupada o viceversa.
+    """
+    def __init__(self, widget, workers=4, poll_ms=40, on_busy=None):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self.on_busy = on_busy
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sql")
+        self._results = queue.Queue()
+        self._ids = itertools.count(1)
+        self._latest = {}     # clave -> id del último trabajo reemplazable (el único que se entrega)
+        self._pending = {}    # clave -> cantidad de trabajos sin entregar
+        self._futures = {}    # id -> Future (para cancelar los que aún no empezaron)
+        self._polling = False
+
+    def submit(self, key, fn, on_done, on_error=None, replace=True, on_drop=None):
+        """
+        Encola `fn()` en el pool.
+
+        Params
+        ------
+        key : str
+            Clave del trabajo (pestaña / vista).
+        fn : callable
+            Función sin argumentos; corre en un hilo de trabajo (no debe tocar widgets).
+        on_done : callable
+            `on_done(resultado)`, en el hilo de Tk.
+        on_error : callable | None
+            `on_error(excepción)`, en el hilo de Tk. Por defecto se reporta con
+            `report_callback_exception` del widget.
+        replace : bool
+            True para lecturas: invalida los trabajos reemplazables pendientes con la misma clave.
+            False para escrituras: su resultado se entrega siempre.
+        on_drop : callable | None
+            `on_drop()`, en el hilo de Tk, si el resultado se descarta (lectura cancelada o
+            reemplazada): permite liberar el estado que esperaba la respuesta.
+
+        Returns
+        -------
+        int
+            Id del trabajo.
+        """
+        job_id = next(self._ids)
+        if replace:
+            self._latest[key] = job_id
+        self._set_pending(key, +1)
+        fut = self._pool.submit(self._run, job_id, fn)
+        self._futures[job_id] = (key, replace, on_done, on_error, on_drop, fut)
+        self._ensure_polling()
+        return job_id
+
+    def _run(self, job_id, fn):
+        """Corre en el hilo de trabajo."""
+        try:
+            self._results.put((job_id, True, fn()))
+        except Exception as ex:
+            self._results.put((job_id, False, ex))
+
+    def cancel(self, key):
+        """
+        Descarta las lecturas pendientes de `key`. Las que no empezaron no llegan a ejecutarse;
+        las que están en curso terminan en el servidor, pero su resultado se ignora.
+        """
+        self._latest[key] = None
+        for job_id, (k, replace, _, _, on_drop, fut) in list(self._futures.items()):
+            if k == key and replace and fut.cancel():
+                del self._futures[job_id]
+                self._set_pending(key, -1)
+                self._dropped(on_drop)
+
+    def _dropped(self, on_drop):
+        if on_drop is None:
+            return
+        try:
+            on_drop()
+        except Exception as ex:
+            self.widget.report_callback_exception(type(ex), ex, ex.__traceback__)
+
+    def is_busy(self, key):
+        return self._pending.get(key, 0) > 0
+
+    def _set_pending(self, key, delta):
+        before = self._pending.get(key, 0)
+        after = before + delta
+        self._pending[key] = after
+        if self.on_busy and (before > 0) != (after > 0):
+            self.on_busy(key, after > 0)
+
+    def _ensure_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        """Entrega (en el hilo de Tk) los resultados disponibles y reprograma el sondeo si hace falta."""
+        while True:
+            try:
+                job_id, ok, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            job = self._futures.pop(job_id, None)
+            if job is None:
+                continue
+            key, replace, on_done, on_error, on_drop, _ = job
+            self._set_pending(key, -1)
+            if replace and self._latest.get(key) != job_id:
+                self._dropped(on_drop)
+                continue   # obsoleto: hay una petición más nueva o se canceló
+            try:
+                if ok:
+                    on_done(value)
+                elif on_error is not None:
+                    on_error(value)
+                else:
+                    raise value
+            except Exception as ex:
+                # Mismo tratamiento que una excepción en cualquier callback de Tk.
+                self.widget.report_callback_exception(type(ex), ex, ex.__traceback__)
+        if self._futures:
+            self.widget.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+    def shutdown(self, abort=None):
+        """
+        Detiene el pool: los trabajos que no empezaron (lecturas y escrituras) se descartan y
+        `abort()` (ej. `MySQLClient.abort`) corta los que están en curso. Sin `abort`, el
+        intérprete no sale hasta que terminan: los hilos del pool se esperan al salir.
+        """
+        for _key, _replace, _, _, _, fut in list(self._futures.values()):
+            fut.cancel()
+        self._futures.clear()
+        if abort is not None:
+            abort()
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,184 @@
+"""
+Plan (EXPLAIN) y tiempo de las consultas de la app, para medir el efecto de los índices
+de sql/rendimiento.sql sobre una BD real o sintética.
+
+Uso sin interfaz gráfica:
+    python explain.py [--config config.json] [--repeticiones 5] [--guardar antes.json]
+    python explain.py --comparar antes.json [--guardar despues.json]
+
+Flujo típico: `python migrations.py --status` (rendimiento.sql pendiente) →
+`python explain.py --guardar antes.json` → `python migrations.py` →
+`python explain.py --comparar antes.json`.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import proforma_pdf
+import busqueda
+import reports
+from db import MySQLClient
+from paging import KeysetPager
+from settings import CONFIG_PATH, load_config
+
+# Listados de las pestañas: (nombre, SELECT, orden), como en app.py.
+LISTINGS = [
+    ("Inventario",
+     "SELECT Nro_Parte, Descripcion, Marca, Status, Precio_Unitario, Cantidad FROM Repuesto",
+     [("Descripcion", False, 1), ("Nro_Parte", False, 0)]),
+    ("Orden de Compra",
+     "SELECT Nro_Orden, Per_UM, Fecha_Entrega, Precio_Neto, Item, Cantidad, UM, Forma_pago, "
+     "IFNULL(Incoterms_2000,''), Desc_Orden, Codigo_Empleado, RUC_Proveedor, RUC_Empresa FROM Orden_Compra",
+     [("Fecha_Entrega", True, 2), ("Nro_Orden", True, 0)]),
+    ("Proforma",
+     "SELECT p.Nro_Proforma, p.Fecha, p.Codigo_Empleado, IFNULL(p.RUC_Empresa, ''), "
+     "(SELECT COUNT(*) FROM Proforma_Detalle d WHERE d.Nro_Proforma = p.Nro_Proforma) AS Lineas, "
+     "(SELECT IFNULL(SUM(d.Cantidad), 0) FROM Proforma_Detalle d WHERE d.Nro_Proforma = p.Nro_Proforma) AS Unidades "
+     "FROM Proforma p",
+     [("p.Fecha", True, 1), ("p.Nro_Proforma", True, 0)]),
+    ("Proveedores",
+     "SELECT p.RUC, p.Raz_Soc, IFNULL(p.Direccion,''), IFNULL(t.Telefono,''), IFNULL(e.Email,'') "
+     "FROM Proveedor p LEFT JOIN Telefono_Proveedor t ON t.RUC_Proveedor = p.RUC "
+     "LEFT JOIN Email_Proveedor e ON e.RUC_Proveedor = p.RUC",
+     [("p.Raz_Soc", False, 1), ("p.RUC", False, 0)]),
+    ("Empresas",
+     "SELECT em.RUC, em.Raz_Soc, IFNULL(em.FAX,''), IFNULL(dir.Ciudad,''), IFNULL(dir.Calle,''), "
+     "IFNULL(dir.Distrito,''), IFNULL(tel.Telefono,''), IFNULL(cor.Correo,'') FROM Empresa em "
+     "LEFT JOIN Direccion_Empresa dir ON dir.RUC_Empresa = em.RUC "
+     "LEFT JOIN Telefono_Empresa tel ON tel.RUC_Empresa = em.RUC "
+     "LEFT JOIN Correo_Empresa cor ON cor.RUC_Empresa = em.RUC",
+     [("em.Raz_Soc", False, 1), ("em.RUC", False, 0)]),
+]
+# Listados que se cargan completos (sin páginas), como en app.py.
+FULL_LOADS = [
+    ("Empleados",
+     "SELECT e.Codigo, e.Nombre, IFNULL(c.Telefono,'') FROM Empleado e "
+     "LEFT JOIN Contacto_Empleado c ON c.Codigo_Empleado = e.Codigo ORDER BY e.Codigo;"),
+]
+# Parámetros para los reportes que no tienen valor por defecto.
+REPORT_VALUES = {"dias": "30"}
+# Textos de ejemplo para la búsqueda de repuestos: código, marca y palabras de la descripción.
+SEARCH_SAMPLES = ("FIL", "bosch", "filtro aceite")
+EXPLAIN_COLUMNS = ("id", "select_type", "table", "partitions", "type", "possible_keys",
+                   "key", "key_len", "ref", "rows", "filtered", "Extra")
+
+
+def queries(client):
+    """
+    Consultas a medir: listados completos, primera y segunda página de cada listado paginado,
+    cada reporte con sus valores por defecto, la búsqueda de repuestos y el PDF por rango
+    de fechas.
+
+    Returns
+    -------
+    list[tuple[str, str, list | None]]
+        (nombre, sql, params).
+    """
+    out = [(name, sql, None) for name, sql in FULL_LOADS]
+    for name, select, order in LISTINGS:
+        pager = KeysetPager(select, order)
+        sql, params = pager.first_sql()
+        out.append((f"{name} (página 1)", sql, params))
+        rows = client.select_typed(sql, params)
+        if rows:
+            out.append((f"{name} (página 2)",) + pager.next_sql(rows[-1]))
+    for report in reports.REPORTS:
+        values = report.bind({p.name: REPORT_VALUES.get(p.name) for p in report.params})
+        sql, params = report.first_query(values)
+        out.append((f"Reporte: {report.title}", sql, params))
+    for text in SEARCH_SAMPLES:
+        sql, params = busqueda.search_query(text)
+        out.append((f"Búsqueda: {text}", sql, params))
+    sql, params = proforma_pdf.range_pager("2000-01-01", time.strftime("%Y-%m-%d")).first_sql()
+    out.append(("PDF por rango (cabeceras)", sql, params))
+    return out
+
+
+def measure(client, sql, params=None, repeat=5):
+    """
+    EXPLAIN + mediana del tiempo de ejecución (ms) de una consulta.
+
+    Returns
+    -------
+    dict
+        {"plan": [dict por tabla], "ms": float, "filas": int}
+    """
+    plan = [dict(zip(EXPLAIN_COLUMNS, ("" if v is None else str(v) for v in row)))
+            for row in client.select_typed("EXPLAIN " + sql.strip().rstrip(";"), params, strict=True)]
+    times, n = [], 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        n = len(client.select_typed(sql, params, strict=True))
+        times.append((time.perf_counter() - t0) * 1000)
+    return {"plan": plan, "ms": statistics.median(times), "filas": n}
+
+
+def _plan_line(step):
+    extra = step.get("Extra", "")
+    return (f"    {step.get('table', ''):<12} type={step.get('type', ''):<7} key={step.get('key') or '-':<32} "
+            f"rows={step.get('rows', ''):<8} {extra}")
+
+
+def run(client, repeat=5):
+    """Mide todas las consultas. Devuelve {nombre: resultado de `measure`}."""
+    results = {}
+    for name, sql, params in queries(client):
+        try:
+            results[name] = measure(client, sql, params, repeat)
+        except RuntimeError as e:
+            results[name] = {"error": str(e).strip()}
+    return results
+
+
+def report_text(results, before=None):
+    """Texto legible; con `before` agrega la comparación antes/después por consulta."""
+    lines = []
+    for name, res in results.items():
+        lines.append(name)
+        if "error" in res:
+            lines.append(f"    ERROR: {res['error']}")
+            continue
+        prev = (before or {}).get(name)
+        if prev and "ms" in prev:
+            ratio = prev["ms"] / res["ms"] if res["ms"] > 0 else 0
+            lines.append(f"    antes {prev['ms']:.1f} ms → ahora {res['ms']:.1f} ms (x{ratio:.1f}), {res['filas']} filas")
+            lines.append("  antes:")
+            lines += [_plan_line(s) for s in prev["plan"]]
+            lines.append("  ahora:")
+        else:
+            lines.append(f"    {res['ms']:.1f} ms, {res['filas']} filas")
+        lines += [_plan_line(s) for s in res["plan"]]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="EXPLAIN y tiempos de las consultas de la app.")
+    ap.add_argument("--config", default=CONFIG_PATH)
+    ap.add_argument("--repeticiones", type=int, default=5)
+    ap.add_argument("--guardar", help="guarda los resultados en JSON")
+    ap.add_argument("--comparar", help="JSON guardado antes del cambio")
+    args = ap.parse_args(argv)
+
+    cfg = load_config(args.config)
+    cfg["cache"] = False   # se mide el servidor, no la caché de lecturas
+    cfg["replica"] = None   # ni lecturas locales ni cola: todo va al servidor
+    client = MySQLClient(**cfg)
+    try:
+        results = run(client, args.repeticiones)
+    finally:
+        client.close()
+
+    before = None
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            before = json.load(f)
+    print(report_text(results, before))
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Exportación de listados y reportes a CSV / XLSX.
+
+Las filas se leen de la BD por páginas (`paging.iter_pages`, paginación por clave) y
+se escriben directamente al archivo, sin pasar por el Treeview: la memoria usada no
+depende del total de filas. XLSX usa el modo write-only de openpyxl y abre una hoja
+nueva al llegar al límite de filas de Excel.
+"""
+import csv
+import os
+import time
+from paging import iter_pages
+
+PAGE_SIZE = 5000
+XLSX_MAX_ROWS = 1048576   # filas por hoja en Excel (incluye el encabezado)
+
+
+class ExportCancelled(Exception):
+    """El usuario canceló la exportación (el archivo parcial se borra)."""
+
+
+class ExportResult:
+    """
+    Resultado de una exportación.
+
+    Parameters
+    ----------
+    path : str
+    rows : int
+        Filas escritas (sin el encabezado).
+    seconds : float
+    """
+    def __init__(self, path, rows, seconds):
+        self.path = path
+        self.rows = rows
+        self.seconds = seconds
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.rows} filas exportadas en {self.seconds:.1f} s "
+                f"({self.rows_per_sec:.0f} filas/s)\n{self.path}")
+
+
+def _cell(value):
+    return "" if value is None else value
+
+
+class _CSVWriter:
+    def __init__(self, path, columns):
+        # utf-8 con BOM: Excel abre bien acentos y ñ con doble clic.
+        self.f = open(path, "w", encoding="utf-8-sig", newline="")
+        self.w = csv.writer(self.f)
+        self.w.writerow(columns)
+
+    def write(self, rows):
+        self.w.writerows([_cell(v) for v in r] for r in rows)
+
+    def close(self):
+        self.f.close()
+
+
+class _XLSXWriter:
+    def __init__(self, path, columns):
+        try:
+            import openpyxl
+        except ImportError:
+            raise ValueError("Para exportar .xlsx instale openpyxl (pip install openpyxl) o elija CSV.")
+        self.path = path
+        self.columns = list(columns)
+        self.wb = openpyxl.Workbook(write_only=True)
+        self.sheets = 0
+        self._new_sheet()
+
+    def _new_sheet(self):
+        self.sheets += 1
+        self.ws = self.wb.create_sheet(title=f"Hoja{self.sheets}")
+        self.ws.append(self.columns)
+        self.used = 1
+
+    def write(self, rows):
+        for r in rows:
+            if self.used >= XLSX_MAX_ROWS:
+                self._new_sheet()
+            self.ws.append([_cell(v) for v in r])
+            self.used += 1
+
+    def close(self):
+        self.wb.save(self.path)
+
+
+WRITERS = {".csv": _CSVWriter, ".xlsx": _XLSXWriter}
+
+
+def write_rows(path, columns, pages, progress=None, cancel=None):
+    """
+    Escribe `pages` (iterable de listas de filas) en `path`; el formato sale de la extensión.
+
+    Params
+    ------
+    path : str
+        Archivo .csv o .xlsx.
+    columns : tuple[str]
+        Encabezados.
+    pages : iterable[list[tuple]]
+    progress : callable | None
+        `progress(filas_escritas)` después de cada página (se llama desde el hilo que exporta).
+    cancel : threading.Event | None
+        Si se activa, se detiene en la siguiente página y se borra el archivo parcial.
+
+    Returns
+    -------
+    ExportResult
+
+    Raises
+    ------
+    ValueError
+        Extensión no soportada o falta openpyxl.
+    ExportCancelled
+    RuntimeError
+        Error de consulta (el archivo parcial se borra).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in WRITERS:
+        raise ValueError("Formato no soportado: use .csv o .xlsx.")
+    t0 = time.perf_counter()
+    writer = WRITERS[ext](path, columns)
+    total = 0
+    try:
+        for rows in pages:
+            if cancel is not None and cancel.is_set():
+                raise ExportCancelled()
+            writer.write(rows)
+            total += len(rows)
+            if progress:
+                progress(total)
+        writer.close()
+    except BaseException:
+        try:
+            writer.close()
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    return ExportResult(path, total, time.perf_counter() - t0)
+
+
+def export_pager(client, pager, columns, path, progress=None, cancel=None, page_size=PAGE_SIZE):
+    """
+    Exporta todas las filas de un `KeysetPager` (listado o reporte paginado).
+
+    Returns
+    -------
+    ExportResult
+    """
+    pages = iter_pages(client, pager, page_size=page_size, strict=True)
+    return write_rows(path, columns, pages, progress, cancel)
+
+
+def export_report(client, report, values, path, progress=None, cancel=None, page_size=PAGE_SIZE):
+    """
+    Exporta un reporte de `reports.REPORTS` con sus parámetros ya validados (`report.bind`).
+
+    Returns
+    -------
+    ExportResult
+    """
+    limit = report.row_limit(values)
+    if limit is not None:
+        pages = [client.select_typed(*report.first_query(values), strict=True)]
+        return write_rows(path, report.columns, pages, progress, cancel)
+    return export_pager(client, report.pager(values), report.columns, path, progress, cancel, page_size)
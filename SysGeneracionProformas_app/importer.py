@@ -0,0 +1,349 @@
+"""
+Importación masiva del catálogo de repuestos desde CSV o XLSX.
+
+El archivo se lee en streaming y se valida fila a fila en Python; las filas válidas se
+cargan por bloques con INSERT multi-fila en `Repuesto_Staging` (un lote por importación)
+y al final `sp_Importar_Repuestos` las fusiona en `Repuesto` en una sola transacción.
+Las filas inválidas no detienen la importación: se informan con su número de línea.
+
+Uso sin interfaz gráfica:
+    python importer.py catalogo.csv [--config config.json] [--chunk 1000] [--errores errores.csv]
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+import unicodedata
+import uuid
+from decimal import Decimal, InvalidOperation
+from db import MySQLClient
+from settings import CONFIG_PATH, load_config
+
+COLUMNS = ("Nro_Parte", "Descripcion", "Marca", "Status", "Precio_Unitario", "Cantidad")
+REQUIRED = ("Nro_Parte", "Descripcion", "Marca", "Precio_Unitario")
+# Longitudes máximas (las de sp_Agregar_Repuesto).
+_MAX_LEN = {"Nro_Parte": 10, "Descripcion": 100, "Marca": 50, "Status": 10}
+_MAX_PRECIO = Decimal("99999999.99")   # DECIMAL(10,2)
+
+# Encabezado normalizado (minúsculas, sin tildes, "_" por espacios) -> columna.
+_ALIASES = {
+    "nro_parte": "Nro_Parte", "nro_de_parte": "Nro_Parte", "numero_de_parte": "Nro_Parte",
+    "n_parte": "Nro_Parte", "parte": "Nro_Parte", "part_number": "Nro_Parte", "codigo": "Nro_Parte",
+    "descripcion": "Descripcion", "description": "Descripcion",
+    "marca": "Marca", "brand": "Marca",
+    "status": "Status", "estado": "Status",
+    "precio_unitario": "Precio_Unitario", "precio": "Precio_Unitario", "price": "Precio_Unitario",
+    "cantidad": "Cantidad", "stock": "Cantidad", "qty": "Cantidad",
+}
+
+_STAGING_COLUMNS = "(Lote, Nro_Parte, Descripcion, Marca, Status, Precio_Unitario, Cantidad)"
+
+
+class ImportResult:
+    """
+    Resumen de una importación.
+
+    Parameters
+    ----------
+    read : int
+        Filas de datos leídas del archivo.
+    loaded : int
+        Filas válidas cargadas en staging.
+    inserted, updated : int
+        Repuestos nuevos / ya existentes (contados justo antes de la fusión).
+    errors : list[tuple[int, str]]
+        (línea del archivo, motivo) de cada fila rechazada.
+    seconds : float
+        Duración total.
+    error : str | None
+        Error que abortó la importación (nada se fusionó), o None.
+    """
+    def __init__(self):
+        self.read = 0
+        self.loaded = 0
+        self.inserted = 0
+        self.updated = 0
+        self.errors = []
+        self.seconds = 0.0
+        self.error = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def rows_per_sec(self):
+        return self.read / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self, max_errors=10):
+        """Texto para mostrar al usuario."""
+        lines = []
+        if self.error:
+            lines.append(f"Importación cancelada: {self.error}")
+        else:
+            lines.append(f"Insertados: {self.inserted}   Actualizados: {self.updated}")
+        lines.append(f"Leídas: {self.read}   Válidas: {self.loaded}   Con error: {len(self.errors)}")
+        lines.append(f"{self.seconds:.1f} s ({self.rows_per_sec:.0f} filas/s)")
+        for line_no, msg in self.errors[:max_errors]:
+            lines.append(f"  línea {line_no}: {msg}")
+        if len(self.errors) > max_errors:
+            lines.append(f"  ... y {len(self.errors) - max_errors} errores más")
+        return "\n".join(lines)
+
+    def write_errors(self, path):
+        """Guarda el detalle de filas rechazadas como CSV (Linea;Motivo)."""
+        with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            w = csv.writer(f, delimiter=";")
+            w.writerow(["Linea", "Motivo"])
+            w.writerows(self.errors)
+
+
+def _normalize_header(name):
+    text = unicodedata.normalize("NFKD", str(name or "")).encode("ascii", "ignore").decode()
+    return "_".join(text.lower().replace(".", " ").replace("°", " ").split())
+
+
+def csv_dialect(f):
+    """
+    Detecta el separador (, ; o tab) de un CSV abierto en modo texto y vuelve al inicio.
+    Si no se puede detectar, usa el dialecto `csv.excel` (comas).
+    """
+    sample = f.read(4096)
+    f.seek(0)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        return csv.excel
+
+
+def _iter_csv(path):
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.reader(f, csv_dialect(f)):
+            yield row
+
+
+def _iter_xlsx(path):
+    try:
+        import openpyxl
+    except ImportError:
+        raise ValueError("Para importar .xlsx instale openpyxl (pip install openpyxl) o guarde el archivo como CSV.")
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for row in wb.worksheets[0].iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        wb.close()
+
+
+def read_table(path):
+    """
+    Recorre el archivo fila a fila (sin cargarlo entero en memoria).
+
+    Yields
+    ------
+    (int, list)
+        (número de línea, valores). La primera es el encabezado.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    rows = _iter_xlsx(path) if ext in (".xlsx", ".xlsm") else _iter_csv(path)
+    for line_no, row in enumerate(rows, start=1):
+        yield line_no, row
+
+
+def map_header(header):
+    """
+    Índice de cada columna de `COLUMNS` en el encabezado.
+
+    Raises
+    ------
+    ValueError
+        Si falta alguna columna obligatoria.
+    """
+    index = {}
+    for i, name in enumerate(header):
+        col = _ALIASES.get(_normalize_header(name))
+        if col and col not in index:
+            index[col] = i
+    missing = [c for c in REQUIRED if c not in index]
+    if missing:
+        raise ValueError("Faltan columnas: " + ", ".join(missing))
+    return index
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)   # Excel guarda 4857395 como 4857395.0
+    return str(value).strip()
+
+
+def parse_row(index, values):
+    """
+    Valida y convierte una fila.
+
+    Returns
+    -------
+    tuple
+        (Nro_Parte, Descripcion, Marca, Status | None, Precio Decimal, Cantidad int | None)
+
+    Raises
+    ------
+    ValueError
+        Con el motivo del rechazo.
+    """
+    def get(col):
+        i = index.get(col)
+        return _text(values[i]) if i is not None and i < len(values) else ""
+
+    out = {}
+    for col in ("Nro_Parte", "Descripcion", "Marca", "Status"):
+        v = get(col)
+        if not v and col != "Status":
+            raise ValueError(f"{col} vacío")
+        if len(v) > _MAX_LEN[col]:
+            raise ValueError(f"{col} excede {_MAX_LEN[col]} caracteres")
+        out[col] = v or None
+
+    precio = get("Precio_Unitario").replace(" ", "")
+    if "," in precio and precio.rfind(",") > precio.rfind("."):
+        precio = precio.replace(".", "").replace(",", ".")   # 1.507,30 / 1507,3
+    try:
+        precio = Decimal(precio.replace(",", "")).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ValueError(f"Precio_Unitario inválido: {get('Precio_Unitario')!r}")
+    if precio.is_nan() or precio < 0 or precio > _MAX_PRECIO:
+        raise ValueError(f"Precio_Unitario fuera de rango: {precio}")
+
+    cant = get("Cantidad")
+    if cant:
+        try:
+            dec = Decimal(cant)
+        except InvalidOperation:
+            raise ValueError(f"Cantidad inválida: {cant!r}")
+        if not dec.is_finite() or dec != dec.to_integral_value() or not 0 <= dec <= 2147483647:
+            raise ValueError(f"Cantidad debe ser un entero >= 0: {cant!r}")
+        cant = int(dec)
+    else:
+        cant = None
+    return out["Nro_Parte"], out["Descripcion"], out["Marca"], out["Status"], precio, cant
+
+
+def _staging_insert(lote, rows):
+    """INSERT multi-fila de `rows` en Repuesto_Staging: (sql con marcadores `%s`, parámetros)."""
+    values = ",\n".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(rows))
+    params = [v for row in rows for v in (lote,) + tuple(row)]
+    return f"INSERT INTO Repuesto_Staging {_STAGING_COLUMNS} VALUES\n{values};", params
+
+
+def import_catalog(client, path, chunk_size=1000, progress=None):
+    """
+    Importa (inserta o actualiza) repuestos desde `path`.
+
+    Params
+    ------
+    client : MySQLClient
+    path : str
+        Archivo .csv (separador , ; o tab, UTF-8) o .xlsx (primera hoja).
+    chunk_size : int
+        Filas por INSERT multi-fila.
+    progress : callable | None
+        `progress(filas_leidas)` tras cada bloque (se llama desde el hilo que importa).
+
+    Returns
+    -------
+    ImportResult
+    """
+    res = ImportResult()
+    t0 = time.perf_counter()
+    lote = uuid.uuid4().hex
+    staged = False
+    try:
+        rows = read_table(path)
+        try:
+            _, header = next(rows)
+        except StopIteration:
+            raise ValueError("El archivo está vacío.")
+        index = map_header(header)
+
+        # Lotes de importaciones interrumpidas hace más de un día.
+        client.run_sql("DELETE FROM Repuesto_Staging WHERE Fecha_Carga < NOW() - INTERVAL 1 DAY;")
+
+        seen = {}
+        chunk = []
+
+        def flush():
+            ok, out = client.execute(*_staging_insert(lote, chunk))
+            if not ok:
+                raise RuntimeError(out)
+            res.loaded += len(chunk)
+            chunk.clear()
+            if progress is not None:
+                progress(res.read)
+
+        for line_no, values in rows:
+            if not any(_text(v) for v in values):
+                continue   # fila en blanco
+            res.read += 1
+            try:
+                row = parse_row(index, values)
+            except ValueError as ex:
+                res.errors.append((line_no, str(ex)))
+                continue
+            key = row[0].upper()
+            if key in seen:
+                res.errors.append((line_no, f"Nro_Parte {row[0]} repetido (ya está en la línea {seen[key]})"))
+                continue
+            seen[key] = line_no
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                staged = True
+                flush()
+        if chunk:
+            staged = True
+            flush()
+
+        if res.loaded:
+            ok, out = client.execute(
+                "SELECT COUNT(*) FROM Repuesto_Staging s JOIN Repuesto r ON r.Nro_Parte = s.Nro_Parte "
+                "WHERE s.Lote = %s;", [lote]
+            )
+            existing = int(out.split()[0]) if ok and out.split() else 0
+            ok, out = client.call("sp_Importar_Repuestos", lote)
+            if not ok:
+                raise RuntimeError(out)
+            staged = False   # el SP borra su lote
+            res.updated = existing
+            res.inserted = res.loaded - existing
+    except Exception as ex:
+        res.error = str(ex)
+    finally:
+        if staged:
+            client.execute("DELETE FROM Repuesto_Staging WHERE Lote = %s;", [lote])
+        res.seconds = time.perf_counter() - t0
+    return res
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Importa un catálogo de repuestos (CSV/XLSX).")
+    ap.add_argument("archivo")
+    ap.add_argument("--config", default=CONFIG_PATH)
+    ap.add_argument("--chunk", type=int, default=1000, help="filas por INSERT")
+    ap.add_argument("--errores", help="guarda las filas rechazadas en este CSV")
+    args = ap.parse_args(argv)
+
+    client = MySQLClient(**load_config(args.config))
+    try:
+        res = import_catalog(client, args.archivo, chunk_size=args.chunk,
+                             progress=lambda n: print(f"{n} filas...", file=sys.stderr))
+    finally:
+        client.close()
+    print(res.summary(), file=sys.stdout if res.ok else sys.stderr)
+    if args.errores and res.errors:
+        res.write_errors(args.errores)
+    return 0 if res.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+import bisect
+import tkinter as tk
+from collections import deque
+from tkinter import ttk
+from rows import display
+
+
+def row_iids(rows, key):
+    """iid de Treeview para cada fila: el valor de su PK (con sufijo si se repite)."""
+    seen = {}
+    out = []
+    for r in rows:
+        iid = str(r[key])
+        n = seen.get(iid, 0)
+        seen[iid] = n + 1
+        out.append(iid if n == 0 else f"{iid}#{n}")
+    return out
+
+
+def _stable_positions(positions):
+    """Índices (en `positions`) de una subsecuencia creciente más larga (LIS), en O(n log n)."""
+    tails, tails_idx, prev = [], [], [-1] * len(positions)
+    for i, p in enumerate(positions):
+        j = bisect.bisect_left(tails, p)
+        if j == len(tails):
+            tails.append(p)
+            tails_idx.append(i)
+        else:
+            tails[j] = p
+            tails_idx[j] = i
+        prev[i] = tails_idx[j - 1] if j > 0 else -1
+    keep = set()
+    i = tails_idx[-1] if tails_idx else -1
+    while i != -1:
+        keep.add(i)
+        i = prev[i]
+    return keep
+
+
+def reconcile(tv, rows, key, cache):
+    """
+    Lleva el Treeview `tv` a `rows` aplicando solo las diferencias por PK:
+    borra las filas que ya no están, inserta las nuevas, actualiza las que cambiaron
+    y mueve únicamente las que quedaron fuera de orden (las que no forman parte de la
+    subsecuencia ordenada más larga). Los ítems que siguen existiendo conservan
+    selección y posición de scroll.
+
+    Params
+    ------
+    tv : ttk.Treeview
+    rows : list[list]
+        Resultado nuevo, en el orden deseado (valores tipados; se muestran con `rows.display`).
+    key : int
+        Índice de la columna PK en cada fila.
+    cache : dict
+        iid -> fila actualmente mostrada (se actualiza en el lugar). Se usa en vez de
+        `tv.item(iid, "values")` porque Tk convierte a número valores como '0051'.
+
+    Returns
+    -------
+    list[str]
+        iids en el orden final.
+    """
+    iids = row_iids(rows, key)
+    wanted = set(iids)
+    gone = [iid for iid in cache if iid not in wanted]
+    if gone:
+        tv.delete(*gone)
+        for iid in gone:
+            del cache[iid]
+
+    current = {iid: i for i, iid in enumerate(tv.get_children())} if cache else {}
+    existing = [i for i, iid in enumerate(iids) if iid in current]
+    stable = {existing[j] for j in _stable_positions([current[iids[i]] for i in existing])}
+
+    for i, (iid, r) in enumerate(zip(iids, rows)):
+        r = list(r)
+        if i in stable:
+            if cache[iid] != r:
+                tv.item(iid, values=display(r))
+        else:
+            index = 0 if i == 0 else tv.index(iids[i - 1]) + 1
+            if iid in cache:
+                if index and tv.index(iid) < index:
+                    index -= 1   # `move` cuenta la posición sin el propio ítem
+                tv.move(iid, "", index)
+                if cache[iid] != r:
+                    tv.item(iid, values=display(r))
+            else:
+                tv.insert("", index, iid=iid, values=display(r))
+        cache[iid] = r
+    return iids
+
+
+class TreeSync:
+    """Treeview que se refresca con `reconcile` (clave = columna `key`)."""
+    def __init__(self, tv, key=0):
+        self.tv = tv
+        self.key = key
+        self.rows = {}
+
+    def apply(self, rows):
+        return reconcile(self.tv, rows, self.key, self.rows)
+
+
+class VirtualTreeview:
+    """
+    Lista virtualizada sobre un `ttk.Treeview`: mantiene en el widget solo una ventana de
+    `max_pages` páginas y pide la siguiente/anterior al acercarse al borde del scroll.
+
+    Parameters
+    ----------
+    tv : ttk.Treeview
+        Treeview ya creado (columnas configuradas).
+    pager : KeysetPager
+        Generador de SQL de páginas.
+    run : callable
+        `run(sql, on_rows, on_drop)`: ejecuta el SELECT en segundo plano y llama `on_rows(filas)`
+        en el hilo de Tk, o `on_drop()` si la respuesta se descarta (cancelada o reemplazada;
+        ver `QueryExecutor.submit`). `sql` es la tupla `(sql, params)` del pager.
+    scrollbar : ttk.Scrollbar | None
+        Barra vertical a mantener sincronizada.
+    max_pages : int
+        Páginas materializadas como máximo.
+    edge : float
+        Fracción del scroll (0..1) a partir de la cual se pide otra página.
+    """
+    def __init__(self, tv, pager, run, scrollbar=None, max_pages=3, edge=0.15):
+        self.tv = tv
+        self.pager = pager
+        self.run = run
+        self.scrollbar = scrollbar
+        self.max_pages = max_pages
+        self.edge = edge
+        self.pages = deque()      # cada página: lista de iids del Treeview (iid = PK)
+        self.rows = {}            # iid -> fila (claves de los extremos y caché de `reconcile`)
+        self.key = pager.order[-1][2]
+        self.more_below = False
+        self.more_above = False
+        self._loading = False
+        self._generation = 0      # invalida respuestas de páginas pedidas antes de un reload
+        tv.configure(yscrollcommand=self._on_scroll)
+
+    def reload(self):
+        """Descarta lo cargado y pide la primera página."""
+        self._generation += 1
+        self._request(self.pager.first_sql(), self._on_first)
+
+    def show(self, rows):
+        """
+        Muestra un conjunto fijo de filas (p. ej. resultados de una búsqueda) sin paginar
+        ni pedir más al hacer scroll; `reload`/`refresh` vuelven al listado.
+        """
+        self._generation += 1
+        self._loading = False
+        self._on_first(rows)
+        self.more_below = False
+        self.pages.clear()   # sin ventana cargada: `refresh` hace un `reload` completo
+
+    def refresh(self):
+        """
+        Vuelve a consultar la ventana cargada (desde su primera fila, la misma cantidad)
+        y aplica solo las diferencias: se conservan scroll y selección.
+        """
+        if not self.pages:
+            return self.reload()
+        self._generation += 1
+        count = sum(len(p) for p in self.pages)
+        if self.more_above:
+            sql = self.pager.from_sql(self.rows[self.pages[0][0]], count)
+        else:
+            sql = self.pager.first_sql(count)
+        self._request(sql, lambda rows: self._on_refresh(rows, count))
+
+    def _on_refresh(self, rows, count):
+        iids = reconcile(self.tv, rows, self.key, self.rows)
+        size = self.pager.page_size
+        self.pages = deque(iids[i:i + size] for i in range(0, len(iids), size))
+        self.more_below = len(rows) >= count
+
+    def _request(self, sql, handler):
+        gen = self._generation
+        self._loading = True
+
+        def done(rows):
+            if gen != self._generation:
+                return
+            self._loading = False
+            handler(rows)
+
+        def dropped():
+            # Sin respuesta: el próximo scroll vuelve a pedir la página.
+            if gen == self._generation:
+                self._loading = False
+        self.run(sql, done, dropped)
+
+    def _insert_page(self, rows, at_top=False):
+        """
+        Agrega una página al final, o al principio con `at_top` (en ese caso `rows` viene de
+        `prev_sql`: la fila más cercana primero). Cada página se guarda en orden de pantalla.
+        """
+        iids = []
+        index = 0 if at_top else tk.END
+        for r in rows:   # al principio: cada fila, más lejana, queda encima de la anterior
+            iid = self.tv.insert("", index, iid=str(r[self.key]), values=display(r))
+            self.rows[iid] = list(r)
+            iids.append(iid)
+        if at_top:
+            iids.reverse()
+            self.pages.appendleft(iids)
+        else:
+            self.pages.append(iids)
+
+    def _drop_page(self, from_top):
+        iids = self.pages.popleft() if from_top else self.pages.pop()
+        self.tv.delete(*iids)
+        for iid in iids:
+            self.rows.pop(iid, None)
+        return len(iids)
+
+    def _on_first(self, rows):
+        self.tv.delete(*self.tv.get_children())
+        self.pages.clear()
+        self.rows.clear()
+        self._insert_page(rows)
+        self.more_below = len(rows) >= self.pager.page_size
+        self.more_above = False
+
+    def _on_next(self, rows):
+        if rows:
+            self._insert_page(rows)
+            if len(self.pages) > self.max_pages:
+                removed = self._drop_page(from_top=True)
+                self.more_above = True
+                self.tv.yview_scroll(-removed, "units")   # compensa las filas quitadas arriba
+        self.more_below = len(rows) >= self.pager.page_size
+
+    def _on_prev(self, rows):
+        if rows:
+            self._insert_page(rows, at_top=True)
+            self.tv.yview_scroll(len(rows), "units")       # mantiene a la vista las mismas filas
+            if len(self.pages) > self.max_pages:
+                self._drop_page(from_top=False)
+                self.more_below = True
+        self.more_above = len(rows) >= self.pager.page_size
+
+    def _on_scroll(self, first, last):
+        """yscrollcommand del Treeview: sincroniza la barra y pide páginas cerca de los bordes."""
+        if self.scrollbar is not None:
+            self.scrollbar.set(first, last)
+        if self._loading or not self.pages:
+            return
+        first, last = float(first), float(last)
+        if self.more_below and last >= 1.0 - self.edge:
+            self._request(self.pager.next_sql(self.rows[self.pages[-1][-1]]), self._on_next)
+        elif self.more_above and first <= self.edge:
+            self._request(self.pager.prev_sql(self.rows[self.pages[0][0]]), self._on_prev)
+
+
+def scrolled_treeview(parent, cols, width=120, height=10):
+    """
+    Crea un Treeview con barra vertical dentro de `parent` (empaquetado con fill/expand).
+
+    Returns
+    -------
+    (ttk.Treeview, ttk.Scrollbar)
+    """
+    frame = ttk.Frame(parent)
+    frame.pack(fill="both", expand=True)
+    tv = ttk.Treeview(frame, columns=cols, show="headings", height=height)
+    sb = ttk.Scrollbar(frame, orient="vertical", command=tv.yview)
+    for c in cols:
+        tv.heading(c, text=c)
+        tv.column(c, width=width, anchor="w")
+    sb.pack(side="right", fill="y")
+    tv.pack(side="left", fill="both", expand=True)
+    return tv, sb
@@ -0,0 +1,221 @@
+"""
+Índice en memoria de las claves foráneas de los formularios (empleados, proveedores,
+empresas y repuestos): autocompletado y validación local antes de llamar a los SP.
+
+Cada catálogo se carga una vez (en segundo plano) y después se mantiene al día por clave:
+  * las altas/bajas hechas desde la app actualizan solo esa clave (`refresh_key`);
+  * una clave que no está en el índice se confirma con una consulta por PK antes de
+    rechazarla (la pudo crear otro usuario) y, si existe, queda agregada;
+  * el catálogo se recarga entero al pasar `max_age` o tras una importación (`invalidate`).
+
+Las claves se comparan sin distinguir mayúsculas, igual que la collation de la BD.
+"""
+import threading
+import time
+
+SEP = " — "   # separador clave / descripción en las sugerencias
+
+
+class Catalog:
+    """
+    Tabla de referencia de un campo de formulario.
+
+    Parameters
+    ----------
+    name : str
+        Clave del catálogo ("empleado", "proveedor", ...).
+    title : str
+        Nombre del campo para los mensajes.
+    table, key, label : str
+        Tabla, columna PK y columna descriptiva.
+    labels : bool
+        Guarda las descripciones en memoria. False en catálogos grandes (Repuesto):
+        solo se guardan las claves, que es lo que se valida.
+    """
+    def __init__(self, name, title, table, key, label, labels=True):
+        self.name = name
+        self.title = title
+        self.table = table
+        self.key = key
+        self.label = label
+        self.labels = labels
+
+    def load_sql(self):
+        cols = f"{self.key}, {self.label}" if self.labels else self.key
+        return f"SELECT {cols} FROM {self.table};"
+
+    def key_sql(self):
+        return f"SELECT {self.key}, {self.label} FROM {self.table} WHERE {self.key} = %s;"
+
+
+CATALOGS = {c.name: c for c in (
+    Catalog("empleado", "Codigo_Empleado", "Empleado", "Codigo", "Nombre"),
+    Catalog("proveedor", "RUC_Proveedor", "Proveedor", "RUC", "Raz_Soc"),
+    Catalog("empresa", "RUC_Empresa", "Empresa", "RUC", "Raz_Soc"),
+    Catalog("repuesto", "Nro_Parte", "Repuesto", "Nro_Parte", "Descripcion", labels=False),
+)}
+
+
+def key_of(text):
+    """Clave de un texto de sugerencia ("E0001 — Juan Pérez" -> "E0001")."""
+    return (text or "").split(SEP, 1)[0].strip()
+
+
+def _lower_bound(keys, folded):
+    """Primer índice de `keys` (ordenada sin mayúsculas) cuya clave es >= `folded`."""
+    lo, hi = 0, len(keys)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if keys[mid].casefold() < folded:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+class LookupIndex:
+    """
+    Claves (y descripciones) de los `CATALOGS`, compartidas entre el hilo de Tk y los
+    hilos del executor.
+
+    Parameters
+    ----------
+    max_age : float
+        Segundos tras los que un catálogo se vuelve a cargar completo.
+    """
+    def __init__(self, max_age=600):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._keys = {}     # catálogo -> claves ordenadas sin distinguir mayúsculas
+        self._labels = {}   # catálogo -> {clave.casefold(): descripción}
+        self._loaded = {}   # catálogo -> time.monotonic() de la última carga completa
+
+    def is_loaded(self, name):
+        return name in self._keys
+
+    def needs_load(self, name):
+        loaded = self._loaded.get(name)
+        return loaded is None or time.monotonic() - loaded > self.max_age
+
+    def invalidate(self, name=None):
+        """Fuerza la recarga completa en el próximo `load_stale` (se sigue usando lo cargado)."""
+        with self._lock:
+            for n in ([name] if name else list(self._loaded)):
+                self._loaded.pop(n, None)
+
+    def load(self, client, name):
+        """
+        Carga completa de un catálogo (se llama desde el executor).
+
+        Raises
+        ------
+        RuntimeError
+            Si la consulta falla.
+        """
+        cat = CATALOGS[name]
+        rows = client.select_typed(cat.load_sql(), strict=True)
+        keys = sorted((str(r[0]) for r in rows), key=str.casefold)
+        labels = {str(r[0]).casefold(): str(r[1]) for r in rows} if cat.labels else None
+        with self._lock:
+            self._keys[name] = keys
+            if labels is not None:
+                self._labels[name] = labels
+            self._loaded[name] = time.monotonic()
+
+    def load_stale(self, client, names=None):
+        """Carga los catálogos nunca cargados o vencidos. Devuelve sus nombres."""
+        todo = [n for n in (names or CATALOGS) if self.needs_load(n)]
+        for name in todo:
+            self.load(client, name)
+        return todo
+
+    def contains(self, name, key):
+        """True/False según el índice; None si el catálogo aún no se cargó."""
+        keys = self._keys.get(name)
+        if keys is None:
+            return None
+        folded = key.casefold()
+        with self._lock:
+            i = _lower_bound(keys, folded)
+            return i < len(keys) and keys[i].casefold() == folded
+
+    def matches(self, name, text, limit=20):
+        """
+        Sugerencias para lo escrito: claves que empiezan con `text` y, en catálogos con
+        descripciones, también las que la contienen ("clave — descripción").
+        """
+        keys = self._keys.get(name)
+        if keys is None:
+            return []
+        folded = key_of(text).casefold()
+        labels = self._labels.get(name)
+        out = []
+        with self._lock:
+            i = _lower_bound(keys, folded)
+            while i < len(keys) and len(out) < limit and keys[i].casefold().startswith(folded):
+                out.append(keys[i])
+                i += 1
+            if labels is not None and folded and len(out) < limit:
+                seen = {k.casefold() for k in out}
+                for k in keys:
+                    f = k.casefold()
+                    if f not in seen and folded in labels.get(f, "").casefold():
+                        out.append(k)
+                        if len(out) >= limit:
+                            break
+        if labels is None:
+            return out
+        return [f"{k}{SEP}{labels.get(k.casefold(), '')}" for k in out]
+
+    def refresh_key(self, client, name, key):
+        """
+        Consulta una clave por PK y actualiza el índice (alta, cambio de descripción o baja).
+
+        Returns
+        -------
+        bool
+            Si la clave existe en la BD.
+        """
+        cat = CATALOGS[name]
+        rows = client.select_typed(cat.key_sql(), [key], strict=True)
+        folded = key.casefold()
+        with self._lock:
+            keys = self._keys.get(name)
+            if keys is None:
+                return bool(rows)
+            i = _lower_bound(keys, folded)
+            present = i < len(keys) and keys[i].casefold() == folded
+            if rows and not present:
+                keys.insert(i, str(rows[0][0]))
+            elif not rows and present:
+                del keys[i]
+            labels = self._labels.get(name)
+            if labels is not None:
+                if rows:
+                    labels[folded] = str(rows[0][1])
+                else:
+                    labels.pop(folded, None)
+        return bool(rows)
+
+    def missing(self, client, fields):
+        """
+        Valida claves foráneas antes de un CALL. Lo que está en el índice no consulta la BD;
+        lo que falta se confirma por PK (una consulta por clave).
+
+        Params
+        ------
+        fields : iterable[tuple[str, str]]
+            (catálogo, clave); las claves vacías se ignoran (campos opcionales).
+
+        Returns
+        -------
+        list[str]
+            Mensajes para el usuario, uno por clave inexistente.
+        """
+        out = []
+        for name, key in fields:
+            if not key or self.contains(name, key):
+                continue
+            if not self.refresh_key(client, name, key):
+                out.append(f"{CATALOGS[name].title} no existe: {key}")
+        return out
@@ -0,0 +1,173 @@
+"""
+Migraciones de esquema versionadas.
+
+Cada script de /sql se registra en la tabla `schema_version` con el SHA-256 de su
+contenido. Al iniciar basta una consulta para saber si hay algo que aplicar; solo
+se ejecutan los scripts nuevos o modificados (en el orden de `SCRIPTS`).
+
+Uso sin interfaz gráfica:
+    python migrations.py [--config config.json] [--status] [--force]
+"""
+import argparse
+import hashlib
+import os
+import sys
+from db import MySQLClient
+from settings import CONFIG_PATH, load_config
+
+# (archivo, use_db, una_sola_vez). Los scripts "una sola vez" (seed, cambios de estructura)
+# no se vuelven a ejecutar aunque cambien; los demás son idempotentes (DROP/CREATE) y se reaplican.
+SCRIPTS = [
+    ("schema_seed.sql", False, True),
+    ("procedures_all.sql", True, False),
+    ("triggers.sql", True, False),
+    ("import_repuesto.sql", True, False),
+    ("proforma_detalle.sql", True, True),
+    ("proforma_empresa.sql", True, True),
+    ("resumenes.sql", True, False),
+    ("rendimiento.sql", True, True),
+    ("busqueda.sql", True, True),
+    ("replica.sql", True, False),
+]
+# Script base: en una BD con datos pero sin `schema_version` se da por aplicado.
+SEED = "schema_seed.sql"
+
+VERSION_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+  Script VARCHAR(100) NOT NULL,
+  Checksum CHAR(64) NOT NULL,
+  Fecha_Aplicacion DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (Script)
+) ENGINE = InnoDB;
+"""
+
+
+def file_checksum(path):
+    """SHA-256 (hex) del contenido del archivo."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def applied_versions(client):
+    """
+    Lee `schema_version` (una sola consulta).
+
+    Returns
+    -------
+    dict[str, str] | None
+        Script -> checksum, o None si la BD o la tabla aún no existen.
+    """
+    ok, out = client.run_sql("SELECT Script, Checksum FROM schema_version;")
+    if not ok:
+        return None
+    versions = {}
+    for line in out.splitlines():
+        parts = line.split("\t")
+        if len(parts) >= 2:
+            versions[parts[0]] = parts[1]
+    return versions
+
+
+def pending(client, sql_dir, force=False):
+    """
+    Scripts que faltan aplicar.
+
+    Returns
+    -------
+    list[tuple[str, bool, str]]
+        (archivo, use_db, checksum) en orden de aplicación.
+    """
+    versions = applied_versions(client) or {}
+    todo = []
+    for fname, use_db, once in SCRIPTS:
+        path = os.path.join(sql_dir, fname)
+        if not os.path.exists(path):
+            continue
+        checksum = file_checksum(path)
+        applied = versions.get(fname)
+        if applied is None or (not once and (force or applied != checksum)):
+            todo.append((fname, use_db, checksum))
+    return todo
+
+
+def _record(client, fname, checksum):
+    ok, out = client.run_sql(VERSION_TABLE_SQL)
+    if ok:
+        ok, out = client.execute(
+            "REPLACE INTO schema_version (Script, Checksum) VALUES (%s, %s);", [fname, checksum]
+        )
+    return ok, out
+
+
+def _has_data(client):
+    """True si Empleado existe y tiene filas (BD anterior a `schema_version`)."""
+    ok, out = client.run_sql("SELECT COUNT(*) FROM Empleado;")
+    return ok and out.strip().splitlines()[:1] not in ([], ["0"])
+
+
+def migrate(client, sql_dir, force=False):
+    """
+    Aplica los scripts pendientes y los registra en `schema_version`.
+
+    Params
+    ------
+    client : MySQLClient
+    sql_dir : str
+        Carpeta con los .sql.
+    force : bool
+        Reaplica los scripts idempotentes aunque no hayan cambiado
+        (los "una sola vez" ya registrados nunca se repiten).
+
+    Returns
+    -------
+    (bool, str)
+        True + resumen si ok; False + "Error en <archivo>: ..." en el primer fallo.
+    """
+    todo = pending(client, sql_dir, force=force)
+    if not todo:
+        return True, "Esquema al día."
+    done = []
+    for fname, use_db, checksum in todo:
+        if fname == SEED and _has_data(client):
+            # BD creada antes de existir `schema_version`: el seed ya se aplicó, solo se registra.
+            ok, out = _record(client, fname, checksum)
+            if not ok:
+                return False, f"Error registrando {fname}:\n{out}"
+            continue
+        ok, out = client.run_sql_file(os.path.join(sql_dir, fname), use_db=use_db)
+        if not ok:
+            return False, f"Error en {fname}:\n{out}"
+        ok, out = _record(client, fname, checksum)
+        if not ok:
+            return False, f"Error registrando {fname}:\n{out}"
+        done.append(fname)
+    return True, ("Aplicados: " + ", ".join(done)) if done else "Esquema al día."
+
+
+def main(argv=None):
+    here = os.path.dirname(os.path.abspath(__file__))
+    ap = argparse.ArgumentParser(description="Aplica las migraciones SQL pendientes.")
+    ap.add_argument("--config", default=CONFIG_PATH)
+    ap.add_argument("--sql-dir", default=os.path.join(here, "sql"))
+    ap.add_argument("--status", action="store_true", help="solo lista los scripts pendientes")
+    ap.add_argument("--force", action="store_true", help="reaplica los scripts idempotentes aunque no hayan cambiado")
+    args = ap.parse_args(argv)
+
+    client = MySQLClient(**load_config(args.config))
+    try:
+        if args.status:
+            for fname, _, checksum in pending(client, args.sql_dir, force=args.force):
+                print(f"pendiente\t{fname}\t{checksum}")
+            return 0
+        ok, out = migrate(client, args.sql_dir, force=args.force)
+        print(out, file=sys.stdout if ok else sys.stderr)
+        return 0 if ok else 1
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Paginación por clave (keyset) sin interfaz: `KeysetPager` genera el SQL de cada página e
+`iter_pages` las recorre. No importa tkinter, así que lo usan también reports.py, export.py
+y cli.py sin cargar Tk; listing.py lo reexporta para las listas virtualizadas.
+"""
+
+
+class KeysetPager:
+    """
+    Genera el SQL de páginas con paginación por clave (keyset / "seek method").
+
+    En vez de `LIMIT n OFFSET m` (que recorre y descarta m filas), cada página continúa
+    desde la última fila vista: `WHERE (k1, k2) > (v1, v2) ORDER BY k1, k2 LIMIT n`.
+    La comparación se expande a ORs para que MySQL use el índice de las columnas de orden.
+    Cada consulta se genera como `(sql, params)` (para `MySQLClient.select_typed`): los valores
+    de la fila de corte van siempre como parámetros enlazados, nunca como literales.
+
+    Parameters
+    ----------
+    select : str
+        SELECT ... FROM ... (sin WHERE / ORDER BY / LIMIT).
+    order : list[tuple[str, bool, int]]
+        Claves de orden: (expresión SQL, descendente, índice de la columna en la fila).
+        La última clave debe hacer único el orden (ej. la PK).
+    where : str | None
+        Filtro fijo opcional.
+    page_size : int
+        Filas por página.
+    params : list | None
+        Valores de los marcadores `%s` de `select` y `where`, en orden.
+    row : rows.RowType | None
+        Tipos de las columnas de `select`, para pedir las páginas como registros tipados.
+    """
+    def __init__(self, select, order, where=None, page_size=200, params=None, row=None):
+        self.select = select.strip().rstrip(";")
+        self.order = list(order)
+        self.where = where
+        self.page_size = page_size
+        self.params = list(params or ())
+        self.row = row
+
+    @staticmethod
+    def _value(value, bound):
+        """Marcador `%s` (el valor se agrega a `bound`)."""
+        bound.append(value)
+        return "%s"
+
+    def _seek(self, row, forward, inclusive, bound):
+        """Predicado "después de `row`" (o "antes de", si not forward) según el orden."""
+        terms = []
+        last = len(self.order) - 1
+        for i, (expr, desc, idx) in enumerate(self.order):
+            op = ">" if desc != forward else "<"
+            if inclusive and i == last:
+                op += "="
+            eqs = [f"{e} = {self._value(row[j], bound)}" for e, _, j in self.order[:i]]
+            terms.append("(" + " AND ".join(eqs + [f"{expr} {op} {self._value(row[idx], bound)}"]) + ")")
+        return "(" + " OR ".join(terms) + ")"
+
+    def _sql(self, row=None, forward=True, inclusive=False, limit=None):
+        bound = list(self.params)
+        seek = self._seek(row, forward, inclusive, bound) if row is not None else None
+        where = f"({self.where})" if self.where else None   # un OR en `where` no debe absorber el seek
+        conds = [c for c in (where, seek) if c]
+        order = ", ".join(f"{e} {'DESC' if desc == forward else 'ASC'}" for e, desc, _ in self.order)
+        sql = self.select
+        if conds:
+            sql += " WHERE " + " AND ".join(conds)
+        sql = f"{sql} ORDER BY {order} LIMIT {int(limit or self.page_size)};"
+        return sql, bound
+
+    def first_sql(self, limit=None):
+        """Primera página (o las primeras `limit` filas)."""
+        return self._sql(limit=limit)
+
+    def from_sql(self, first_row, limit):
+        """`limit` filas desde `first_row` inclusive (para refrescar la ventana cargada)."""
+        return self._sql(first_row, True, inclusive=True, limit=limit)
+
+    def next_sql(self, last_row):
+        """Página siguiente a `last_row` (última fila cargada)."""
+        return self._sql(last_row, True)
+
+    def prev_sql(self, first_row):
+        """Página anterior a `first_row`, en orden inverso (el llamador la invierte)."""
+        return self._sql(first_row, False)
+
+
+def iter_pages(client, pager, page_size=None, strict=False):
+    """
+    Recorre todas las filas de `pager` página por página (memoria constante), sin Treeview.
+
+    Params
+    ------
+    client : MySQLClient
+    pager : KeysetPager
+    page_size : int | None
+        Filas por consulta (por defecto, las del pager).
+    strict : bool
+        Propaga los errores de consulta (ver `MySQLClient.select_typed`).
+
+    Yields
+    ------
+    list[tuple]
+        Cada página no vacía.
+    """
+    if page_size and page_size != pager.page_size:
+        pager = KeysetPager(pager.select, pager.order, pager.where, page_size, pager.params, pager.row)
+
+    def fetch(query):
+        return client.select_typed(*query, strict=strict, row=pager.row)
+
+    rows = fetch(pager.first_sql())
+    while rows:
+        yield rows
+        if len(rows) < pager.page_size:
+            return
+        rows = fetch(pager.next_sql(rows[-1]))
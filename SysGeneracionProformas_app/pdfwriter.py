@@ -0,0 +1,174 @@
+"""
+Escritor de PDF mínimo (sin dependencias): páginas con texto, líneas y rectángulos
+usando las fuentes estándar Helvetica / Helvetica-Bold (no se incrustan, todo visor
+PDF las trae), codificación WinAnsi (acentos y ñ) y contenido comprimido con zlib.
+"""
+import zlib
+
+# Anchos (1/1000 de em) de Helvetica y Helvetica-Bold para los códigos 32..126 (AFM de Adobe).
+_HELVETICA = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_HELVETICA_BOLD = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+# Letras acentuadas: mismo ancho que la letra base.
+_ACCENTED = {"á": "a", "é": "e", "í": "i", "ó": "o", "ú": "u", "ü": "u", "ñ": "n",
+             "Á": "A", "É": "E", "Í": "I", "Ó": "O", "Ú": "U", "Ü": "U", "Ñ": "N"}
+
+
+def _width_table(widths):
+    table = {chr(32 + i): w for i, w in enumerate(widths)}
+    for ch, base in _ACCENTED.items():
+        table[ch] = table[base]
+    table["°"] = 400
+    return table
+
+
+# Fuentes: nombre de recurso -> (BaseFont, tabla de anchos). Se arman una vez por proceso.
+FONTS = {
+    "F1": ("Helvetica", _width_table(_HELVETICA)),
+    "F2": ("Helvetica-Bold", _width_table(_HELVETICA_BOLD)),
+}
+
+
+def text_width(text, font="F1", size=10):
+    """Ancho en puntos de `text` con la fuente y el tamaño dados."""
+    table = FONTS[font][1]
+    return sum(table.get(ch, 556) for ch in text) * size / 1000.0
+
+
+def fit_text(text, width, font="F1", size=10):
+    """Recorta `text` (con '...') para que no supere `width` puntos."""
+    table = FONTS[font][1]
+    limit = width * 1000.0 / size
+    if sum(table.get(ch, 556) for ch in text) <= limit:
+        return text
+    limit -= 3 * table["."]
+    acc = 0
+    for i, ch in enumerate(text):
+        acc += table.get(ch, 556)
+        if acc > limit:
+            return text[:i] + "..."
+    return text
+
+
+def _pdf_string(text):
+    data = text.encode("cp1252", errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _num(v):
+    return ("%.2f" % v).rstrip("0").rstrip(".") or "0"
+
+
+class Page:
+    """Página en construcción; las coordenadas tienen el origen arriba a la izquierda (en puntos)."""
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self._ops = []
+
+    def text(self, x, y, text, font="F1", size=10, align="left"):
+        """Escribe `text` con la línea base en `y`; align = left | right | center respecto de `x`."""
+        if align != "left":
+            w = text_width(text, font, size)
+            x -= w if align == "right" else w / 2
+        self._ops.append(b"BT /%s %s Tf %s %s Td %s Tj ET" % (
+            font.encode(), _num(size).encode(), _num(x).encode(), _num(self.height - y).encode(),
+            _pdf_string(text)))
+
+    def line(self, x1, y1, x2, y2, width=0.5):
+        self._ops.append(b"%s w %s %s m %s %s l S" % (
+            _num(width).encode(), _num(x1).encode(), _num(self.height - y1).encode(),
+            _num(x2).encode(), _num(self.height - y2).encode()))
+
+    def rect(self, x, y, w, h, gray=None, width=0.5):
+        """Rectángulo con esquina superior izquierda (x, y); relleno gris (0..1) si `gray`."""
+        box = b"%s %s %s %s re" % (_num(x).encode(), _num(self.height - y - h).encode(),
+                                   _num(w).encode(), _num(h).encode())
+        if gray is not None:
+            self._ops.append(b"q %s g %s f Q" % (_num(gray).encode(), box))
+        else:
+            self._ops.append(b"%s w %s S" % (_num(width).encode(), box))
+
+    def content(self):
+        return b"\n".join(self._ops)
+
+
+class PDFDocument:
+    """
+    Documento PDF en memoria.
+
+    Parameters
+    ----------
+    width, height : float
+        Tamaño de página en puntos (A4 = 595 x 842).
+    title : str
+        Título de los metadatos.
+    """
+    def __init__(self, width=595, height=842, title=""):
+        self.width = width
+        self.height = height
+        self.title = title
+        self.pages = []
+
+    def add_page(self):
+        page = Page(self.width, self.height)
+        self.pages.append(page)
+        return page
+
+    def to_bytes(self):
+        """Serializa el documento (objetos + tabla xref)."""
+        objects = []   # cuerpo de cada objeto; el número es índice + 1
+
+        def add(body):
+            objects.append(body)
+            return len(objects)
+
+        catalog = add(None)
+        pages_obj = add(None)
+        fonts = {name: add(b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>"
+                           % base.encode())
+                 for name, (base, _table) in FONTS.items()}
+        font_res = b" ".join(b"/%s %d 0 R" % (n.encode(), num) for n, num in fonts.items())
+        kids = []
+        for page in self.pages:
+            data = zlib.compress(page.content())
+            stream = add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(data), data))
+            kids.append(add(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s] "
+                            b"/Resources << /Font << %s >> >> /Contents %d 0 R >>"
+                            % (pages_obj, _num(self.width).encode(), _num(self.height).encode(), font_res, stream)))
+        objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_obj
+        objects[pages_obj - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+        info = add(b"<< /Title %s /Producer (SysGeneracionProformas) >>" % _pdf_string(self.title))
+
+        out = [b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"]
+        offsets = []
+        pos = len(out[0])
+        for i, body in enumerate(objects, start=1):
+            chunk = b"%d 0 obj\n%s\nendobj\n" % (i, body)
+            offsets.append(pos)
+            out.append(chunk)
+            pos += len(chunk)
+        xref = [b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)]
+        xref += [b"%010d 00000 n \n" % off for off in offsets]
+        out.append(b"".join(xref))
+        out.append(b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                   % (len(objects) + 1, catalog, info, pos))
+        return b"".join(out)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
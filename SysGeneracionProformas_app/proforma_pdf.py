@@ -0,0 +1,478 @@
+"""
+Proforma en PDF: cabecera + líneas con precios de Repuesto, datos del Empleado y de la
+Empresa cliente, maquetados según plantillas/proforma.json (ver pdfwriter.py).
+
+La plantilla se parsea una vez por proceso (se vuelve a leer solo si el archivo cambia).
+Para un rango de fechas las proformas se traen por bloques (paginación por clave sobre
+Fecha, Nro_Proforma: dos consultas por bloque) y cada bloque se reparte en un pool de
+procesos mientras se pide el siguiente; todo funciona sin conexión a internet.
+
+Uso sin interfaz gráfica:
+    python proforma_pdf.py PF-0001 [-o PF-0001.pdf]
+    python proforma_pdf.py --desde 2024-01-01 --hasta 2024-12-31 -o carpeta [--procesos 4]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from db import MySQLClient
+from paging import KeysetPager, iter_pages
+from pdfwriter import PDFDocument, fit_text
+from rows import RowType
+from settings import CONFIG_PATH, load_config
+
+TEMPLATE = os.path.join(getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__))),
+                        "plantillas", "proforma.json")
+
+_HEADER = RowType("ProformaCabecera", [
+    ("Nro_Proforma", str), ("Fecha", date), ("Codigo_Empleado", str), ("Empleado", str), ("Telefono_Empleado", str),
+    ("RUC_Empresa", str), ("Raz_Soc", str), ("Direccion", str), ("Telefono", str), ("Correo", str)])
+_HEADER_SELECT = """
+SELECT p.Nro_Proforma, p.Fecha, p.Codigo_Empleado, e.Nombre, ce.Telefono,
+       p.RUC_Empresa, em.Raz_Soc, NULLIF(CONCAT_WS(' - ', d.Calle, d.Distrito, d.Ciudad), ''),
+       te.Telefono, co.Correo
+FROM Proforma p
+INNER JOIN Empleado e ON e.Codigo = p.Codigo_Empleado
+LEFT JOIN Contacto_Empleado ce ON ce.Codigo_Empleado = p.Codigo_Empleado
+LEFT JOIN Empresa em ON em.RUC = p.RUC_Empresa
+LEFT JOIN Direccion_Empresa d ON d.RUC_Empresa = p.RUC_Empresa
+LEFT JOIN Telefono_Empresa te ON te.RUC_Empresa = p.RUC_Empresa
+LEFT JOIN Correo_Empresa co ON co.RUC_Empresa = p.RUC_Empresa
+"""
+_HEADER_SQL = _HEADER_SELECT + """WHERE {where}
+ORDER BY p.Fecha, p.Nro_Proforma;
+"""
+_HEADER_ORDER = [("p.Fecha", False, 1), ("p.Nro_Proforma", False, 0)]
+_RANGE_WHERE = "p.Fecha BETWEEN %s AND %s"
+CHUNK_SIZE = 500   # proformas por bloque en `fetch_range`
+_COUNT = RowType("Total", [("Total", int)])
+_LINE = RowType("ProformaLinea", [
+    ("Nro_Proforma", str), ("Item", int), ("Nro_Parte", str), ("Descripcion", str), ("Marca", str),
+    ("Cantidad", int), ("Peso", Decimal), ("Precio_Unitario", Decimal)])
+_LINES_SQL = """
+SELECT pd.Nro_Proforma, pd.Item, pd.Nro_Parte, r.Descripcion, r.Marca, pd.Cantidad, pd.Peso, r.Precio_Unitario
+FROM Proforma_Detalle pd
+INNER JOIN Proforma p ON p.Nro_Proforma = pd.Nro_Proforma
+INNER JOIN Repuesto r ON r.Nro_Parte = pd.Nro_Parte
+WHERE {where}
+ORDER BY pd.Nro_Proforma, pd.Item;
+"""
+
+
+class Template:
+    """
+    Plantilla de proforma ya interpretada (posiciones de columna precalculadas).
+
+    Parameters
+    ----------
+    data : dict
+        Contenido de plantillas/proforma.json.
+    """
+    def __init__(self, data):
+        self.width, self.height = data.get("pagina", [595, 842])
+        self.margin = data.get("margen", 40)
+        self.size = data.get("fuente", 8.5)
+        self.title = data.get("titulo", "PROFORMA")
+        self.issuer = list(data.get("emisor", []))
+        self.currency = data.get("moneda", "S/")
+        tax = data.get("impuesto") or {}
+        self.tax_name = tax.get("nombre", "IGV")
+        self.tax_rate = Decimal(str(tax.get("tasa", 0)))
+        self.footer = data.get("pie", "")
+        self.columns = []   # (titulo, campo, x, ancho, alinear)
+        x = self.margin
+        for c in data["columnas"]:
+            self.columns.append((c["titulo"], c["campo"], x, c["ancho"], c.get("alinear", "left")))
+            x += c["ancho"]
+        self.row_height = self.size + 5
+
+
+_templates = {}   # ruta -> (mtime, Template): caché por proceso
+
+
+def load_template(path=TEMPLATE):
+    """Plantilla parseada; se relee solo si cambió la fecha de modificación del archivo."""
+    mtime = os.path.getmtime(path)
+    cached = _templates.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = (mtime, Template(json.load(f)))
+        _templates[path] = cached
+    return cached[1]
+
+
+def _decimal(value):
+    try:
+        return Decimal(value)
+    except (InvalidOperation, TypeError, ValueError):
+        return Decimal(0)
+
+
+def _money(value):
+    return f"{value:,.2f}"
+
+
+def fetch(client, where, params=()):
+    """
+    Proformas que cumplen `where` (sobre el alias `p` de Proforma, marcadores `%s` para
+    `params`), con sus líneas.
+
+    Returns
+    -------
+    list[dict]
+        Campos de `_HEADER` + "lineas" (lista de dict con los campos de `_LINE`), tipados.
+    """
+    headers = client.query(_HEADER_SQL.format(where=where), params, _HEADER)
+    return _with_lines(client, headers, where, params) if headers else []
+
+
+def _with_lines(client, headers, where, params, strict=False):
+    """Cabeceras (registros de `_HEADER`) como dicts con sus líneas (las de `where`)."""
+    docs = {}
+    for r in headers:
+        doc = r._asdict()
+        doc["lineas"] = []
+        docs[doc["Nro_Proforma"]] = doc
+    for r in client.query(_LINES_SQL.format(where=where), params, _LINE, strict=strict):
+        line = r._asdict()
+        doc = docs.get(line["Nro_Proforma"])
+        if doc is not None:
+            doc["lineas"].append(line)
+    return list(docs.values())
+
+
+def fetch_one(client, nro):
+    docs = fetch(client, "p.Nro_Proforma = %s", [nro])
+    return docs[0] if docs else None
+
+
+def range_pager(desde, hasta, chunk_size=CHUNK_SIZE):
+    """Cabeceras con Fecha entre `desde` y `hasta`, por páginas de (Fecha, Nro_Proforma)."""
+    return KeysetPager(_HEADER_SELECT, _HEADER_ORDER, where=_RANGE_WHERE, page_size=chunk_size,
+                       params=[desde, hasta], row=_HEADER)
+
+
+def fetch_range(client, desde, hasta, chunk_size=CHUNK_SIZE):
+    """
+    Proformas con Fecha entre `desde` y `hasta`, en orden de fecha, por bloques de
+    `chunk_size` con sus líneas: en memoria hay un bloque a la vez.
+
+    Yields
+    ------
+    list[dict]
+        Como `fetch`.
+
+    Raises
+    ------
+    RuntimeError
+        Si falla una consulta (un error no debe parecer un rango vacío).
+    """
+    for headers in iter_pages(client, range_pager(desde, hasta, chunk_size), strict=True):
+        nros = [h.Nro_Proforma for h in headers]
+        where = f"p.Nro_Proforma IN ({', '.join(['%s'] * len(nros))})"
+        yield _with_lines(client, headers, where, nros, strict=True)
+
+
+def count_range(client, desde, hasta):
+    """Cantidad de proformas con Fecha entre `desde` y `hasta`."""
+    rows = client.query(f"SELECT COUNT(*) FROM Proforma p WHERE {_RANGE_WHERE};", [desde, hasta],
+                        _COUNT, strict=True)
+    return rows[0].Total if rows else 0
+
+
+def _paginate(n_lines, tpl, first_top, next_top, totals_height):
+    """Reparte las líneas en páginas: lista de (inicio, fin); los totales van en la última."""
+    bottom = tpl.height - tpl.margin - 20
+    pages, start, top = [], 0, first_top
+    while True:
+        cap = max(1, int((bottom - top - tpl.row_height) // tpl.row_height))
+        end = min(n_lines, start + cap)
+        pages.append((start, end))
+        if end >= n_lines:
+            used = top + tpl.row_height * (1 + end - start)
+            if used + totals_height > bottom and end > start:
+                pages.append((end, end))   # los totales no entran: página aparte
+            return pages
+        start, top = end, next_top
+
+
+def render(doc, tpl=None):
+    """
+    Maqueta una proforma.
+
+    Returns
+    -------
+    (bytes, int)
+        Contenido del PDF y cantidad de páginas.
+    """
+    tpl = tpl or load_template()
+    m, fs, rh = tpl.margin, tpl.size, tpl.row_height
+    right = tpl.width - m
+    pdf = PDFDocument(tpl.width, tpl.height, title=f"{tpl.title} {doc['Nro_Proforma']}")
+
+    rows, subtotal, peso_total = [], Decimal(0), Decimal(0)
+    for line in doc["lineas"]:
+        cant, precio, peso = _decimal(line["Cantidad"]), _decimal(line["Precio_Unitario"]), _decimal(line["Peso"])
+        importe = (cant * precio).quantize(Decimal("0.01"))
+        subtotal += importe
+        peso_total += peso
+        values = dict(line, Precio_Unitario=_money(precio), Importe=_money(importe))
+        rows.append(values)
+    tax = (subtotal * tpl.tax_rate).quantize(Decimal("0.01"))
+
+    first_top, next_top, totals_height = m + 150, m + 40, 70
+    pages = _paginate(len(rows), tpl, first_top, next_top, totals_height)
+    for n, (start, end) in enumerate(pages, start=1):
+        page = pdf.add_page()
+        page.text(right, m + 14, tpl.title, font="F2", size=16, align="right")
+        page.text(right, m + 30, f"N° {doc['Nro_Proforma']}", font="F2", size=11, align="right")
+        if n == 1:
+            page.text(right, m + 44, f"Fecha: {doc['Fecha']}", size=fs + 1, align="right")
+            for i, text in enumerate(tpl.issuer):
+                page.text(m, m + 14 + i * 12, text, font="F2" if i == 0 else "F1", size=11 if i == 0 else fs + 1)
+            box_y = m + 70
+            page.rect(m, box_y, right - m, 62)
+            half = m + (right - m) * 0.58
+            cliente = [("Cliente:", doc["Raz_Soc"] or "—"), ("RUC:", doc["RUC_Empresa"] or "—"),
+                       ("Dirección:", doc["Direccion"] or "—"),
+                       ("Contacto:", " / ".join(v for v in (doc["Telefono"], doc["Correo"]) if v) or "—")]
+            for i, (label, value) in enumerate(cliente):
+                y = box_y + 14 + i * 13
+                page.text(m + 6, y, label, font="F2", size=fs)
+                page.text(m + 62, y, fit_text(value, half - m - 70, size=fs), size=fs)
+            vendedor = [("Atendido por:", doc["Empleado"]), ("Código:", doc["Codigo_Empleado"]),
+                        ("Teléfono:", doc["Telefono_Empleado"] or "—")]
+            for i, (label, value) in enumerate(vendedor):
+                y = box_y + 14 + i * 13
+                page.text(half, y, label, font="F2", size=fs)
+                page.text(half + 64, y, fit_text(value, right - half - 70, size=fs), size=fs)
+            top = first_top
+        else:
+            page.text(m, m + 14, "(continuación)", size=fs)
+            top = next_top
+
+        # Encabezado de tabla (se repite en cada página)
+        page.rect(m, top, right - m, rh, gray=0.85)
+        for title, _field, x, w, align in tpl.columns:
+            tx = x + w - 3 if align == "right" else x + 3
+            page.text(tx, top + rh - 4, title, font="F2", size=fs, align=align)
+        y = top + rh
+        for values in rows[start:end]:
+            for _title, field, x, w, align in tpl.columns:
+                text = fit_text(str(values.get(field, "")), w - 6, size=fs)
+                tx = x + w - 3 if align == "right" else x + 3
+                page.text(tx, y + rh - 4, text, size=fs, align=align)
+            y += rh
+            page.line(m, y, right, y, width=0.25)
+
+        if n == len(pages):
+            y += 16
+            label_x = right - 150
+            totals = [("Subtotal", subtotal), (f"{tpl.tax_name} ({tpl.tax_rate * 100:.0f}%)", tax),
+                      ("Total", subtotal + tax)]
+            for i, (label, value) in enumerate(totals):
+                font = "F2" if i == len(totals) - 1 else "F1"
+                page.text(label_x, y + i * 14, label, font=font, size=fs + 1)
+                page.text(right - 3, y + i * 14, f"{tpl.currency} {_money(value)}", font=font, size=fs + 1, align="right")
+            page.text(m, y, f"Peso total: {peso_total.normalize():f}", size=fs + 1)
+            if tpl.footer:
+                page.text(m, tpl.height - m - 20, fit_text(tpl.footer, right - m, size=fs - 1), size=fs - 1)
+        page.text(right, tpl.height - m, f"Página {n} de {len(pages)}", size=fs - 1, align="right")
+    return pdf.to_bytes(), len(pages)
+
+
+def file_name(nro):
+    """Nombre de archivo seguro para una proforma."""
+    return re.sub(r"[^\w.-]+", "_", nro) + ".pdf"
+
+
+def render_one(client, nro, path, template_path=TEMPLATE):
+    """
+    Genera el PDF de `nro` en `path`.
+
+    Returns
+    -------
+    int
+        Páginas escritas.
+
+    Raises
+    ------
+    ValueError
+        Si la proforma no existe.
+    """
+    doc = fetch_one(client, nro)
+    if doc is None:
+        raise ValueError(f"No existe la proforma {nro}.")
+    data, pages = render(doc, load_template(template_path))
+    with open(path, "wb") as f:
+        f.write(data)
+    return pages
+
+
+class BatchResult:
+    """
+    Resultado de `render_range`.
+
+    Parameters
+    ----------
+    files : int
+        PDFs escritos.
+    pages : int
+        Páginas totales.
+    seconds : float
+        Duración (consultas + maquetado + escritura).
+    errors : list[tuple[str, str]]
+        (Nro_Proforma, motivo) de los que fallaron.
+    """
+    def __init__(self):
+        self.files = 0
+        self.pages = 0
+        self.seconds = 0.0
+        self.errors = []
+
+    @property
+    def pages_per_sec(self):
+        return self.pages / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self):
+        lines = [f"PDF generados: {self.files}   Páginas: {self.pages}",
+                 f"{self.seconds:.1f} s ({self.pages_per_sec:.0f} páginas/s)"]
+        lines += [f"  {nro}: {msg}" for nro, msg in self.errors[:10]]
+        return "\n".join(lines)
+
+
+def _init_worker(template_path):
+    """Inicializador de cada proceso del pool: parsea la plantilla una vez."""
+    load_template(template_path)
+
+
+def _render_job(doc, path, template_path):
+    data, pages = render(doc, load_template(template_path))
+    with open(path, "wb") as f:
+        f.write(data)
+    return pages
+
+
+def render_range(client, desde, hasta, out_dir, workers=None, template_path=TEMPLATE, progress=None):
+    """
+    Genera un PDF por proforma con Fecha entre `desde` y `hasta` (YYYY-MM-DD) en `out_dir`.
+
+    Las proformas se piden por bloques (ver `fetch_range`) y se maquetan mientras se pide el
+    siguiente; en el pool hay a lo sumo `4 * workers` pendientes, así que la memoria no crece
+    con el tamaño del rango. El pool usa el método "spawn": no se hace fork de un proceso con
+    hilos (esta función suele correr en un hilo de trabajo de la app).
+
+    Params
+    ------
+    workers : int | None
+        Procesos del pool (None = núcleos de la CPU). Con 1, o pocas proformas, se
+        maqueta en el proceso actual (arrancar el pool cuesta más que maquetarlas).
+    progress : callable | None
+        `progress(hechos, total)` tras cada archivo.
+
+    Returns
+    -------
+    BatchResult
+
+    Raises
+    ------
+    RuntimeError
+        Si falla una consulta.
+    """
+    res = BatchResult()
+    t0 = time.perf_counter()
+    total = count_range(client, desde, hasta)
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    def jobs():
+        for docs in fetch_range(client, desde, hasta):
+            for doc in docs:
+                yield doc, os.path.join(out_dir, file_name(doc["Nro_Proforma"]))
+
+    def done(nro, pages=None, error=None):
+        if error is None:
+            res.files += 1
+            res.pages += pages
+        else:
+            res.errors.append((nro, error))
+        if progress is not None:
+            progress(res.files + len(res.errors), total)
+
+    pending = {}   # Future -> Nro_Proforma (pool)
+
+    def collect(futures):
+        for fut in futures:
+            nro = pending.pop(fut)
+            try:
+                done(nro, fut.result())
+            except Exception as ex:
+                done(nro, error=str(ex))
+
+    if workers == 1 or total < 8:
+        tpl = load_template(template_path)
+        for doc, path in jobs():
+            try:
+                data, pages = render(doc, tpl)
+                with open(path, "wb") as f:
+                    f.write(data)
+                done(doc["Nro_Proforma"], pages)
+            except Exception as ex:
+                done(doc["Nro_Proforma"], error=str(ex))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(template_path,)) as pool:
+            for doc, path in jobs():
+                if len(pending) >= 4 * workers:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                pending[pool.submit(_render_job, doc, path, template_path)] = doc["Nro_Proforma"]
+            collect(wait(pending).done)
+    res.seconds = time.perf_counter() - t0
+    return res
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Genera proformas en PDF.")
+    ap.add_argument("nro", nargs="?", help="Nro_Proforma (o use --desde/--hasta)")
+    ap.add_argument("--desde")
+    ap.add_argument("--hasta")
+    ap.add_argument("-o", "--salida", help="archivo .pdf (una proforma) o carpeta (rango)")
+    ap.add_argument("--procesos", type=int, default=None)
+    ap.add_argument("--plantilla", default=TEMPLATE)
+    ap.add_argument("--config", default=CONFIG_PATH)
+    args = ap.parse_args(argv)
+    if not args.nro and not (args.desde and args.hasta):
+        ap.error("indique un Nro_Proforma o --desde y --hasta")
+
+    client = MySQLClient(**load_config(args.config))
+    try:
+        if args.nro:
+            path = args.salida or file_name(args.nro)
+            t0 = time.perf_counter()
+            try:
+                pages = render_one(client, args.nro, path, args.plantilla)
+            except ValueError as ex:
+                print(ex, file=sys.stderr)
+                return 1
+            print(f"{path}: {pages} página(s) en {time.perf_counter() - t0:.2f} s")
+            return 0
+        try:
+            res = render_range(client, args.desde, args.hasta, args.salida or "proformas",
+                               workers=args.procesos, template_path=args.plantilla)
+        except RuntimeError as ex:
+            print(ex, file=sys.stderr)
+            return 1
+        print(res.summary())
+        return 0 if not res.errors else 1
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,688 @@
+"""
+Réplica local (SQLite) de las tablas de referencia, para trabajar con una VPN inestable.
+
+Con "replica": "replica.sqlite" en config.json, `MySQLClient`:
+  * responde desde el archivo local las lecturas tipadas (`select_typed` / `query`: listados,
+    login, autocompletar, reportes) que solo usan tablas de `TABLES`. Si la consulta usa
+    sintaxis propia de MySQL (MATCH ... AGAINST, etc.) o la réplica aún no se cargó, va al
+    servidor como siempre;
+  * manda los CALL al servidor y, si este no responde (error de conexión: el CALL no llegó a
+    ejecutarse), los guarda en una cola durable en el mismo archivo y devuelve (True, QUEUED).
+    La cola se reenvía en orden, con los mismos parámetros, al volver la conexión; un CALL que
+    entonces falla (la clave ya existe, falta el repuesto, ...) queda como conflicto con el
+    mensaje del servidor, para revisarlo (`python replica.py --estado`).
+
+La sincronización es incremental: los triggers de sql/replica.sql anotan cada cambio en
+`Replica_Cambio` (tabla, clave) y `Replica.sync` pide solo las filas cambiadas desde el
+último Id seguro. Como los Id se asignan al insertar y no al confirmar, los que faltan en la
+secuencia se vuelven a buscar durante `GAP_GRACE` segundos (ver `Replica._pull`). La primera
+vez (o si el registro se purgó más allá de ese Id) copia las tablas completas, por páginas y
+sin bloquear las lecturas locales; `python replica.py --completa` fuerza esa recarga si la
+réplica quedara distinta del servidor (ej. una transacción que tardó más que `GAP_GRACE`).
+
+Diferencias con el servidor: las comparaciones de texto no distinguen mayúsculas solo en
+ASCII (NOCASE) y los cambios hechos desde otra PC se ven tras la próxima sincronización.
+Los CALL en cola no se reflejan en la réplica hasta que el servidor los acepta.
+"""
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from db import MySQLClient, deterministic_read, tables_read
+from rows import RowType
+from settings import CONFIG_PATH, load_config
+
+QUEUED = "Sin conexión: la operación quedó en cola y se enviará al servidor al reconectar."
+
+# Errores que garantizan que la sentencia no se ejecutó (no se pudo conectar / la conexión ya
+# estaba cerrada). Un corte a mitad de la consulta (2013) no entra: el CALL pudo aplicarse.
+_OFFLINE = re.compile(r"\b200[2356]\b|Can't connect|Unknown MySQL server host|server has gone away", re.IGNORECASE)
+# Sintaxis que SQLite interpreta distinto que MySQL (|| concatena, / entre enteros trunca):
+# esas lecturas van siempre al servidor.
+_MYSQL_ONLY = re.compile(r"\|\||/|\bMATCH\b|\bREGEXP\b|\bINTERVAL\b|\bDIV\b", re.IGNORECASE)
+_STRING_ESCAPES = {"0": "\0", "n": "\n", "r": "\r", "t": "\t", "Z": "\x1a", "b": "\b"}
+
+PAGE_SIZE = 5000     # filas por consulta en la carga completa y cambios por lote
+KEYS_PER_QUERY = 500
+RETRY_OFFLINE = 30   # segundos sin reintentar la conexión tras un error (los CALL van directo a la cola)
+GAP_GRACE = 600      # segundos que se espera un Id faltante de Replica_Cambio (transacción sin confirmar)
+
+
+def is_offline(message):
+    """True si `message` es un error de conexión (el servidor no recibió la sentencia)."""
+    return bool(message) and bool(_OFFLINE.search(message))
+
+
+class Table:
+    """
+    Tabla replicada.
+
+    Parameters
+    ----------
+    name : str
+        Nombre en MySQL (y en SQLite).
+    columns : sequence[tuple[str, type]]
+        (columna, tipo) como en `rows.RowType`; la primera es la PK.
+    indexes : sequence[str]
+        Índices locales ("col1, col2") para los órdenes de los listados.
+    """
+    def __init__(self, name, columns, indexes=()):
+        self.name = name
+        self.row = RowType(name, columns)
+        self.key = self.row.names[0]
+        self.indexes = tuple(indexes)
+
+    def create_sql(self, name=None):
+        cols = []
+        for col, kind in zip(self.row.names, self.row.types):
+            if kind is int:
+                decl = "INTEGER"
+            elif kind is Decimal:
+                decl = "TEXT COLLATE DECIMAL"   # exacto ("12.50"), ordenado y comparado como número
+            else:
+                decl = "TEXT COLLATE NOCASE"
+            cols.append(f"{col} {decl}" + (" PRIMARY KEY" if col == self.key else ""))
+        return f"CREATE TABLE IF NOT EXISTS {name or self.name} ({', '.join(cols)});"
+
+    def index_sql(self):
+        return [f"CREATE INDEX IF NOT EXISTS idx_{self.name}_{i} ON {self.name} ({cols});"
+                for i, cols in enumerate(self.indexes, 1)]
+
+    def select_sql(self):
+        return f"SELECT {', '.join(self.row.names)} FROM {self.name}"
+
+
+TABLES = (
+    Table("Empleado", [("Codigo", str), ("Nombre", str)]),
+    Table("Contacto_Empleado", [("Codigo_Empleado", str), ("Telefono", str)]),
+    Table("Proveedor", [("RUC", str), ("Direccion", str), ("Raz_Soc", str)], ["Raz_Soc, RUC"]),
+    Table("Telefono_Proveedor", [("RUC_Proveedor", str), ("Telefono", str)]),
+    Table("Email_Proveedor", [("RUC_Proveedor", str), ("Email", str)]),
+    Table("Empresa", [("RUC", str), ("Raz_Soc", str), ("FAX", str)], ["Raz_Soc, RUC"]),
+    Table("Direccion_Empresa", [("RUC_Empresa", str), ("Ciudad", str), ("Calle", str), ("Distrito", str)]),
+    Table("Telefono_Empresa", [("RUC_Empresa", str), ("Telefono", str)]),
+    Table("Correo_Empresa", [("RUC_Empresa", str), ("Correo", str)]),
+    Table("Repuesto", [("Nro_Parte", str), ("Cantidad", int), ("Descripcion", str), ("Marca", str),
+                       ("Status", str), ("Precio_Unitario", Decimal)],
+          ["Descripcion, Nro_Parte", "Cantidad, Descripcion, Nro_Parte", "Marca"]),
+)
+BY_NAME = {t.name.lower(): t for t in TABLES}
+
+_CHANGE = RowType("Cambio", [("Id", int), ("Tabla", str), ("Clave", str)])
+_ID = RowType("Id", [("Id", int)])
+
+_LOCAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS _replica_estado (clave TEXT PRIMARY KEY, valor TEXT);
+CREATE TABLE IF NOT EXISTS _replica_cola (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    proc TEXT NOT NULL,
+    params TEXT NOT NULL,
+    creado TEXT NOT NULL,
+    estado TEXT NOT NULL DEFAULT 'pendiente',   -- pendiente | conflicto
+    error TEXT
+);
+"""
+
+
+def to_sqlite(sql):
+    """
+    Adapta una sentencia de MySQL a SQLite: `%s` -> `?` y literales con los escapes de MySQL
+    (\\\\, \\', comillas dobles) a literales SQLite ('' como único escape).
+    """
+    out = []
+    i, n = 0, len(sql)
+    while i < n:
+        ch = sql[i]
+        if ch in ("'", '"'):
+            buf = []
+            j = i + 1
+            while j < n:
+                c = sql[j]
+                if c == "\\" and j + 1 < n:
+                    buf.append(_STRING_ESCAPES.get(sql[j + 1], sql[j + 1]))
+                    j += 2
+                    continue
+                if c == ch:
+                    if j + 1 < n and sql[j + 1] == ch:
+                        buf.append(ch)
+                        j += 2
+                        continue
+                    break
+                buf.append(c)
+                j += 1
+            out.append("'" + "".join(buf).replace("'", "''") + "'")
+            i = j + 1
+        elif ch == "%" and sql.startswith("%s", i):
+            out.append("?")
+            i += 2
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out).strip().rstrip(";")
+
+
+def _sqlite_value(value):
+    """Parámetro para sqlite3 (que no conoce Decimal ni fechas)."""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _decimal_collation(a, b):
+    try:
+        a, b = Decimal(a), Decimal(b)
+    except InvalidOperation:
+        pass
+    return (a > b) - (a < b)
+
+
+def _concat(*args):
+    """CONCAT de MySQL: NULL si algún argumento es NULL."""
+    return None if any(a is None for a in args) else "".join(str(a) for a in args)
+
+
+def _concat_ws(sep, *args):
+    """CONCAT_WS de MySQL: omite los NULL."""
+    return None if sep is None else str(sep).join(str(a) for a in args if a is not None)
+
+
+def encode_params(params):
+    """Parámetros de un CALL como JSON, conservando su tipo (Decimal, fecha, bytes)."""
+    def enc(v):
+        if isinstance(v, Decimal):
+            return {"decimal": str(v)}
+        if isinstance(v, datetime):
+            return {"datetime": v.isoformat()}
+        if isinstance(v, date):
+            return {"date": v.isoformat()}
+        if isinstance(v, bytes):
+            return {"bytes": v.hex()}
+        return v
+    return json.dumps([enc(v) for v in params], ensure_ascii=False)
+
+
+def decode_params(text):
+    """Inversa de `encode_params`."""
+    def dec(v):
+        if isinstance(v, dict):
+            (kind, value), = v.items()
+            return {"decimal": Decimal, "datetime": datetime.fromisoformat, "date": date.fromisoformat,
+                    "bytes": bytes.fromhex}[kind](value)
+        return v
+    return [dec(v) for v in json.loads(text)]
+
+
+class SyncResult:
+    """Resultado de `Replica.sync`: CALL reenviados, conflictos nuevos y filas actualizadas."""
+    def __init__(self):
+        self.sent = 0
+        self.conflicts = []      # (id, proc, error)
+        self.changed = 0
+        self.full = False
+        self.offline = False
+        self.error = None
+        self.pending = 0
+
+    def summary(self):
+        if self.offline:
+            text = "Sin conexión"
+        elif self.error:
+            text = f"Error al sincronizar: {self.error}"
+        else:
+            text = ("Carga completa: " if self.full else "Al día: ") + f"{self.changed} filas actualizadas"
+        if self.sent:
+            text += f"; {self.sent} operaciones enviadas"
+        if self.pending:
+            text += f"; {self.pending} en cola"
+        if self.conflicts:
+            text += f"; {len(self.conflicts)} con conflicto"
+        return text + "."
+
+
+class Replica:
+    """
+    Réplica SQLite de `TABLES` + cola de CALL pendientes, asociada a un `MySQLClient`.
+
+    Una sola conexión SQLite compartida entre hilos (protegida por `_lock`); los envíos al
+    servidor se serializan con `_send_lock` para respetar el orden de la cola, y las
+    sincronizaciones (programadas o tras una escritura) con `_sync_lock`.
+
+    Parameters
+    ----------
+    path : str
+        Archivo SQLite (se crea si no existe).
+    client : MySQLClient
+        Cliente del servidor; la réplica usa sus métodos directos (sin réplica).
+    sync_every : float
+        Segundos entre sincronizaciones programadas (los usa la app).
+    """
+    def __init__(self, path, client, sync_every=60):
+        self.path = path
+        self.client = client
+        self.sync_every = sync_every
+        self.online = None          # último estado conocido del servidor (None = sin intentar)
+        self._offline_since = None
+        self._db = None
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._send_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    # -------- Archivo local -------------------------------------------------------
+    def _conn(self):
+        """Conexión SQLite (se abre y crea el esquema a demanda)."""
+        if self._db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL;")
+            db.execute("PRAGMA synchronous=NORMAL;")
+            db.create_collation("DECIMAL", _decimal_collation)
+            db.create_function("CONCAT", -1, _concat)
+            db.create_function("CONCAT_WS", -1, _concat_ws)
+            db.executescript(_LOCAL_SCHEMA)
+            for t in TABLES:
+                db.execute(t.create_sql())
+                for sql in t.index_sql():
+                    db.execute(sql)
+            self._db = db
+            self._loaded = self._state("ultimo_cambio") is not None
+        return self._db
+
+    def close(self):
+        """Cierra el archivo (se reabre a demanda)."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _state(self, key):
+        with self._lock:
+            row = self._conn().execute("SELECT valor FROM _replica_estado WHERE clave = ?;", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, db, key, value):
+        db.execute("INSERT OR REPLACE INTO _replica_estado (clave, valor) VALUES (?, ?);", (key, str(value)))
+
+    @property
+    def loaded(self):
+        with self._lock:
+            self._conn()
+            return self._loaded
+
+    # -------- Lecturas ----------------------------------------------------------------
+    def select(self, sql, params=None, row=None):
+        """
+        Responde `sql` desde la réplica.
+
+        Returns
+        -------
+        list[tuple] | None
+            Filas como `MySQLClient.select_typed` (registros de `row`, o tuplas de str/None
+            como con el backend "cli"), o None si la consulta debe ir al servidor.
+        """
+        if not deterministic_read(sql) or _MYSQL_ONLY.search(sql):
+            return None
+        tables = tables_read(sql)
+        if not tables or not tables.issubset(BY_NAME):
+            return None
+        with self._lock:
+            db = self._conn()
+            if not self._loaded:
+                return None
+            try:
+                rows = db.execute(to_sqlite(sql), [_sqlite_value(p) for p in params or ()]).fetchall()
+            except sqlite3.Error:
+                return None    # sintaxis propia de MySQL: la responde el servidor
+        if row is None:
+            return [tuple(None if v is None else str(v) for v in r) for r in rows]
+        try:
+            return row.from_values(rows)
+        except (ValueError, TypeError, ArithmeticError):
+            return None
+
+    # -------- Escrituras (cola) -----------------------------------------------------
+    def call(self, proc, params):
+        """
+        CALL al servidor respetando la cola: si hay pendientes se envían antes; si el servidor no
+        responde, el CALL queda en cola.
+
+        Returns
+        -------
+        (bool, str)
+            El resultado del servidor, o (True, QUEUED) si quedó en cola.
+        """
+        with self._send_lock:
+            if self._offline_recently():
+                self._enqueue(proc, params)
+                return True, QUEUED
+            res = SyncResult()
+            self._flush(res)
+            if res.offline:
+                self._enqueue(proc, params)
+                return True, QUEUED
+            ok, out = self.client._call(proc, params)
+            if not ok and is_offline(out):
+                self._went_offline()
+                self._enqueue(proc, params)
+                return True, QUEUED
+            self._went_online()
+        if ok:
+            self.sync(flush=False)   # la réplica refleja el cambio antes de que la app recargue
+        return ok, out
+
+    def _offline_recently(self):
+        return self._offline_since is not None and time.monotonic() - self._offline_since < RETRY_OFFLINE
+
+    def _went_offline(self):
+        self.online = False
+        self._offline_since = time.monotonic()
+
+    def _went_online(self):
+        self.online = True
+        self._offline_since = None
+
+    def _enqueue(self, proc, params):
+        with self._lock:
+            self._conn().execute(
+                "INSERT INTO _replica_cola (proc, params, creado) VALUES (?, ?, ?);",
+                (proc, encode_params(params), time.strftime("%Y-%m-%d %H:%M:%S")))
+
+    def _flush(self, res):
+        """Reenvía los CALL pendientes en orden (con `_send_lock` tomado); para en el primer corte."""
+        with self._lock:
+            queue = self._conn().execute(
+                "SELECT id, proc, params FROM _replica_cola WHERE estado = 'pendiente' ORDER BY id;").fetchall()
+        for job_id, proc, params in queue:
+            ok, out = self.client._call(proc, decode_params(params))
+            if not ok and is_offline(out):
+                self._went_offline()
+                res.offline = True
+                res.pending = len(queue) - res.sent - len(res.conflicts)
+                return
+            self._went_online()
+            with self._lock:
+                if ok:
+                    self._conn().execute("DELETE FROM _replica_cola WHERE id = ?;", (job_id,))
+                    res.sent += 1
+                else:
+                    self._conn().execute("UPDATE _replica_cola SET estado = 'conflicto', error = ? WHERE id = ?;",
+                                         (out.strip(), job_id))
+                    res.conflicts.append((job_id, proc, out.strip()))
+
+    def queue(self):
+        """CALL en cola: lista de (id, proc, params, creado, estado, error)."""
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT id, proc, params, creado, estado, error FROM _replica_cola ORDER BY id;").fetchall()
+        return [(i, p, decode_params(a), c, e, err) for i, p, a, c, e, err in rows]
+
+    def retry(self, job_id):
+        """Vuelve a encolar un conflicto (al final de la cola). False si no existe."""
+        with self._lock:
+            db = self._conn()
+            found = db.execute("SELECT proc, params FROM _replica_cola WHERE id = ? AND estado = 'conflicto';",
+                               (job_id,)).fetchone()
+            if found is None:
+                return False
+            db.execute("BEGIN;")
+            db.execute("DELETE FROM _replica_cola WHERE id = ?;", (job_id,))
+            db.execute("INSERT INTO _replica_cola (proc, params, creado) VALUES (?, ?, ?);",
+                       (found[0], found[1], time.strftime("%Y-%m-%d %H:%M:%S")))
+            db.execute("COMMIT;")
+            return True
+
+    def discard(self, job_id):
+        """Descarta un CALL de la cola (pendiente o conflicto). False si no existe."""
+        with self._lock:
+            return self._conn().execute("DELETE FROM _replica_cola WHERE id = ?;", (job_id,)).rowcount > 0
+
+    # -------- Sincronización -------------------------------------------------------------
+    def sync(self, full=False, flush=True):
+        """
+        Envía la cola y trae los cambios del servidor (completa la primera vez o con `full`).
+
+        Returns
+        -------
+        SyncResult
+        """
+        res = SyncResult()
+        if flush:
+            with self._send_lock:
+                self._flush(res)
+        if not res.offline:
+            try:
+                with self._sync_lock:
+                    if full or not self.loaded or self._log_purged():
+                        self._full_load(res)
+                    else:
+                        self._pull(res)
+            except RuntimeError as e:
+                res.offline = is_offline(str(e))
+                if res.offline:
+                    self._went_offline()
+                else:
+                    res.error = str(e)
+        with self._lock:
+            res.pending = self._conn().execute(
+                "SELECT COUNT(*) FROM _replica_cola WHERE estado = 'pendiente';").fetchone()[0]
+            if not res.offline and not res.error:
+                self._set_state(self._conn(), "sincronizada", time.strftime("%Y-%m-%d %H:%M:%S"))
+        return res
+
+    def _remote(self, sql, params=None, row=None):
+        """SELECT al servidor (nunca a la réplica); RuntimeError si falla."""
+        return self.client._select_remote(sql, params, True, row)
+
+    def _log_purged(self):
+        """True si el registro de cambios ya no tiene los posteriores al último Id visto."""
+        last = int(self._state("ultimo_cambio") or 0)
+        first = self._remote("SELECT MIN(Id) FROM Replica_Cambio;", row=_ID)
+        return bool(first) and first[0].Id is not None and first[0].Id > last + 1
+
+    def _full_load(self, res):
+        """
+        Copia todas las tablas en tablas nuevas y las reemplaza al terminar cada una.
+
+        El Id seguro queda antes de los cambios de los últimos `GAP_GRACE` segundos: la próxima
+        sincronización los vuelve a aplicar, por si alguno era de una transacción que aún no
+        estaba confirmada durante la copia.
+        """
+        old = self._remote("SELECT MAX(Id) FROM Replica_Cambio WHERE Fecha < NOW() - INTERVAL %s SECOND;",
+                           [GAP_GRACE], row=_ID)
+        first = self._remote("SELECT MIN(Id) FROM Replica_Cambio;", row=_ID)
+        last = (old[0].Id if old else None) or max(((first[0].Id if first else None) or 1) - 1, 0)
+        for t in TABLES:
+            tmp = f"_nueva_{t.name}"
+            with self._lock:
+                db = self._conn()
+                db.execute(f"DROP TABLE IF EXISTS {tmp};")
+                db.execute(t.create_sql(tmp))
+            sql = t.select_sql()
+            rows = self._remote(f"{sql} ORDER BY {t.key} LIMIT {PAGE_SIZE};", row=t.row)
+            while rows:
+                self._upsert(tmp, t, rows)
+                res.changed += len(rows)
+                if len(rows) < PAGE_SIZE:
+                    break
+                rows = self._remote(f"{sql} WHERE {t.key} > %s ORDER BY {t.key} LIMIT {PAGE_SIZE};",
+                                    [rows[-1][0]], row=t.row)
+            with self._lock:
+                db = self._conn()
+                db.execute("BEGIN;")
+                db.execute(f"DROP TABLE {t.name};")
+                db.execute(f"ALTER TABLE {tmp} RENAME TO {t.name};")
+                for idx in t.index_sql():
+                    db.execute(idx)
+                db.execute("COMMIT;")
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN;")
+            self._set_state(db, "ultimo_cambio", last)
+            self._set_state(db, "maximo_cambio", last)
+            self._set_state(db, "huecos", "[]")
+            db.execute("COMMIT;")
+            self._loaded = True
+        res.full = True
+
+    def _pull(self, res):
+        """
+        Aplica los cambios registrados después del último Id seguro, por lotes.
+
+        Los Id de AUTO_INCREMENT se asignan al insertar, no al confirmar: una transacción larga
+        (sp_Importar_Repuestos, una OC) puede confirmar sus Id bajos después de que otra más
+        corta confirmó Id más altos. Por eso se recuerdan los Id que faltan en la secuencia
+        ("huecos", con la hora en que se vieron) y el Id seguro (`ultimo_cambio`) no pasa del
+        primer hueco de menos de `GAP_GRACE` segundos: cada sincronización relee desde ahí y
+        aplica lo que llenó un hueco o es nuevo (`maximo_cambio` = mayor Id ya aplicado). Un
+        hueco más viejo se da por cerrado (rollback, Id reservados sin usar).
+        """
+        with self._lock:
+            last = int(self._state("ultimo_cambio") or 0)
+            high = max(int(self._state("maximo_cambio") or 0), last)
+            old_holes = json.loads(self._state("huecos") or "[]")
+        now = time.time()
+        holes = []   # [primer Id, último Id, visto] que siguen faltando, en orden
+        prev = last
+        while True:
+            changes = self._remote("SELECT Id, Tabla, Clave FROM Replica_Cambio WHERE Id > %s "
+                                   f"ORDER BY Id LIMIT {PAGE_SIZE};", [prev], row=_CHANGE)
+            if not changes:
+                break
+            keys = {}
+            for c in changes:
+                if c.Id > prev + 1:
+                    holes += _holes(prev + 1, c.Id - 1, high, old_holes, now)
+                prev = c.Id
+                if c.Id <= high and not any(a <= c.Id <= b for a, b, _ in old_holes):
+                    continue   # ya aplicado en una sincronización anterior
+                if c.Tabla.lower() in BY_NAME:
+                    keys.setdefault(c.Tabla.lower(), set()).add(c.Clave)
+            fetched = {}
+            for name, ks in keys.items():
+                t = BY_NAME[name]
+                ks = sorted(ks)
+                found = []
+                for i in range(0, len(ks), KEYS_PER_QUERY):
+                    chunk = ks[i:i + KEYS_PER_QUERY]
+                    found += self._remote(f"{t.select_sql()} WHERE {t.key} IN ({', '.join(['%s'] * len(chunk))});",
+                                          chunk, row=t.row)
+                fetched[name] = (ks, found)
+            with self._lock:
+                db = self._conn()
+                db.execute("BEGIN;")
+                for name, (ks, found) in fetched.items():
+                    t = BY_NAME[name]
+                    self._upsert(t.name, t, found, db)
+                    alive = {r[0].casefold() for r in found}
+                    gone = [(k,) for k in ks if k.casefold() not in alive]
+                    db.executemany(f"DELETE FROM {t.name} WHERE {t.key} = ?;", gone)
+                    res.changed += len(found) + len(gone)
+                db.execute("COMMIT;")
+            if len(changes) < PAGE_SIZE:
+                break
+
+        high = max(high, prev)
+        recent = [h for h in holes if now - h[2] < GAP_GRACE]
+        safe = recent[0][0] - 1 if recent else high
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN;")
+            self._set_state(db, "ultimo_cambio", safe)
+            self._set_state(db, "maximo_cambio", high)
+            self._set_state(db, "huecos", json.dumps([h for h in holes if h[0] > safe]))
+            db.execute("COMMIT;")
+
+    def _upsert(self, table, t, rows, db=None):
+        values = [[_sqlite_value(v) for v in r] for r in rows]
+        sql = f"INSERT OR REPLACE INTO {table} VALUES ({', '.join(['?'] * len(t.row))});"
+        if db is not None:
+            db.executemany(sql, values)
+            return
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN;")
+            db.executemany(sql, values)
+            db.execute("COMMIT;")
+
+    def status(self):
+        """Estado para mostrar: cargada, última sincronización, en cola y conflictos."""
+        with self._lock:
+            counts = dict(self._conn().execute(
+                "SELECT estado, COUNT(*) FROM _replica_cola GROUP BY estado;").fetchall())
+            return {"cargada": self._loaded, "sincronizada": self._state("sincronizada"),
+                    "ultimo_cambio": self._state("ultimo_cambio"), "online": self.online,
+                    "pendientes": counts.get("pendiente", 0), "conflictos": counts.get("conflicto", 0)}
+
+
+def _holes(first, last, high, old_holes, now):
+    """
+    Huecos [a, b, visto] para los Id `first`..`last` que no aparecieron. Los que ya faltaban
+    (<= `high`) conservan la hora de la primera vez (la del hueco anterior que los contiene).
+    """
+    out = []
+    if first <= high:
+        end = min(last, high)
+        seen = [t for a, b, t in old_holes if a <= end and first <= b]
+        out.append([first, end, min(seen) if seen else now])
+        first = end + 1
+    if first <= last:
+        out.append([first, last, now])
+    return out
+
+
+def purge(client, days):
+    """Borra del registro de cambios lo anterior a `days` días (las réplicas más atrasadas se recargan)."""
+    return client.execute("DELETE FROM Replica_Cambio WHERE Fecha < NOW() - INTERVAL %s DAY;", [int(days)])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Sincroniza la réplica local y administra la cola de operaciones.")
+    ap.add_argument("--config", default=CONFIG_PATH)
+    ap.add_argument("--completa", action="store_true", help="recarga todas las tablas")
+    ap.add_argument("--estado", action="store_true", help="muestra el estado y la cola sin sincronizar")
+    ap.add_argument("--reintentar", type=int, metavar="ID", help="vuelve a encolar un conflicto")
+    ap.add_argument("--descartar", type=int, metavar="ID", help="quita una operación de la cola")
+    ap.add_argument("--purgar", type=int, metavar="DIAS", help="borra del servidor los cambios de más de DIAS días")
+    args = ap.parse_args(argv)
+
+    cfg = load_config(args.config)
+    if not cfg.get("replica"):
+        print('config.json no tiene "replica" (ej. "replica": "replica.sqlite").', file=sys.stderr)
+        return 1
+    client = MySQLClient(**cfg)
+    replica = client.replica
+    try:
+        if args.purgar is not None:
+            ok, out = purge(client, args.purgar)
+            print(out if not ok else f"Registro purgado (más de {args.purgar} días).", file=sys.stdout if ok else sys.stderr)
+            return 0 if ok else 1
+        if args.reintentar is not None or args.descartar is not None:
+            done = replica.retry(args.reintentar) if args.reintentar is not None else replica.discard(args.descartar)
+            if not done:
+                print("No existe esa operación en la cola.", file=sys.stderr)
+                return 1
+        if not args.estado:
+            res = replica.sync(full=args.completa)
+            print(res.summary())
+            for job_id, proc, error in res.conflicts:
+                print(f"conflicto\t{job_id}\t{proc}\t{error}")
+        for key, value in replica.status().items():
+            print(f"{key}\t{'' if value is None else value}")
+        for job_id, proc, params, created, state, error in replica.queue():
+            print("\t".join([str(job_id), state, created, proc, json.dumps(params, default=str, ensure_ascii=False),
+                             error or ""]))
+        return 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
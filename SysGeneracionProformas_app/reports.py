@@ -0,0 +1,330 @@
+"""
+Reportes declarativos.
+
+Cada reporte se define una vez en `REPORTS` (SQL, parámetros tipados, columnas y orden)
+y se ejecuta con parámetros enlazados (`%(nombre)s` -> `%s` de `MySQLClient.select_typed`)
+y paginación por clave (`paging.KeysetPager`), tanto en la pestaña Reportes como desde
+la línea de comandos. Agregar un reporte = agregar un `Report` a la lista.
+
+Uso sin interfaz gráfica:
+    python reports.py --list
+    python reports.py stock_bajo umbral=5 [--config config.json] [-o salida.csv|salida.xlsx]
+"""
+import argparse
+import datetime
+import re
+import sys
+import export
+from db import MySQLClient
+from paging import KeysetPager, iter_pages
+from settings import CONFIG_PATH, load_config
+
+_NAMED = re.compile(r"%\((\w+)\)s")
+
+
+class Param:
+    """
+    Parámetro de un reporte.
+
+    Parameters
+    ----------
+    name : str
+        Nombre del marcador `%(name)s` en el SQL.
+    label : str
+        Texto para la interfaz.
+    kind : type
+        int, str o datetime.date.
+    default : Any
+        Valor si se deja vacío; None = obligatorio.
+    """
+    def __init__(self, name, label, kind=int, default=None):
+        self.name = name
+        self.label = label
+        self.kind = kind
+        self.default = default
+
+    def parse(self, text):
+        """
+        Convierte el texto ingresado al tipo del parámetro.
+
+        Raises
+        ------
+        ValueError
+            Con un mensaje para el usuario si falta o no es válido.
+        """
+        text = "" if text is None else str(text).strip()
+        if not text:
+            if self.default is None:
+                raise ValueError(f"Indique {self.label}.")
+            return self.default
+        try:
+            if self.kind is int:
+                value = int(text)
+                if value < 0:
+                    raise ValueError
+                return value
+            if self.kind is datetime.date:
+                return datetime.date.fromisoformat(text)
+        except ValueError:
+            kind = "entero no negativo" if self.kind is int else "fecha YYYY-MM-DD"
+            raise ValueError(f"{self.label}: se espera {kind}.") from None
+        return text
+
+
+class Report:
+    """
+    Definición de un reporte.
+
+    Parameters
+    ----------
+    key : str
+        Identificador para la línea de comandos.
+    title : str
+        Nombre en la interfaz.
+    columns : tuple[str]
+        Encabezados, en el orden de las columnas del SELECT.
+    select : str
+        SELECT ... FROM ... (sin WHERE / ORDER BY / LIMIT), con marcadores `%(param)s`.
+    order : list[tuple[str, bool, int]]
+        Orden por defecto como en `KeysetPager`; la última clave hace único el orden.
+    where : str | None
+        Filtro (puede usar marcadores).
+    params : tuple[Param]
+    limit : int | str | None
+        Tope de filas ("top N"): número fijo o nombre de un parámetro. Los reportes
+        con tope se traen en una sola consulta; los demás se paginan.
+    """
+    def __init__(self, key, title, columns, select, order, where=None, params=(), limit=None):
+        self.key = key
+        self.title = title
+        self.columns = tuple(columns)
+        self.select = select
+        self.order = list(order)
+        self.where = where
+        self.params = tuple(params)
+        self.limit = limit
+
+    def bind(self, raw):
+        """
+        Valida los valores ingresados (`{nombre: texto}`) y devuelve `{nombre: valor tipado}`.
+
+        Raises
+        ------
+        ValueError
+            Si algún parámetro falta o es inválido.
+        """
+        return {p.name: p.parse(raw.get(p.name)) for p in self.params}
+
+    def row_limit(self, values):
+        """Tope de filas para `values` (o None si el reporte se pagina)."""
+        if isinstance(self.limit, str):
+            return int(values[self.limit])
+        return self.limit
+
+    def pager(self, values, page_size=200):
+        """
+        `KeysetPager` con los parámetros enlazados: sus consultas son tuplas `(sql, params)`.
+
+        Params
+        ------
+        values : dict
+            Resultado de `bind`.
+        page_size : int
+        """
+        bound = []
+
+        def positional(sql):
+            if not sql:
+                return sql
+            return _NAMED.sub(lambda m: bound.append(values[m.group(1)]) or "%s", sql)
+
+        select = positional(self.select)
+        where = positional(self.where)
+        return KeysetPager(select, self.order, where=where, page_size=page_size, params=bound)
+
+    def first_query(self, values, page_size=200):
+        """Consulta de la primera página, o de todas las filas si el reporte tiene tope."""
+        limit = self.row_limit(values)
+        return self.pager(values, page_size).first_sql(limit=limit)
+
+
+REPORTS = [
+    Report(
+        "stock_bajo", "Stock bajo",
+        ("Nro_Parte", "Descripcion", "Marca", "Cantidad", "Precio_Unitario"),
+        "SELECT Nro_Parte, Descripcion, Marca, Cantidad, Precio_Unitario FROM Repuesto",
+        [("Cantidad", False, 3), ("Descripcion", False, 1), ("Nro_Parte", False, 0)],
+        where="Cantidad < %(umbral)s",
+        params=(Param("umbral", "Umbral de stock", default=3),),
+    ),
+    Report(
+        "proveedores_contacto", "Proveedores y contacto",
+        ("RUC", "Raz_Soc", "Direccion", "Telefono", "Email"),
+        "SELECT p.RUC, p.Raz_Soc, IFNULL(p.Direccion, ''), IFNULL(t.Telefono, ''), IFNULL(e.Email, '') "
+        "FROM Proveedor p "
+        "LEFT JOIN Telefono_Proveedor t ON t.RUC_Proveedor = p.RUC "
+        "LEFT JOIN Email_Proveedor e ON e.RUC_Proveedor = p.RUC",
+        [("p.Raz_Soc", False, 1), ("p.RUC", False, 0)],
+    ),
+    Report(
+        "ordenes_recientes", "Órdenes recientes",
+        ("Nro_Orden", "Fecha_Entrega", "Precio_Neto", "Empleado", "Proveedor", "Empresa"),
+        "SELECT oc.Nro_Orden, oc.Fecha_Entrega, oc.Precio_Neto, IFNULL(emp.Nombre, ''), "
+        "IFNULL(prov.Raz_Soc, ''), IFNULL(empc.Raz_Soc, '') "
+        "FROM Orden_Compra oc "
+        "LEFT JOIN Empleado emp ON emp.Codigo = oc.Codigo_Empleado "
+        "LEFT JOIN Proveedor prov ON prov.RUC = oc.RUC_Proveedor "
+        "LEFT JOIN Empresa empc ON empc.RUC = oc.RUC_Empresa",
+        [("oc.Fecha_Entrega", True, 1), ("oc.Nro_Orden", True, 0)],
+        params=(Param("maximo", "Máximo de órdenes", default=100),),
+        limit="maximo",
+    ),
+    # Los agregados leen las tablas resumen que mantienen los triggers (sql/resumenes.sql).
+    Report(
+        "ordenes_por_empresa", "Órdenes por empresa",
+        ("RUC_Empresa", "Empresa", "Total_Ordenes", "Suma_Precio_Neto"),
+        "SELECT r.RUC_Empresa, IFNULL(em.Raz_Soc, ''), r.Total_Ordenes, r.Suma_Precio_Neto "
+        "FROM Resumen_OC_Empresa r "
+        "LEFT JOIN Empresa em ON em.RUC = r.RUC_Empresa",
+        [("r.Suma_Precio_Neto", True, 3), ("r.RUC_Empresa", False, 0)],
+    ),
+    Report(
+        "top_empresas", "Top empresas por monto",
+        ("RUC_Empresa", "Empresa", "Monto_Total"),
+        "SELECT r.RUC_Empresa, em.Raz_Soc, r.Suma_Precio_Neto "
+        "FROM Resumen_OC_Empresa r "
+        "INNER JOIN Empresa em ON em.RUC = r.RUC_Empresa",
+        [("r.Suma_Precio_Neto", True, 2), ("r.RUC_Empresa", False, 0)],
+        params=(Param("top", "Cantidad de empresas", default=10),),
+        limit="top",
+    ),
+    Report(
+        "repuestos_mas_comprados", "Repuestos más comprados",
+        ("Nro_Parte", "Descripcion", "Total_Cant"),
+        "SELECT r.Nro_Parte, r.Descripcion, s.Total_Unidades "
+        "FROM Resumen_Proforma_Repuesto s "
+        "INNER JOIN Repuesto r ON r.Nro_Parte = s.Nro_Parte",
+        [("s.Total_Unidades", True, 2), ("s.Nro_Parte", False, 0)],
+        params=(Param("top", "Cantidad de repuestos", default=10),),
+        limit="top",
+    ),
+    Report(
+        "proformas_por_empleado", "Proformas por empleado",
+        ("Codigo", "Empleado", "Nro_Proformas", "Total_Unidades"),
+        "SELECT s.Codigo_Empleado, e.Nombre, s.Nro_Proformas, s.Total_Unidades "
+        "FROM Resumen_Proforma_Empleado s "
+        "INNER JOIN Empleado e ON e.Codigo = s.Codigo_Empleado",
+        [("s.Nro_Proformas", True, 2), ("s.Codigo_Empleado", False, 0)],
+    ),
+    Report(
+        "proformas_por_repuesto", "Proformas por repuesto",
+        ("Nro_Parte", "Descripcion", "Nro_Proformas", "Total_Unidades"),
+        "SELECT s.Nro_Parte, r.Descripcion, s.Nro_Proformas, s.Total_Unidades "
+        "FROM Resumen_Proforma_Repuesto s "
+        "INNER JOIN Repuesto r ON r.Nro_Parte = s.Nro_Parte",
+        [("s.Total_Unidades", True, 3), ("s.Nro_Parte", False, 0)],
+    ),
+    Report(
+        "empresas_sin_ordenes", "Empresas sin órdenes (N días)",
+        ("RUC", "Empresa"),
+        "SELECT em.RUC, em.Raz_Soc "
+        "FROM Empresa em "
+        "LEFT JOIN Orden_Compra oc ON oc.RUC_Empresa = em.RUC "
+        "AND oc.Fecha_Entrega >= DATE_SUB(CURDATE(), INTERVAL %(dias)s DAY)",
+        [("em.Raz_Soc", False, 1), ("em.RUC", False, 0)],
+        where="oc.Nro_Orden IS NULL",
+        params=(Param("dias", "Días"),),
+    ),
+    Report(
+        "proveedores_sin_ordenes", "Proveedores sin órdenes",
+        ("RUC_Proveedor", "Raz_Soc"),
+        "SELECT p.RUC, p.Raz_Soc "
+        "FROM Proveedor p "
+        "LEFT JOIN Orden_Compra oc ON oc.RUC_Proveedor = p.RUC",
+        [("p.Raz_Soc", False, 1), ("p.RUC", False, 0)],
+        where="oc.Nro_Orden IS NULL",
+    ),
+]
+BY_TITLE = {r.title: r for r in REPORTS}
+BY_KEY = {r.key: r for r in REPORTS}
+
+
+def iter_rows(client, report, values, page_size=1000, strict=False):
+    """
+    Recorre todas las filas del reporte página por página (memoria constante).
+
+    Params
+    ------
+    client : MySQLClient
+    report : Report
+    values : dict
+        Resultado de `report.bind`.
+    page_size : int
+    strict : bool
+        Propaga los errores de consulta en vez de terminar sin filas.
+
+    Yields
+    ------
+    tuple
+        Filas de `client.select_typed`.
+    """
+    limit = report.row_limit(values)
+    if limit is not None:
+        yield from client.select_typed(*report.first_query(values), strict=strict)
+        return
+    for rows in iter_pages(client, report.pager(values, page_size), strict=strict):
+        yield from rows
+
+
+def _cell(value):
+    return "" if value is None else str(value)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Ejecuta un reporte y escribe las filas separadas por tabuladores.")
+    ap.add_argument("reporte", nargs="?", help="clave del reporte (ver --list)")
+    ap.add_argument("param", nargs="*", help="parámetros nombre=valor")
+    ap.add_argument("--list", action="store_true", help="lista los reportes y sus parámetros")
+    ap.add_argument("--config", default=CONFIG_PATH)
+    ap.add_argument("--page-size", type=int, default=1000)
+    ap.add_argument("-o", "--salida", help="exporta a .csv / .xlsx en vez de escribir en STDOUT")
+    args = ap.parse_args(argv)
+
+    if args.list or not args.reporte:
+        for r in REPORTS:
+            params = " ".join(f"{p.name}={'' if p.default is None else p.default}" for p in r.params)
+            print(f"{r.key}\t{r.title}\t{params}")
+        return 0
+    report = BY_KEY.get(args.reporte)
+    if report is None:
+        print(f"Reporte desconocido: {args.reporte} (ver --list)", file=sys.stderr)
+        return 1
+    raw = dict(p.split("=", 1) for p in args.param if "=" in p)
+    try:
+        values = report.bind(raw)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    client = MySQLClient(**load_config(args.config))
+    try:
+        if args.salida:
+            progress = lambda n: print(f"\r{n} filas", end="", file=sys.stderr, flush=True)
+            try:
+                res = export.export_report(client, report, values, args.salida, progress=progress)
+            except (ValueError, RuntimeError) as e:
+                print(f"\n{e}", file=sys.stderr)
+                return 1
+            print("", file=sys.stderr)
+            print(res.summary())
+            return 0
+        print("\t".join(report.columns))
+        for row in iter_rows(client, report, values, args.page_size):
+            print("\t".join(_cell(v) for v in row))
+    finally:
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
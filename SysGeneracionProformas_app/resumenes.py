@@ -0,0 +1,128 @@
+"""
+Tablas resumen de los reportes agregados (ver sql/resumenes.sql).
+
+Los triggers las mantienen al día en cada alta/edición/baja de Orden_Compra, Proforma y
+Proforma_Detalle. Este módulo las recalcula desde cero (`sp_Reconstruir_Resumenes`) y
+las compara contra un GROUP BY sobre las tablas base.
+
+Uso sin interfaz gráfica:
+    python resumenes.py [--config config.json] [--verificar]
+"""
+import argparse
+import sys
+from decimal import Decimal
+from db import MySQLClient
+from settings import CONFIG_PATH, load_config
+
+# Tabla resumen -> (SELECT de la tabla resumen, SELECT equivalente sobre las tablas base).
+# Ambos devuelven (clave, conteo, suma).
+SUMMARIES = {
+    "Resumen_OC_Empresa": (
+        "SELECT RUC_Empresa, Total_Ordenes, Suma_Precio_Neto FROM Resumen_OC_Empresa;",
+        "SELECT RUC_Empresa, COUNT(*), SUM(Precio_Neto) FROM Orden_Compra GROUP BY RUC_Empresa;",
+    ),
+    "Resumen_Proforma_Empleado": (
+        "SELECT Codigo_Empleado, Nro_Proformas, Total_Unidades FROM Resumen_Proforma_Empleado;",
+        "SELECT p.Codigo_Empleado, COUNT(*), IFNULL(SUM(u.Unidades), 0) FROM Proforma p "
+        "LEFT JOIN (SELECT Nro_Proforma, SUM(Cantidad) AS Unidades FROM Proforma_Detalle "
+        "GROUP BY Nro_Proforma) u ON u.Nro_Proforma = p.Nro_Proforma "
+        "GROUP BY p.Codigo_Empleado;",
+    ),
+    "Resumen_Proforma_Repuesto": (
+        "SELECT Nro_Parte, Nro_Proformas, Total_Unidades FROM Resumen_Proforma_Repuesto;",
+        "SELECT Nro_Parte, COUNT(DISTINCT Nro_Proforma), SUM(Cantidad) FROM Proforma_Detalle "
+        "GROUP BY Nro_Parte;",
+    ),
+}
+
+
+def _load(client, sql):
+    """clave (en mayúsculas, como compara la BD) -> (conteo, suma)."""
+    ok, out = client.run_sql(sql)
+    if not ok:
+        raise RuntimeError(out)
+    rows = {}
+    for line in out.splitlines():
+        parts = line.split("\t")
+        if len(parts) == 3:
+            rows[parts[0].upper()] = (int(parts[1]), Decimal(parts[2]))
+    return rows
+
+
+def verify(client):
+    """
+    Compara cada tabla resumen con el agregado calculado sobre las tablas base.
+
+    Returns
+    -------
+    list[tuple[str, str, tuple | None, tuple | None]]
+        Diferencias (tabla, clave, esperado, actual); None = la fila falta. Vacía si todo cuadra.
+
+    Raises
+    ------
+    RuntimeError
+        Si falla alguna consulta (p.ej. aún no se aplicó sql/resumenes.sql).
+    """
+    diffs = []
+    for table, (summary_sql, source_sql) in SUMMARIES.items():
+        actual = _load(client, summary_sql)
+        expected = _load(client, source_sql)
+        for key in sorted(set(actual) | set(expected)):
+            if actual.get(key) != expected.get(key):
+                diffs.append((table, key, expected.get(key), actual.get(key)))
+    return diffs
+
+
+def rebuild(client):
+    """
+    Recalcula las tablas resumen desde cero (una transacción) y las verifica.
+
+    Returns
+    -------
+    (bool, str)
+        True + resumen si quedaron consistentes; False + error o diferencias.
+    """
+    ok, out = client.call_sp("CALL sp_Reconstruir_Resumenes();")
+    if not ok:
+        return False, out
+    try:
+        diffs = verify(client)
+    except RuntimeError as e:
+        return False, str(e)
+    if diffs:
+        return False, format_diffs(diffs)
+    return True, "Resúmenes reconstruidos y verificados."
+
+
+def format_diffs(diffs, limit=20):
+    lines = [f"{len(diffs)} diferencia(s):"]
+    for table, key, expected, actual in diffs[:limit]:
+        lines.append(f"  {table} {key}: esperado {expected}, actual {actual}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Reconstruye y verifica las tablas resumen de los reportes.")
+    ap.add_argument("--config", default=CONFIG_PATH)
+    ap.add_argument("--verificar", action="store_true", help="solo compara, sin reconstruir")
+    args = ap.parse_args(argv)
+
+    client = MySQLClient(**load_config(args.config))
+    try:
+        if args.verificar:
+            try:
+                diffs = verify(client)
+            except RuntimeError as e:
+                print(e, file=sys.stderr)
+                return 1
+            print(format_diffs(diffs) if diffs else "Resúmenes consistentes.")
+            return 2 if diffs else 0
+        ok, out = rebuild(client)
+        print(out, file=sys.stdout if ok else sys.stderr)
+        return 0 if ok else 1
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Filas tipadas: cada consulta declara sus columnas (nombre, tipo) con un `RowType` y los
+resultados llegan como registros compactos (namedtuple: una tupla por fila, sin __dict__)
+con str, int, Decimal, date, datetime y None reales, con cualquier backend.
+
+Con el backend "cli" el texto de `mysql -N -B` se decodifica aquí:
+  * las filas se separan solo por "\\n" y las columnas por TAB: dentro de un valor, mysql
+    escapa \\0, \\t, \\n y \\\\ (`unescape` los revierte), de modo que un TAB o un salto de
+    línea en Descripcion o Desc_Orden no desarma la fila;
+  * NULL llega como el texto NULL. En columnas numéricas y de fecha no hay ambigüedad; en las
+    de texto, un valor que sea literalmente 'NULL' también se lee como None (limitación de
+    `mysql -B`).
+Con "driver" los valores ya vienen tipados: solo se convierten los que llegan como texto.
+"""
+import re
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+NULL = "NULL"
+_ESCAPE = re.compile(r"\\(.)", re.S)
+_UNESCAPED = {"0": "\0", "t": "\t", "n": "\n", "\\": "\\"}
+
+
+def unescape(text):
+    """Revierte el escape de `mysql -B` en un valor (`a\\tb` -> "a<TAB>b")."""
+    if "\\" not in text:
+        return text
+    return _ESCAPE.sub(lambda m: _UNESCAPED.get(m.group(1), m.group(1)), text)
+
+
+def text_value(field):
+    """Valor de texto de una columna sin tipo declarado: None para NULL, sin escapes."""
+    if field == NULL:
+        return None
+    return unescape(field) if "\\" in field else field
+
+
+def parse_decimal(text):
+    """
+    Decimal finito de un valor ingresado (formulario o archivo), para enlazarlo como número.
+
+    Raises
+    ------
+    ValueError
+        Si no es un número o no es finito (nan, inf).
+    """
+    try:
+        value = Decimal(str(text).strip())
+    except InvalidOperation:
+        raise ValueError(f"No es un número: {text!r}") from None
+    if not value.is_finite():
+        raise ValueError(f"No es un número: {text!r}")
+    return value
+
+
+def _bool(text):
+    return text not in ("0", "")
+
+
+# Conversión desde el texto de `mysql -B` (sin NULL) para cada tipo admitido.
+TYPES = {
+    str: unescape,
+    int: int,
+    float: float,
+    Decimal: Decimal,
+    date: date.fromisoformat,
+    datetime: datetime.fromisoformat,
+    bool: _bool,
+}
+
+
+def _from_text(kind):
+    """Conversor texto -> valor de una columna (NULL -> None)."""
+    if kind is str:
+        return text_value
+    parse = TYPES[kind]
+    return lambda field: None if field == NULL else parse(field)
+
+
+def _from_value(kind):
+    """Conversor valor del driver -> valor de una columna, o None si ya llega con el tipo."""
+    if kind is str:
+        return None
+    parse = TYPES[kind]
+
+    def convert(value):
+        if value is None or isinstance(value, kind):
+            return value
+        return parse(value if isinstance(value, str) else str(value))
+    return convert
+
+
+def lines(out):
+    """Filas del texto de `mysql -N -B` (solo "\\n" separa filas; ver `db._decode_output`)."""
+    return out.split("\n") if out else []
+
+
+def decode_text(out):
+    """Filas sin tipos declarados: tuplas de str/None (ver `text_value`)."""
+    return [tuple(text_value(f) for f in line.split("\t")) for line in lines(out)]
+
+
+def display(row):
+    """Valores para mostrar en un Treeview: None -> "" y el resto como texto."""
+    return ["" if v is None else str(v) for v in row]
+
+
+class RowType:
+    """
+    Tipo de las filas de una consulta.
+
+    Parameters
+    ----------
+    name : str
+        Nombre del registro (namedtuple), p. ej. "Empleado".
+    columns : sequence[tuple[str, type]]
+        (nombre, tipo) en el orden del SELECT; tipos de `TYPES`.
+    """
+    def __init__(self, name, columns):
+        self.name = name
+        self.names = tuple(n for n, _ in columns)
+        self.types = tuple(t for _, t in columns)
+        unknown = [t for t in self.types if t not in TYPES]
+        if unknown:
+            raise ValueError(f"{name}: tipo de columna no admitido: {unknown[0]!r}")
+        self.record = namedtuple(name, self.names)
+        self._text = tuple(_from_text(t) for t in self.types)
+        value = tuple(_from_value(t) for t in self.types)
+        # Solo las columnas que pueden necesitar conversión (con el driver casi nunca hay alguna).
+        self._value = tuple((i, f) for i, f in enumerate(value) if f is not None)
+
+    def __len__(self):
+        return len(self.names)
+
+    def from_text(self, out):
+        """
+        Decodifica la salida de `mysql -N -B`.
+
+        Raises
+        ------
+        ValueError
+            Si una fila no tiene las columnas declaradas o un valor no es del tipo
+            (`decimal.InvalidOperation` es ArithmeticError).
+        """
+        make = self.record._make
+        convs = self._text
+        n = len(convs)
+        rows = []
+        for line in lines(out):
+            fields = line.split("\t")
+            if len(fields) != n:
+                if len(fields) > n:
+                    raise ValueError(f"{self.name}: {len(fields)} columnas, se esperaban {n}")
+                # La salida llega sin espacios finales: una última fila con textos vacíos
+                # al final pierde sus TAB.
+                fields += [""] * (n - len(fields))
+            try:
+                rows.append(make([c(f) for c, f in zip(convs, fields)]))
+            except (ValueError, ArithmeticError):
+                raise ValueError(self._bad_value(fields)) from None
+        return rows
+
+    def _bad_value(self, fields):
+        """Mensaje que identifica la primera columna cuyo texto no es del tipo declarado."""
+        for name, kind, conv, field in zip(self.names, self.types, self._text, fields):
+            try:
+                conv(field)
+            except (ValueError, ArithmeticError):
+                return f"{self.name}.{name}: {field!r} no es {kind.__name__}"
+        return f"{self.name}: fila no válida"
+
+    def from_values(self, rows):
+        """Registros a partir de filas del driver (ya tipadas)."""
+        make = self.record._make
+        if not self._value:
+            return [make(r) for r in rows]
+        out = []
+        for r in rows:
+            r = list(r)
+            for i, convert in self._value:
+                r[i] = convert(r[i])
+            out.append(make(r))
+        return out
@@ -0,0 +1,38 @@
+"""
+Configuración y rutas compartidas por la app y los modos sin interfaz (cli.py): no importa
+tkinter.
+"""
+import json
+import os
+import sys
+
+# config.json junto a los módulos: valor por defecto de --config en los modos sin interfaz.
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
+
+
+def resource_path(*parts):
+    """
+    Devuelve una ruta válida tanto en desarrollo como en .exe (PyInstaller).
+    Busca dentro de sys._MEIPASS cuando está congelado (--onefile).
+    """
+    base = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base, *parts)
+
+
+def load_config(path="config.json"):
+    """
+    Carga el archivo de configuración JSON (host/port/user/password/database).
+    Si no existe, devuelve un diccionario con valores por defecto.
+    """
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {"host": "localhost", "port": 3306, "user": "root", "password": "root", "database": "sistemaproforma",
+            "session": True, "backend": "cli", "pool_size": 4,
+            "cache": False, "cache_ttl": 30} # Cambiar Datos de path respectivamente.
+
+
+def save_config(cfg, path="config.json"):
+    """Guarda el diccionario de configuración en disco (UTF-8, identado)."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cfg, f, indent=2)
@@ -0,0 +1,28 @@
+USE `sistemaproforma`;
+
+DELIMITER //
+
+-- Índices de la búsqueda de repuestos (busqueda.py):
+--   * Nro_Parte: es la PK, así que `Nro_Parte LIKE 'abc%'` ya es un rango sobre el índice
+--     agrupado (no hace falta un índice de prefijo aparte).
+--   * Marca: índice B-tree para `Marca LIKE 'bos%'` (incluye la PK, que da el orden).
+--   * Descripcion: FULLTEXT para palabras en cualquier posición (MATCH ... IN BOOLEAN MODE).
+DROP PROCEDURE IF EXISTS mig_Busqueda //
+CREATE PROCEDURE mig_Busqueda()
+BEGIN
+    IF NOT EXISTS(SELECT 1 FROM information_schema.statistics
+                  WHERE table_schema = DATABASE() AND LOWER(table_name) = 'repuesto'
+                    AND LOWER(index_name) = 'idx_repuesto_marca') THEN
+        CREATE INDEX idx_Repuesto_Marca ON Repuesto (Marca);
+    END IF;
+    IF NOT EXISTS(SELECT 1 FROM information_schema.statistics
+                  WHERE table_schema = DATABASE() AND LOWER(table_name) = 'repuesto'
+                    AND LOWER(index_name) = 'ft_repuesto_descripcion') THEN
+        CREATE FULLTEXT INDEX ft_Repuesto_Descripcion ON Repuesto (Descripcion);
+    END IF;
+END //
+
+DELIMITER ;
+
+CALL mig_Busqueda();
+DROP PROCEDURE mig_Busqueda;
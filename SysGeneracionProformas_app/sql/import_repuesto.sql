@@ -0,0 +1,51 @@
+USE `sistemaproforma`;
+
+-- Tabla de carga para importaciones masivas de catálogo (ver importer.py).
+-- Cada importación usa su propio Lote; las filas se fusionan en Repuesto con sp_Importar_Repuestos.
+CREATE TABLE IF NOT EXISTS Repuesto_Staging (
+  Lote CHAR(32) NOT NULL,
+  Nro_Parte VARCHAR(10) NOT NULL,
+  Descripcion VARCHAR(100) NOT NULL,
+  Marca VARCHAR(50) NOT NULL,
+  Status VARCHAR(10) NULL,
+  Precio_Unitario DECIMAL(10,2) NOT NULL,
+  Cantidad INT NULL,
+  Fecha_Carga TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (Lote, Nro_Parte))
+ENGINE = InnoDB;
+
+DELIMITER //
+
+-- Fusiona un lote de Repuesto_Staging en Repuesto en una sola transacción.
+-- Status/Cantidad NULL: en repuestos existentes se conserva el valor actual;
+-- en los nuevos se usa 'Almacen' / 0.
+DROP PROCEDURE IF EXISTS sp_Importar_Repuestos //
+CREATE PROCEDURE sp_Importar_Repuestos(
+    IN p_Lote CHAR(32)
+)
+BEGIN
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    START TRANSACTION;
+
+    INSERT INTO Repuesto (Nro_Parte, Descripcion, Marca, Status, Precio_Unitario, Cantidad)
+    SELECT s.Nro_Parte, s.Descripcion, s.Marca, IFNULL(s.Status, 'Almacen'), s.Precio_Unitario, IFNULL(s.Cantidad, 0)
+    FROM Repuesto_Staging s
+    WHERE s.Lote = p_Lote
+    ON DUPLICATE KEY UPDATE
+        Descripcion = s.Descripcion,
+        Marca = s.Marca,
+        Status = IFNULL(s.Status, Repuesto.Status),
+        Precio_Unitario = s.Precio_Unitario,
+        Cantidad = IFNULL(s.Cantidad, Repuesto.Cantidad);
+
+    DELETE FROM Repuesto_Staging WHERE Lote = p_Lote;
+
+    COMMIT;
+END //
+
+DELIMITER ;
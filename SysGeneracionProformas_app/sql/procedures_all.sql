@@ -352,17 +352,78 @@ BEGIN
     COMMIT;
 END //
 
+-- Proformas: cabecera (Proforma, con RUC_Empresa opcional) + líneas (Proforma_Detalle).
+-- p_Lineas es un arreglo JSON [{"Nro_Parte": "...", "Cantidad": n, "Peso": x}, ...];
+-- Item se numera 1..n en el orden del arreglo. Todo se valida por conjuntos y se
+-- guarda en una sola transacción.
+
+-- Valida líneas de una proforma (SIGNAL con el primer problema encontrado).
+DROP PROCEDURE IF EXISTS sp_Validar_Lineas_Proforma //
+CREATE PROCEDURE sp_Validar_Lineas_Proforma(
+    IN p_Lineas JSON
+)
+BEGIN
+    DECLARE v_Faltantes TEXT;
+    DECLARE v_Msg VARCHAR(128);
+
+    IF p_Lineas IS NULL OR JSON_TYPE(p_Lineas) <> 'ARRAY' OR JSON_LENGTH(p_Lineas) = 0 THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'La proforma no tiene líneas';
+    END IF;
+
+    IF EXISTS(SELECT 1
+              FROM JSON_TABLE(p_Lineas, '$[*]' COLUMNS (
+                     Nro_Parte VARCHAR(10) CHARACTER SET utf8 PATH '$.Nro_Parte',
+                     Cantidad INT PATH '$.Cantidad',
+                     Peso DECIMAL(8,3) PATH '$.Peso')) j
+              WHERE j.Nro_Parte IS NULL OR j.Nro_Parte = ''
+                 OR j.Cantidad IS NULL OR j.Cantidad <= 0
+                 OR j.Peso IS NULL OR j.Peso < 0) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Línea incompleta: Nro_Parte, Cantidad > 0 y Peso >= 0';
+    END IF;
+
+    SELECT GROUP_CONCAT(DISTINCT j.Nro_Parte ORDER BY j.Nro_Parte SEPARATOR ', ') INTO v_Faltantes
+    FROM JSON_TABLE(p_Lineas, '$[*]' COLUMNS (
+           Nro_Parte VARCHAR(10) CHARACTER SET utf8 PATH '$.Nro_Parte')) j
+    LEFT JOIN Repuesto r ON r.Nro_Parte = j.Nro_Parte
+    WHERE r.Nro_Parte IS NULL;
+
+    IF v_Faltantes IS NOT NULL THEN
+        SET v_Msg = LEFT(CONCAT('Repuesto no válido: ', v_Faltantes), 128);
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = v_Msg;
+    END IF;
+END //
+
+-- Inserta las líneas de p_Lineas como detalle de p_Nro_Proforma.
+DROP PROCEDURE IF EXISTS sp_Insertar_Lineas_Proforma //
+CREATE PROCEDURE sp_Insertar_Lineas_Proforma(
+    IN p_Nro_Proforma VARCHAR(10),
+    IN p_Lineas JSON
+)
+BEGIN
+    INSERT INTO Proforma_Detalle (Nro_Proforma, Item, Nro_Parte, Cantidad, Peso)
+    SELECT p_Nro_Proforma, j.Item, j.Nro_Parte, j.Cantidad, j.Peso
+    FROM JSON_TABLE(p_Lineas, '$[*]' COLUMNS (
+           Item FOR ORDINALITY,
+           Nro_Parte VARCHAR(10) CHARACTER SET utf8 PATH '$.Nro_Parte',
+           Cantidad INT PATH '$.Cantidad',
+           Peso DECIMAL(8,3) PATH '$.Peso')) j;
+END //
+
 DROP PROCEDURE IF EXISTS sp_Agregar_Proforma //
 CREATE PROCEDURE sp_Agregar_Proforma(
     IN p_Nro_Proforma VARCHAR(10),
-    IN p_Item INT,
-    IN p_Cantidad INT,
     IN p_Fecha DATE,
-    IN p_Peso DECIMAL(8,3),
-    IN p_Nro_Parte VARCHAR(10),
-    IN p_Codigo_Empleado CHAR(5)
+    IN p_Codigo_Empleado CHAR(5),
+    IN p_RUC_Empresa VARCHAR(11),
+    IN p_Lineas JSON
 )
 BEGIN
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
     START TRANSACTION;
 
     IF EXISTS(SELECT 1 FROM Proforma WHERE Nro_Proforma = p_Nro_Proforma) THEN
@@ -373,30 +434,39 @@ BEGIN
         SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Empleado no válido';
     END IF;
 
-    IF NOT EXISTS(SELECT 1 FROM Repuesto WHERE Nro_Parte = p_Nro_Parte) THEN
-        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Repuesto no válido';
+    IF p_RUC_Empresa IS NOT NULL AND NOT EXISTS(SELECT 1 FROM Empresa WHERE RUC = p_RUC_Empresa) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Empresa no válida';
     END IF;
 
-    INSERT INTO Proforma (Nro_Proforma, Item, Cantidad, Fecha, Peso, Nro_Parte, Codigo_Empleado)
-    VALUES (p_Nro_Proforma, p_Item, p_Cantidad, p_Fecha, p_Peso, p_Nro_Parte, p_Codigo_Empleado);
+    CALL sp_Validar_Lineas_Proforma(p_Lineas);
+
+    INSERT INTO Proforma (Nro_Proforma, Fecha, Codigo_Empleado, RUC_Empresa)
+    VALUES (p_Nro_Proforma, p_Fecha, p_Codigo_Empleado, p_RUC_Empresa);
+
+    CALL sp_Insertar_Lineas_Proforma(p_Nro_Proforma, p_Lineas);
 
     COMMIT;
 END //
 
+-- Actualiza la cabecera y reemplaza todas las líneas.
 DROP PROCEDURE IF EXISTS sp_Actualizar_Proforma //
 CREATE PROCEDURE sp_Actualizar_Proforma(
     IN p_Nro_Proforma VARCHAR(10),
-    IN p_Item INT,
-    IN p_Cantidad INT,
     IN p_Fecha DATE,
-    IN p_Peso DECIMAL(8,3),
-    IN p_Nro_Parte VARCHAR(10),
-    IN p_Codigo_Empleado CHAR(5)
+    IN p_Codigo_Empleado CHAR(5),
+    IN p_RUC_Empresa VARCHAR(11),
+    IN p_Lineas JSON
 )
 BEGIN
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
     START TRANSACTION;
 
-    IF NOT EXISTS(SELECT 1 FROM Proforma WHERE Nro_Proforma = p_Nro_Proforma) THEN
+    IF NOT EXISTS(SELECT 1 FROM Proforma WHERE Nro_Proforma = p_Nro_Proforma FOR UPDATE) THEN
         SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'La proforma no existe';
     END IF;
 
@@ -404,19 +474,21 @@ BEGIN
         SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Empleado no válido';
     END IF;
 
-    IF NOT EXISTS(SELECT 1 FROM Repuesto WHERE Nro_Parte = p_Nro_Parte) THEN
-        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Repuesto no válido';
+    IF p_RUC_Empresa IS NOT NULL AND NOT EXISTS(SELECT 1 FROM Empresa WHERE RUC = p_RUC_Empresa) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Empresa no válida';
     END IF;
 
+    CALL sp_Validar_Lineas_Proforma(p_Lineas);
+
     UPDATE Proforma
-       SET Item = p_Item,
-           Cantidad = p_Cantidad,
-           Fecha = p_Fecha,
-           Peso = p_Peso,
-           Nro_Parte = p_Nro_Parte,
-           Codigo_Empleado = p_Codigo_Empleado
+       SET Fecha = p_Fecha,
+           Codigo_Empleado = p_Codigo_Empleado,
+           RUC_Empresa = p_RUC_Empresa
      WHERE Nro_Proforma = p_Nro_Proforma;
 
+    DELETE FROM Proforma_Detalle WHERE Nro_Proforma = p_Nro_Proforma;
+    CALL sp_Insertar_Lineas_Proforma(p_Nro_Proforma, p_Lineas);
+
     COMMIT;
 END //
 
@@ -425,12 +497,19 @@ CREATE PROCEDURE sp_Eliminar_Proforma(
     IN p_Nro_Proforma VARCHAR(10)
 )
 BEGIN
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
     START TRANSACTION;
 
     IF NOT EXISTS(SELECT 1 FROM Proforma WHERE Nro_Proforma = p_Nro_Proforma) THEN
         SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'La proforma no existe';
     END IF;
 
+    DELETE FROM Proforma_Detalle WHERE Nro_Proforma = p_Nro_Proforma;
     DELETE FROM Proforma WHERE Nro_Proforma = p_Nro_Proforma;
 
     COMMIT;
@@ -0,0 +1,51 @@
+USE `sistemaproforma`;
+
+-- Proforma pasa a ser cabecera (Nro_Proforma, Fecha, Codigo_Empleado) y sus líneas
+-- (Item, Nro_Parte, Cantidad, Peso) se guardan en Proforma_Detalle.
+CREATE TABLE IF NOT EXISTS Proforma_Detalle (
+  Nro_Proforma VARCHAR(10) NOT NULL,
+  Item INT NOT NULL,
+  Nro_Parte VARCHAR(10) NOT NULL,
+  Cantidad INT NOT NULL,
+  Peso DECIMAL(8,3) NOT NULL,
+  PRIMARY KEY (Nro_Proforma, Item),
+  INDEX fk_Proforma_Detalle_Repuesto_idx (Nro_Parte ASC),
+  CONSTRAINT fk_Proforma_Detalle_Proforma
+    FOREIGN KEY (Nro_Proforma)
+    REFERENCES Proforma (Nro_Proforma)
+    ON DELETE CASCADE
+    ON UPDATE NO ACTION,
+  CONSTRAINT fk_Proforma_Detalle_Repuesto
+    FOREIGN KEY (Nro_Parte)
+    REFERENCES Repuesto (Nro_Parte)
+    ON DELETE NO ACTION
+    ON UPDATE NO ACTION)
+ENGINE = InnoDB;
+
+DELIMITER //
+
+-- Copia la línea de cada proforma existente al detalle y quita las columnas de línea
+-- de la cabecera. Solo actúa si Proforma aún tiene la columna Nro_Parte.
+DROP PROCEDURE IF EXISTS mig_Proforma_Detalle //
+CREATE PROCEDURE mig_Proforma_Detalle()
+BEGIN
+    IF EXISTS(SELECT 1 FROM information_schema.columns
+              WHERE table_schema = DATABASE() AND LOWER(table_name) = 'proforma'
+                AND LOWER(column_name) = 'nro_parte') THEN
+        INSERT IGNORE INTO Proforma_Detalle (Nro_Proforma, Item, Nro_Parte, Cantidad, Peso)
+        SELECT Nro_Proforma, Item, Nro_Parte, Cantidad, Peso FROM Proforma;
+
+        ALTER TABLE Proforma
+          DROP FOREIGN KEY fk_Proforma_Repuesto1,
+          DROP INDEX fk_Proforma_Repuesto1_idx,
+          DROP COLUMN Item,
+          DROP COLUMN Cantidad,
+          DROP COLUMN Peso,
+          DROP COLUMN Nro_Parte;
+    END IF;
+END //
+
+DELIMITER ;
+
+CALL mig_Proforma_Detalle();
+DROP PROCEDURE mig_Proforma_Detalle;
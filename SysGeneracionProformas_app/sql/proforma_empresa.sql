@@ -0,0 +1,26 @@
+USE `sistemaproforma`;
+
+DELIMITER //
+
+-- Empresa cliente de la proforma (opcional; necesaria para imprimirla con sus datos).
+DROP PROCEDURE IF EXISTS mig_Proforma_Empresa //
+CREATE PROCEDURE mig_Proforma_Empresa()
+BEGIN
+    IF NOT EXISTS(SELECT 1 FROM information_schema.columns
+                  WHERE table_schema = DATABASE() AND LOWER(table_name) = 'proforma'
+                    AND LOWER(column_name) = 'ruc_empresa') THEN
+        ALTER TABLE Proforma
+          ADD COLUMN RUC_Empresa VARCHAR(11) NULL AFTER Codigo_Empleado,
+          ADD INDEX fk_Proforma_Empresa1_idx (RUC_Empresa ASC),
+          ADD CONSTRAINT fk_Proforma_Empresa1
+            FOREIGN KEY (RUC_Empresa)
+            REFERENCES Empresa (RUC)
+            ON DELETE NO ACTION
+            ON UPDATE NO ACTION;
+    END IF;
+END //
+
+DELIMITER ;
+
+CALL mig_Proforma_Empresa();
+DROP PROCEDURE mig_Proforma_Empresa;
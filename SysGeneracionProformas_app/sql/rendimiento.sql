@@ -0,0 +1,88 @@
+USE `sistemaproforma`;
+
+-- TEXT(n) -> VARCHAR(n): MySQL guarda TEXT(n) como TINYTEXT/TEXT, que no se puede indexar
+-- completo y obliga a usar tablas temporales en disco al ordenar. Los largos son los mismos
+-- que aceptan los procedimientos (VARCHAR(n)), así que ningún valor existente se recorta.
+ALTER TABLE Empresa
+  MODIFY Raz_Soc VARCHAR(50) NOT NULL;
+
+ALTER TABLE Direccion_Empresa
+  MODIFY Ciudad VARCHAR(25) NOT NULL,
+  MODIFY Calle VARCHAR(25) NOT NULL,
+  MODIFY Distrito VARCHAR(25) NOT NULL;
+
+ALTER TABLE Empleado
+  MODIFY Nombre VARCHAR(50) NOT NULL;
+
+ALTER TABLE Proveedor
+  MODIFY Direccion VARCHAR(50) NULL,
+  MODIFY Raz_Soc VARCHAR(50) NOT NULL;
+
+ALTER TABLE Orden_Compra
+  MODIFY Per_UM VARCHAR(25) NOT NULL,
+  MODIFY UM VARCHAR(20) NOT NULL,
+  MODIFY Forma_pago VARCHAR(50) NOT NULL,
+  MODIFY Incoterms_2000 VARCHAR(100) NULL,
+  MODIFY Desc_Orden VARCHAR(100) NOT NULL;
+
+ALTER TABLE Repuesto
+  MODIFY Descripcion VARCHAR(100) NOT NULL,
+  MODIFY Marca VARCHAR(50) NOT NULL,
+  MODIFY Status VARCHAR(10) NOT NULL;
+
+DELIMITER //
+
+-- Crea / quita un índice solo si hace falta (MySQL no tiene CREATE INDEX IF NOT EXISTS).
+DROP PROCEDURE IF EXISTS mig_Crear_Indice //
+CREATE PROCEDURE mig_Crear_Indice(IN p_Tabla VARCHAR(64), IN p_Indice VARCHAR(64), IN p_Columnas VARCHAR(255))
+BEGIN
+    IF NOT EXISTS(SELECT 1 FROM information_schema.statistics
+                  WHERE table_schema = DATABASE() AND LOWER(table_name) = LOWER(p_Tabla)
+                    AND LOWER(index_name) = LOWER(p_Indice)) THEN
+        SET @mig_sql = CONCAT('CREATE INDEX ', p_Indice, ' ON ', p_Tabla, ' (', p_Columnas, ')');
+        PREPARE mig_stmt FROM @mig_sql;
+        EXECUTE mig_stmt;
+        DEALLOCATE PREPARE mig_stmt;
+    END IF;
+END //
+
+DROP PROCEDURE IF EXISTS mig_Quitar_Indice //
+CREATE PROCEDURE mig_Quitar_Indice(IN p_Tabla VARCHAR(64), IN p_Indice VARCHAR(64))
+BEGIN
+    IF EXISTS(SELECT 1 FROM information_schema.statistics
+              WHERE table_schema = DATABASE() AND LOWER(table_name) = LOWER(p_Tabla)
+                AND LOWER(index_name) = LOWER(p_Indice)) THEN
+        SET @mig_sql = CONCAT('DROP INDEX ', p_Indice, ' ON ', p_Tabla);
+        PREPARE mig_stmt FROM @mig_sql;
+        EXECUTE mig_stmt;
+        DEALLOCATE PREPARE mig_stmt;
+    END IF;
+END //
+
+DELIMITER ;
+
+-- Inventario: ORDER BY Descripcion, Nro_Parte (listado paginado por clave).
+CALL mig_Crear_Indice('Repuesto', 'idx_Repuesto_Descripcion', 'Descripcion, Nro_Parte');
+-- "Stock bajo": WHERE Cantidad < ? ORDER BY Cantidad, Descripcion, Nro_Parte; cubre todas las
+-- columnas del reporte, así que se resuelve solo con el índice.
+CALL mig_Crear_Indice('Repuesto', 'idx_Repuesto_Cantidad', 'Cantidad, Descripcion, Nro_Parte, Marca, Precio_Unitario');
+
+-- Listado de OC y "Órdenes recientes": ORDER BY Fecha_Entrega DESC, Nro_Orden DESC.
+CALL mig_Crear_Indice('Orden_Compra', 'idx_Orden_Compra_Fecha', 'Fecha_Entrega, Nro_Orden');
+-- "Empresas sin órdenes (N días)": anti-join por RUC_Empresa + rango de Fecha_Entrega, resuelto
+-- en el índice. Reemplaza al índice de la FK (que solo tenía RUC_Empresa).
+CALL mig_Crear_Indice('Orden_Compra', 'idx_Orden_Compra_Empresa_Fecha', 'RUC_Empresa, Fecha_Entrega');
+CALL mig_Quitar_Indice('Orden_Compra', 'fk_Orden_Compra_Empresa1_idx');
+
+-- Listado de proformas: ORDER BY Fecha DESC, Nro_Proforma DESC; PDF por rango de fechas.
+CALL mig_Crear_Indice('Proforma', 'idx_Proforma_Fecha', 'Fecha, Nro_Proforma');
+
+-- Proveedores / Empresas: ORDER BY Raz_Soc, RUC (listados y reportes).
+CALL mig_Crear_Indice('Proveedor', 'idx_Proveedor_Raz_Soc', 'Raz_Soc, RUC');
+CALL mig_Crear_Indice('Empresa', 'idx_Empresa_Raz_Soc', 'Raz_Soc, RUC');
+
+-- Limpieza de lotes viejos de importación (Fecha_Carga < NOW() - 1 día).
+CALL mig_Crear_Indice('Repuesto_Staging', 'idx_Repuesto_Staging_Fecha', 'Fecha_Carga');
+
+DROP PROCEDURE mig_Crear_Indice;
+DROP PROCEDURE mig_Quitar_Indice;
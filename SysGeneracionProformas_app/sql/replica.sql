@@ -0,0 +1,300 @@
+USE `sistemaproforma`;
+
+-- Registro de cambios de las tablas que copia la réplica local (replica.py): cada alta,
+-- edición o baja agrega (Tabla, Clave) y la réplica pide solo las filas cambiadas desde el
+-- último Id que vio (los Id que faltan, de transacciones aún sin confirmar, se vuelven a buscar
+-- durante unos minutos: ver `Replica._pull`). Puede purgarse (`python replica.py --purgar DIAS`): una réplica que
+-- quedó más atrás que lo purgado se recarga completa.
+
+CREATE TABLE IF NOT EXISTS Replica_Cambio (
+  Id BIGINT NOT NULL AUTO_INCREMENT,
+  Tabla VARCHAR(32) NOT NULL,
+  Clave VARCHAR(20) NOT NULL,
+  Fecha TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (Id),
+  INDEX idx_Replica_Cambio_Fecha (Fecha))
+ENGINE = InnoDB;
+
+DELIMITER //
+
+-- -------- Empresa ---------------------------------------------------------------
+DROP TRIGGER IF EXISTS trg_Replica_Empresa_Insert //
+CREATE TRIGGER trg_Replica_Empresa_Insert
+AFTER INSERT ON Empresa
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Empresa', NEW.RUC);
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Empresa_Update //
+CREATE TRIGGER trg_Replica_Empresa_Update
+AFTER UPDATE ON Empresa
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Empresa', NEW.RUC);
+    IF NOT (OLD.RUC <=> NEW.RUC) THEN
+        INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Empresa', OLD.RUC);
+    END IF;
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Empresa_Delete //
+CREATE TRIGGER trg_Replica_Empresa_Delete
+AFTER DELETE ON Empresa
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Empresa', OLD.RUC);
+END //
+
+-- -------- Direccion_Empresa -----------------------------------------------------
+DROP TRIGGER IF EXISTS trg_Replica_Direccion_Empresa_Insert //
+CREATE TRIGGER trg_Replica_Direccion_Empresa_Insert
+AFTER INSERT ON Direccion_Empresa
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Direccion_Empresa', NEW.RUC_Empresa);
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Direccion_Empresa_Update //
+CREATE TRIGGER trg_Replica_Direccion_Empresa_Update
+AFTER UPDATE ON Direccion_Empresa
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Direccion_Empresa', NEW.RUC_Empresa);
+    IF NOT (OLD.RUC_Empresa <=> NEW.RUC_Empresa) THEN
+        INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Direccion_Empresa', OLD.RUC_Empresa);
+    END IF;
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Direccion_Empresa_Delete //
+CREATE TRIGGER trg_Replica_Direccion_Empresa_Delete
+AFTER DELETE ON Direccion_Empresa
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Direccion_Empresa', OLD.RUC_Empresa);
+END //
+
+-- -------- Telefono_Empresa ------------------------------------------------------
+DROP TRIGGER IF EXISTS trg_Replica_Telefono_Empresa_Insert //
+CREATE TRIGGER trg_Replica_Telefono_Empresa_Insert
+AFTER INSERT ON Telefono_Empresa
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Telefono_Empresa', NEW.RUC_Empresa);
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Telefono_Empresa_Update //
+CREATE TRIGGER trg_Replica_Telefono_Empresa_Update
+AFTER UPDATE ON Telefono_Empresa
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Telefono_Empresa', NEW.RUC_Empresa);
+    IF NOT (OLD.RUC_Empresa <=> NEW.RUC_Empresa) THEN
+        INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Telefono_Empresa', OLD.RUC_Empresa);
+    END IF;
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Telefono_Empresa_Delete //
+CREATE TRIGGER trg_Replica_Telefono_Empresa_Delete
+AFTER DELETE ON Telefono_Empresa
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Telefono_Empresa', OLD.RUC_Empresa);
+END //
+
+-- -------- Correo_Empresa --------------------------------------------------------
+DROP TRIGGER IF EXISTS trg_Replica_Correo_Empresa_Insert //
+CREATE TRIGGER trg_Replica_Correo_Empresa_Insert
+AFTER INSERT ON Correo_Empresa
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Correo_Empresa', NEW.RUC_Empresa);
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Correo_Empresa_Update //
+CREATE TRIGGER trg_Replica_Correo_Empresa_Update
+AFTER UPDATE ON Correo_Empresa
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Correo_Empresa', NEW.RUC_Empresa);
+    IF NOT (OLD.RUC_Empresa <=> NEW.RUC_Empresa) THEN
+        INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Correo_Empresa', OLD.RUC_Empresa);
+    END IF;
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Correo_Empresa_Delete //
+CREATE TRIGGER trg_Replica_Correo_Empresa_Delete
+AFTER DELETE ON Correo_Empresa
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Correo_Empresa', OLD.RUC_Empresa);
+END //
+
+-- -------- Empleado --------------------------------------------------------------
+DROP TRIGGER IF EXISTS trg_Replica_Empleado_Insert //
+CREATE TRIGGER trg_Replica_Empleado_Insert
+AFTER INSERT ON Empleado
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Empleado', NEW.Codigo);
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Empleado_Update //
+CREATE TRIGGER trg_Replica_Empleado_Update
+AFTER UPDATE ON Empleado
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Empleado', NEW.Codigo);
+    IF NOT (OLD.Codigo <=> NEW.Codigo) THEN
+        INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Empleado', OLD.Codigo);
+    END IF;
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Empleado_Delete //
+CREATE TRIGGER trg_Replica_Empleado_Delete
+AFTER DELETE ON Empleado
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Empleado', OLD.Codigo);
+END //
+
+-- -------- Contacto_Empleado -----------------------------------------------------
+DROP TRIGGER IF EXISTS trg_Replica_Contacto_Empleado_Insert //
+CREATE TRIGGER trg_Replica_Contacto_Empleado_Insert
+AFTER INSERT ON Contacto_Empleado
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Contacto_Empleado', NEW.Codigo_Empleado);
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Contacto_Empleado_Update //
+CREATE TRIGGER trg_Replica_Contacto_Empleado_Update
+AFTER UPDATE ON Contacto_Empleado
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Contacto_Empleado', NEW.Codigo_Empleado);
+    IF NOT (OLD.Codigo_Empleado <=> NEW.Codigo_Empleado) THEN
+        INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Contacto_Empleado', OLD.Codigo_Empleado);
+    END IF;
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Contacto_Empleado_Delete //
+CREATE TRIGGER trg_Replica_Contacto_Empleado_Delete
+AFTER DELETE ON Contacto_Empleado
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Contacto_Empleado', OLD.Codigo_Empleado);
+END //
+
+-- -------- Proveedor -------------------------------------------------------------
+DROP TRIGGER IF EXISTS trg_Replica_Proveedor_Insert //
+CREATE TRIGGER trg_Replica_Proveedor_Insert
+AFTER INSERT ON Proveedor
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Proveedor', NEW.RUC);
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Proveedor_Update //
+CREATE TRIGGER trg_Replica_Proveedor_Update
+AFTER UPDATE ON Proveedor
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Proveedor', NEW.RUC);
+    IF NOT (OLD.RUC <=> NEW.RUC) THEN
+        INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Proveedor', OLD.RUC);
+    END IF;
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Proveedor_Delete //
+CREATE TRIGGER trg_Replica_Proveedor_Delete
+AFTER DELETE ON Proveedor
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Proveedor', OLD.RUC);
+END //
+
+-- -------- Email_Proveedor -------------------------------------------------------
+DROP TRIGGER IF EXISTS trg_Replica_Email_Proveedor_Insert //
+CREATE TRIGGER trg_Replica_Email_Proveedor_Insert
+AFTER INSERT ON Email_Proveedor
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Email_Proveedor', NEW.RUC_Proveedor);
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Email_Proveedor_Update //
+CREATE TRIGGER trg_Replica_Email_Proveedor_Update
+AFTER UPDATE ON Email_Proveedor
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Email_Proveedor', NEW.RUC_Proveedor);
+    IF NOT (OLD.RUC_Proveedor <=> NEW.RUC_Proveedor) THEN
+        INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Email_Proveedor', OLD.RUC_Proveedor);
+    END IF;
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Email_Proveedor_Delete //
+CREATE TRIGGER trg_Replica_Email_Proveedor_Delete
+AFTER DELETE ON Email_Proveedor
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Email_Proveedor', OLD.RUC_Proveedor);
+END //
+
+-- -------- Telefono_Proveedor ----------------------------------------------------
+DROP TRIGGER IF EXISTS trg_Replica_Telefono_Proveedor_Insert //
+CREATE TRIGGER trg_Replica_Telefono_Proveedor_Insert
+AFTER INSERT ON Telefono_Proveedor
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Telefono_Proveedor', NEW.RUC_Proveedor);
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Telefono_Proveedor_Update //
+CREATE TRIGGER trg_Replica_Telefono_Proveedor_Update
+AFTER UPDATE ON Telefono_Proveedor
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Telefono_Proveedor', NEW.RUC_Proveedor);
+    IF NOT (OLD.RUC_Proveedor <=> NEW.RUC_Proveedor) THEN
+        INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Telefono_Proveedor', OLD.RUC_Proveedor);
+    END IF;
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Telefono_Proveedor_Delete //
+CREATE TRIGGER trg_Replica_Telefono_Proveedor_Delete
+AFTER DELETE ON Telefono_Proveedor
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Telefono_Proveedor', OLD.RUC_Proveedor);
+END //
+
+-- -------- Repuesto --------------------------------------------------------------
+DROP TRIGGER IF EXISTS trg_Replica_Repuesto_Insert //
+CREATE TRIGGER trg_Replica_Repuesto_Insert
+AFTER INSERT ON Repuesto
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Repuesto', NEW.Nro_Parte);
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Repuesto_Update //
+CREATE TRIGGER trg_Replica_Repuesto_Update
+AFTER UPDATE ON Repuesto
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Repuesto', NEW.Nro_Parte);
+    IF NOT (OLD.Nro_Parte <=> NEW.Nro_Parte) THEN
+        INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Repuesto', OLD.Nro_Parte);
+    END IF;
+END //
+
+DROP TRIGGER IF EXISTS trg_Replica_Repuesto_Delete //
+CREATE TRIGGER trg_Replica_Repuesto_Delete
+AFTER DELETE ON Repuesto
+FOR EACH ROW
+BEGIN
+    INSERT INTO Replica_Cambio (Tabla, Clave) VALUES ('Repuesto', OLD.Nro_Parte);
+END //
+
+DELIMITER ;
@@ -0,0 +1,252 @@
+USE `sistemaproforma`;
+
+-- Tablas resumen de los reportes agregados. Las mantienen al día los triggers de
+-- Orden_Compra, Proforma y Proforma_Detalle (cualquier SP o sentencia que escriba en
+-- ellas), así los reportes leen filas ya agregadas en vez de un GROUP BY completo.
+-- sp_Reconstruir_Resumenes las recalcula desde cero (ver resumenes.py).
+
+CREATE TABLE IF NOT EXISTS Resumen_OC_Empresa (
+  RUC_Empresa VARCHAR(11) NOT NULL,
+  Total_Ordenes INT NOT NULL,
+  Suma_Precio_Neto DECIMAL(14,2) NOT NULL,
+  PRIMARY KEY (RUC_Empresa),
+  INDEX idx_Resumen_OC_Empresa_Monto (Suma_Precio_Neto))
+ENGINE = InnoDB;
+
+CREATE TABLE IF NOT EXISTS Resumen_Proforma_Empleado (
+  Codigo_Empleado VARCHAR(5) NOT NULL,
+  Nro_Proformas INT NOT NULL,
+  Total_Unidades INT NOT NULL,
+  PRIMARY KEY (Codigo_Empleado),
+  INDEX idx_Resumen_Proforma_Empleado_Nro (Nro_Proformas))
+ENGINE = InnoDB;
+
+CREATE TABLE IF NOT EXISTS Resumen_Proforma_Repuesto (
+  Nro_Parte VARCHAR(10) NOT NULL,
+  Nro_Proformas INT NOT NULL,
+  Total_Unidades INT NOT NULL,
+  PRIMARY KEY (Nro_Parte),
+  INDEX idx_Resumen_Proforma_Repuesto_Unid (Total_Unidades))
+ENGINE = InnoDB;
+
+DELIMITER //
+
+-- Suma (o resta, con valores negativos) a una fila resumen; las que quedan en 0 se borran.
+DROP PROCEDURE IF EXISTS sp_Resumen_OC_Empresa //
+CREATE PROCEDURE sp_Resumen_OC_Empresa(
+    IN p_RUC_Empresa VARCHAR(11),
+    IN p_Ordenes INT,
+    IN p_Monto DECIMAL(14,2)
+)
+BEGIN
+    INSERT INTO Resumen_OC_Empresa (RUC_Empresa, Total_Ordenes, Suma_Precio_Neto)
+    VALUES (p_RUC_Empresa, p_Ordenes, p_Monto)
+    ON DUPLICATE KEY UPDATE Total_Ordenes = Total_Ordenes + p_Ordenes,
+                            Suma_Precio_Neto = Suma_Precio_Neto + p_Monto;
+    DELETE FROM Resumen_OC_Empresa WHERE RUC_Empresa = p_RUC_Empresa AND Total_Ordenes <= 0;
+END //
+
+DROP PROCEDURE IF EXISTS sp_Resumen_Proforma_Empleado //
+CREATE PROCEDURE sp_Resumen_Proforma_Empleado(
+    IN p_Codigo_Empleado VARCHAR(5),
+    IN p_Proformas INT,
+    IN p_Unidades INT
+)
+BEGIN
+    IF p_Codigo_Empleado IS NOT NULL THEN
+        INSERT INTO Resumen_Proforma_Empleado (Codigo_Empleado, Nro_Proformas, Total_Unidades)
+        VALUES (p_Codigo_Empleado, p_Proformas, p_Unidades)
+        ON DUPLICATE KEY UPDATE Nro_Proformas = Nro_Proformas + p_Proformas,
+                                Total_Unidades = Total_Unidades + p_Unidades;
+        DELETE FROM Resumen_Proforma_Empleado
+         WHERE Codigo_Empleado = p_Codigo_Empleado AND Nro_Proformas <= 0;
+    END IF;
+END //
+
+DROP PROCEDURE IF EXISTS sp_Resumen_Proforma_Repuesto //
+CREATE PROCEDURE sp_Resumen_Proforma_Repuesto(
+    IN p_Nro_Parte VARCHAR(10),
+    IN p_Proformas INT,
+    IN p_Unidades INT
+)
+BEGIN
+    INSERT INTO Resumen_Proforma_Repuesto (Nro_Parte, Nro_Proformas, Total_Unidades)
+    VALUES (p_Nro_Parte, p_Proformas, p_Unidades)
+    ON DUPLICATE KEY UPDATE Nro_Proformas = Nro_Proformas + p_Proformas,
+                            Total_Unidades = Total_Unidades + p_Unidades;
+    DELETE FROM Resumen_Proforma_Repuesto WHERE Nro_Parte = p_Nro_Parte AND Nro_Proformas <= 0;
+END //
+
+-- -------- Orden_Compra --------------------------------------------------------
+DROP TRIGGER IF EXISTS trg_Resumen_OC_Insert //
+CREATE TRIGGER trg_Resumen_OC_Insert
+AFTER INSERT ON Orden_Compra
+FOR EACH ROW
+BEGIN
+    CALL sp_Resumen_OC_Empresa(NEW.RUC_Empresa, 1, NEW.Precio_Neto);
+END //
+
+DROP TRIGGER IF EXISTS trg_Resumen_OC_Update //
+CREATE TRIGGER trg_Resumen_OC_Update
+AFTER UPDATE ON Orden_Compra
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.RUC_Empresa <=> NEW.RUC_Empresa AND OLD.Precio_Neto <=> NEW.Precio_Neto) THEN
+        CALL sp_Resumen_OC_Empresa(OLD.RUC_Empresa, -1, -OLD.Precio_Neto);
+        CALL sp_Resumen_OC_Empresa(NEW.RUC_Empresa, 1, NEW.Precio_Neto);
+    END IF;
+END //
+
+DROP TRIGGER IF EXISTS trg_Resumen_OC_Delete //
+CREATE TRIGGER trg_Resumen_OC_Delete
+AFTER DELETE ON Orden_Compra
+FOR EACH ROW
+BEGIN
+    CALL sp_Resumen_OC_Empresa(OLD.RUC_Empresa, -1, -OLD.Precio_Neto);
+END //
+
+-- -------- Proforma (cabecera) -------------------------------------------------
+DROP TRIGGER IF EXISTS trg_Resumen_Proforma_Insert //
+CREATE TRIGGER trg_Resumen_Proforma_Insert
+AFTER INSERT ON Proforma
+FOR EACH ROW
+BEGIN
+    CALL sp_Resumen_Proforma_Empleado(NEW.Codigo_Empleado, 1, 0);
+END //
+
+DROP TRIGGER IF EXISTS trg_Resumen_Proforma_Update //
+CREATE TRIGGER trg_Resumen_Proforma_Update
+AFTER UPDATE ON Proforma
+FOR EACH ROW
+BEGIN
+    DECLARE v_Unidades INT;
+    IF NOT (OLD.Codigo_Empleado <=> NEW.Codigo_Empleado) THEN
+        SELECT IFNULL(SUM(Cantidad), 0) INTO v_Unidades
+          FROM Proforma_Detalle WHERE Nro_Proforma = NEW.Nro_Proforma;
+        CALL sp_Resumen_Proforma_Empleado(OLD.Codigo_Empleado, -1, -v_Unidades);
+        CALL sp_Resumen_Proforma_Empleado(NEW.Codigo_Empleado, 1, v_Unidades);
+    END IF;
+END //
+
+-- BEFORE: las líneas que aún queden se borrarán por ON DELETE CASCADE, que no dispara
+-- los triggers de Proforma_Detalle; se descuentan aquí mientras todavía se pueden leer.
+DROP TRIGGER IF EXISTS trg_Resumen_Proforma_Delete //
+CREATE TRIGGER trg_Resumen_Proforma_Delete
+BEFORE DELETE ON Proforma
+FOR EACH ROW
+BEGIN
+    DECLARE v_Unidades INT;
+    SELECT IFNULL(SUM(Cantidad), 0) INTO v_Unidades
+      FROM Proforma_Detalle WHERE Nro_Proforma = OLD.Nro_Proforma;
+    CALL sp_Resumen_Proforma_Empleado(OLD.Codigo_Empleado, -1, -v_Unidades);
+
+    IF v_Unidades > 0 THEN
+        UPDATE Resumen_Proforma_Repuesto r
+        INNER JOIN (SELECT Nro_Parte, SUM(Cantidad) AS Unidades
+                      FROM Proforma_Detalle
+                     WHERE Nro_Proforma = OLD.Nro_Proforma
+                     GROUP BY Nro_Parte) d ON d.Nro_Parte = r.Nro_Parte
+           SET r.Nro_Proformas = r.Nro_Proformas - 1,
+               r.Total_Unidades = r.Total_Unidades - d.Unidades;
+        DELETE FROM Resumen_Proforma_Repuesto
+         WHERE Nro_Proformas <= 0
+           AND Nro_Parte IN (SELECT Nro_Parte FROM Proforma_Detalle WHERE Nro_Proforma = OLD.Nro_Proforma);
+    END IF;
+END //
+
+-- -------- Proforma_Detalle (líneas) -------------------------------------------
+-- Nro_Proformas por repuesto cuenta proformas distintas: una línea suma 1 solo si es la
+-- primera de ese repuesto en su proforma y resta 1 solo si era la última.
+DROP TRIGGER IF EXISTS trg_Resumen_Detalle_Insert //
+CREATE TRIGGER trg_Resumen_Detalle_Insert
+AFTER INSERT ON Proforma_Detalle
+FOR EACH ROW
+BEGIN
+    DECLARE v_Lineas INT;
+    SELECT COUNT(*) INTO v_Lineas FROM Proforma_Detalle
+     WHERE Nro_Proforma = NEW.Nro_Proforma AND Nro_Parte = NEW.Nro_Parte;
+    CALL sp_Resumen_Proforma_Repuesto(NEW.Nro_Parte, IF(v_Lineas = 1, 1, 0), NEW.Cantidad);
+    CALL sp_Resumen_Proforma_Empleado(
+        (SELECT Codigo_Empleado FROM Proforma WHERE Nro_Proforma = NEW.Nro_Proforma), 0, NEW.Cantidad);
+END //
+
+DROP TRIGGER IF EXISTS trg_Resumen_Detalle_Update //
+CREATE TRIGGER trg_Resumen_Detalle_Update
+AFTER UPDATE ON Proforma_Detalle
+FOR EACH ROW
+BEGIN
+    DECLARE v_Lineas INT;
+    IF OLD.Nro_Proforma <=> NEW.Nro_Proforma AND OLD.Nro_Parte <=> NEW.Nro_Parte THEN
+        IF OLD.Cantidad <> NEW.Cantidad THEN
+            CALL sp_Resumen_Proforma_Repuesto(NEW.Nro_Parte, 0, NEW.Cantidad - OLD.Cantidad);
+            CALL sp_Resumen_Proforma_Empleado(
+                (SELECT Codigo_Empleado FROM Proforma WHERE Nro_Proforma = NEW.Nro_Proforma),
+                0, NEW.Cantidad - OLD.Cantidad);
+        END IF;
+    ELSE
+        SELECT COUNT(*) INTO v_Lineas FROM Proforma_Detalle
+         WHERE Nro_Proforma = OLD.Nro_Proforma AND Nro_Parte = OLD.Nro_Parte;
+        CALL sp_Resumen_Proforma_Repuesto(OLD.Nro_Parte, IF(v_Lineas = 0, -1, 0), -OLD.Cantidad);
+        SELECT COUNT(*) INTO v_Lineas FROM Proforma_Detalle
+         WHERE Nro_Proforma = NEW.Nro_Proforma AND Nro_Parte = NEW.Nro_Parte;
+        CALL sp_Resumen_Proforma_Repuesto(NEW.Nro_Parte, IF(v_Lineas = 1, 1, 0), NEW.Cantidad);
+        CALL sp_Resumen_Proforma_Empleado(
+            (SELECT Codigo_Empleado FROM Proforma WHERE Nro_Proforma = OLD.Nro_Proforma), 0, -OLD.Cantidad);
+        CALL sp_Resumen_Proforma_Empleado(
+            (SELECT Codigo_Empleado FROM Proforma WHERE Nro_Proforma = NEW.Nro_Proforma), 0, NEW.Cantidad);
+    END IF;
+END //
+
+DROP TRIGGER IF EXISTS trg_Resumen_Detalle_Delete //
+CREATE TRIGGER trg_Resumen_Detalle_Delete
+AFTER DELETE ON Proforma_Detalle
+FOR EACH ROW
+BEGIN
+    DECLARE v_Lineas INT;
+    SELECT COUNT(*) INTO v_Lineas FROM Proforma_Detalle
+     WHERE Nro_Proforma = OLD.Nro_Proforma AND Nro_Parte = OLD.Nro_Parte;
+    CALL sp_Resumen_Proforma_Repuesto(OLD.Nro_Parte, IF(v_Lineas = 0, -1, 0), -OLD.Cantidad);
+    CALL sp_Resumen_Proforma_Empleado(
+        (SELECT Codigo_Empleado FROM Proforma WHERE Nro_Proforma = OLD.Nro_Proforma), 0, -OLD.Cantidad);
+END //
+
+-- -------- Reconstrucción -------------------------------------------------------
+-- Recalcula las tres tablas desde cero en una sola transacción (no devuelve filas).
+DROP PROCEDURE IF EXISTS sp_Reconstruir_Resumenes //
+CREATE PROCEDURE sp_Reconstruir_Resumenes()
+BEGIN
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    START TRANSACTION;
+
+    DELETE FROM Resumen_OC_Empresa;
+    INSERT INTO Resumen_OC_Empresa (RUC_Empresa, Total_Ordenes, Suma_Precio_Neto)
+    SELECT RUC_Empresa, COUNT(*), SUM(Precio_Neto)
+      FROM Orden_Compra
+     GROUP BY RUC_Empresa;
+
+    DELETE FROM Resumen_Proforma_Empleado;
+    INSERT INTO Resumen_Proforma_Empleado (Codigo_Empleado, Nro_Proformas, Total_Unidades)
+    SELECT p.Codigo_Empleado, COUNT(*), IFNULL(SUM(u.Unidades), 0)
+      FROM Proforma p
+      LEFT JOIN (SELECT Nro_Proforma, SUM(Cantidad) AS Unidades
+                   FROM Proforma_Detalle GROUP BY Nro_Proforma) u ON u.Nro_Proforma = p.Nro_Proforma
+     GROUP BY p.Codigo_Empleado;
+
+    DELETE FROM Resumen_Proforma_Repuesto;
+    INSERT INTO Resumen_Proforma_Repuesto (Nro_Parte, Nro_Proformas, Total_Unidades)
+    SELECT Nro_Parte, COUNT(DISTINCT Nro_Proforma), SUM(Cantidad)
+      FROM Proforma_Detalle
+     GROUP BY Nro_Parte;
+
+    COMMIT;
+END //
+
+DELIMITER ;
+
+-- Carga inicial (y recálculo cada vez que este script cambia).
+CALL sp_Reconstruir_Resumenes();
@@ -0,0 +1,128 @@
+"""
+Traza del arranque de la app: cuánto tarda cada fase desde que se lanzó el proceso
+(intérprete e imports, ventana de conexión, migraciones, login, pestañas) hasta que la
+primera pestaña muestra sus datos.
+
+Se activa con la variable de entorno PROFORMAS_STARTUP_TRACE:
+  * "1" → escribe el resumen en STDERR al terminar el arranque;
+  * una ruta (ej. arranque.jsonl) → además agrega una línea JSON por arranque a ese archivo,
+    para comparar corridas.
+Sin la variable, `trace` no mide nada (cada llamada es un `if` y retorna).
+
+El origen es la creación del proceso (Linux y Windows), así que la primera fase incluye el
+inicio del intérprete, el .exe de PyInstaller y los imports; en otros sistemas, el import
+de este módulo.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+ENV = "PROFORMAS_STARTUP_TRACE"
+
+
+def _process_start():
+    """Hora (time.time) de creación del proceso, o None si no se puede obtener."""
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/stat", "r") as f:
+                # El nombre del proceso (campo 2) puede tener espacios: se corta tras el ')'.
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open("/proc/uptime", "r") as f:
+                uptime = float(f.read().split()[0])
+            ticks = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+            return time.time() - uptime + ticks
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+            times = [wintypes.FILETIME() for _ in range(4)]
+            k32 = ctypes.windll.kernel32
+            k32.GetCurrentProcess.restype = wintypes.HANDLE
+            k32.GetProcessTimes.argtypes = [wintypes.HANDLE] + [ctypes.POINTER(wintypes.FILETIME)] * 4
+            if k32.GetProcessTimes(k32.GetCurrentProcess(), *[ctypes.byref(t) for t in times]):
+                created = (times[0].dwHighDateTime << 32) | times[0].dwLowDateTime
+                return created / 1e7 - 11644473600   # FILETIME (100 ns desde 1601) -> epoch
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    return None
+
+
+class StartupTrace:
+    """
+    Fases y marcas del arranque, con tiempos relativos a la creación del proceso.
+
+    Parameters
+    ----------
+    target : str | None
+        Valor de PROFORMAS_STARTUP_TRACE: None desactiva la traza; "1" solo STDERR;
+        otra cosa es la ruta del archivo JSON Lines.
+    """
+    def __init__(self, target=None):
+        self.enabled = bool(target)
+        self.path = target if target not in (None, "", "1") else None
+        now_wall, now = time.time(), time.perf_counter()
+        start = _process_start() if self.enabled else None
+        # Origen en la escala de perf_counter (monótona), corrido por lo que ya llevaba el proceso.
+        self.t0 = now - (now_wall - start) if start is not None and start <= now_wall else now
+        self.events = []     # (nombre, inicio ms, duración ms | None, hilo)
+        self.finished = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.environ.get(ENV))
+
+    def _ms(self, t):
+        return (t - self.t0) * 1000.0
+
+    def _add(self, name, start, duration):
+        with self._lock:
+            self.events.append((name, round(self._ms(start), 1),
+                                None if duration is None else round(duration * 1000.0, 1),
+                                threading.current_thread().name))
+
+    def mark(self, name):
+        """Registra un instante (ej. "ventana de conexión visible")."""
+        if self.enabled and not self.finished:
+            self._add(name, time.perf_counter(), None)
+
+    @contextmanager
+    def phase(self, name):
+        """Mide el bloque `with` como una fase (puede correr en cualquier hilo)."""
+        if not self.enabled or self.finished:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, start, time.perf_counter() - start)
+
+    def finish(self, name):
+        """Cierra la traza con la marca `name` y escribe el resumen (solo la primera vez)."""
+        if not self.enabled or self.finished:
+            return
+        self.mark(name)
+        self.finished = True
+        print(self.report(), file=sys.stderr)
+        if self.path:
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+                                        "total_ms": self.events[-1][1],
+                                        "eventos": self.events}, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"{ENV}: no se pudo escribir {self.path}: {e}", file=sys.stderr)
+
+    def report(self):
+        """Resumen legible: instante de inicio, duración e hilo de cada fase, en orden."""
+        lines = ["Arranque (ms desde el inicio del proceso):"]
+        for name, at, dur, thread in sorted(self.events, key=lambda e: e[1]):
+            took = f"{dur:9.1f}" if dur is not None else " " * 9
+            lines.append(f"  {at:9.1f} {took}  {name}" + (f"  [{thread}]" if thread != "MainThread" else ""))
+        return "\n".join(lines)
+
+
+trace = StartupTrace.from_env()
@@ -0,0 +1,170 @@
+"""
+Ajuste de stock por lotes (conteos físicos, planillas pegadas, archivos de lector de códigos).
+
+Todas las entradas se netean por Nro_Parte en Python y se aplican con un único
+UPDATE ... CASE sobre Repuesto: una sola ida al servidor y una sola transacción
+(la sentencia es atómica), en vez de un `sp_Actualizar_Stock` por repuesto.
+
+Uso sin interfaz gráfica:
+    python stock.py ajustes.txt [--config config.json]
+"""
+import argparse
+import re
+import sys
+from collections import OrderedDict
+from db import MySQLClient
+from settings import CONFIG_PATH, load_config
+
+OPERATIONS = ("SUMA", "RESTA")
+_SEP = re.compile(r"[\t;,]|\s+")
+
+
+def parse_adjustments(text):
+    """
+    Interpreta líneas de ajuste:
+
+        Nro_Parte                      (lector de códigos: cada lectura suma 1)
+        Nro_Parte <sep> cantidad       (cantidad con signo: -3 equivale a RESTA 3)
+        Nro_Parte <sep> cantidad <sep> SUMA|RESTA
+
+    El separador puede ser tab, ";", "," o espacios. Una primera línea que no
+    tenga cantidad numérica (encabezado de planilla) se ignora.
+
+    Returns
+    -------
+    (list[tuple[int, str, int, str]], list[tuple[int, str]])
+        Entradas (línea, Nro_Parte, cantidad > 0, operación) y errores (línea, motivo).
+    """
+    entries, errors = [], []
+    first = True
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        parts = [p for p in _SEP.split(line.strip()) if p]
+        if not parts:
+            continue
+        is_first, first = first, False
+        npart, cant, op = parts[0], "1", "SUMA"
+        if len(parts) >= 2:
+            cant = parts[1]
+        if len(parts) >= 3:
+            op = parts[2].upper()
+        try:
+            icant = int(cant)
+        except ValueError:
+            if not is_first:
+                errors.append((line_no, f"Cantidad inválida: {cant!r}"))
+            continue
+        if len(parts) > 3:
+            errors.append((line_no, "Demasiadas columnas"))
+            continue
+        if op not in OPERATIONS:
+            errors.append((line_no, f"Operación inválida: {parts[2]!r} (use SUMA o RESTA)"))
+            continue
+        if len(npart) > 10:
+            errors.append((line_no, "Nro_Parte excede 10 caracteres"))
+            continue
+        if icant == 0:
+            errors.append((line_no, "Cantidad 0"))
+            continue
+        if icant < 0:
+            icant, op = -icant, ("RESTA" if op == "SUMA" else "SUMA")
+        entries.append((line_no, npart, icant, op))
+    return entries, errors
+
+
+def net_deltas(entries):
+    """
+    Variación neta por repuesto (Nro_Parte sin distinguir mayúsculas, como la PK).
+
+    Returns
+    -------
+    OrderedDict[str, list]
+        clave -> [Nro_Parte (primera grafía vista), delta con signo], en orden de aparición.
+    """
+    deltas = OrderedDict()
+    for _line, npart, cant, op in entries:
+        d = deltas.setdefault(npart.upper(), [npart, 0])
+        d[1] += cant if op == "SUMA" else -cant
+    return deltas
+
+
+def adjust_stock(client, entries):
+    """
+    Aplica un lote de ajustes en una sola sentencia y devuelve el resultado por repuesto.
+
+    Params
+    ------
+    client : MySQLClient
+    entries : list[tuple]
+        (línea, Nro_Parte, cantidad, "SUMA"|"RESTA"), p.ej. de `parse_adjustments`.
+
+    Returns
+    -------
+    (bool, list[tuple] | str)
+        True + filas (Nro_Parte, Delta, Stock_Anterior, Stock_Nuevo, Estado) si ok;
+        False + mensaje de error (no se aplicó nada).
+    """
+    deltas = net_deltas(entries)
+    if not deltas:
+        return True, []
+    keys = [np for np, _ in deltas.values()]
+    marks = ", ".join(["%s"] * len(keys))
+    cases = "\n".join(["    WHEN %s THEN %s"] * len(keys))
+    ok, out = client.execute(
+        f"UPDATE Repuesto SET Cantidad = Cantidad + CASE Nro_Parte\n{cases}\n    ELSE 0\nEND\n"
+        f"WHERE Nro_Parte IN ({marks});",
+        [v for np, d in deltas.values() for v in (np, d)] + keys
+    )
+    if not ok:
+        return False, out
+
+    # `execute` (no `query`): el stock nuevo se lee del servidor, nunca de la réplica local.
+    ok, out = client.execute(f"SELECT Nro_Parte, Cantidad FROM Repuesto WHERE Nro_Parte IN ({marks});", keys)
+    stock = {}
+    if ok:
+        for line in out.splitlines():
+            parts = line.split("\t")
+            if len(parts) == 2:
+                stock[parts[0].upper()] = int(parts[1])
+    summary = []
+    for key, (npart, d) in deltas.items():
+        if not ok:
+            summary.append((npart, d, None, None, "Aplicado (sin verificar)"))
+        elif key not in stock:
+            summary.append((npart, d, None, None, "No existe"))
+        else:
+            new = stock[key]
+            summary.append((npart, d, new - d, new, "OK" if new >= 0 else "Stock negativo"))
+    return True, summary
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Aplica un lote de ajustes de stock.")
+    ap.add_argument("archivo", help="líneas Nro_Parte[;cantidad[;SUMA|RESTA]] ('-' = STDIN)")
+    ap.add_argument("--config", default=CONFIG_PATH)
+    args = ap.parse_args(argv)
+
+    if args.archivo == "-":
+        text = sys.stdin.read()
+    else:
+        with open(args.archivo, "r", encoding="utf-8-sig") as f:
+            text = f.read()
+    entries, errors = parse_adjustments(text)
+    for line_no, msg in errors:
+        print(f"línea {line_no}: {msg}", file=sys.stderr)
+
+    client = MySQLClient(**load_config(args.config))
+    try:
+        ok, out = adjust_stock(client, entries)
+    finally:
+        client.close()
+    if not ok:
+        print(out, file=sys.stderr)
+        return 1
+    print("Nro_Parte\tDelta\tStock_Anterior\tStock_Nuevo\tEstado")
+    for row in out:
+        print("\t".join("" if v is None else str(v) for v in row))
+    return 0 if not errors else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())